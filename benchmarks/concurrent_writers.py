@@ -0,0 +1,87 @@
+"""
+Many gate processes writing one shared data/ directory at once.
+
+Each writer process adds `--updates` tickets to the same file. Modes:
+  unlocked  load_tickets + plain atomic save (read-modify-write without the lock)
+  locked    update_tickets (read-modify-write under the fcntl lock)
+  journal   append_ticket (one locked, fsynced journal line per ticket)
+The report shows tickets expected vs found (lost updates) and writes per second.
+
+    python -m benchmarks.concurrent_writers [--writers 8] [--updates 50] [--modes locked journal]
+"""
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from src import data_manager
+
+FILENAME = "tickets_pending.json"
+MODES = ("unlocked", "locked", "journal")
+
+
+def _writer(data_dir, mode, writer_id, updates, start):
+    data_manager.DATA_DIR = Path(data_dir)
+    path = data_manager.DATA_DIR / FILENAME
+    start.wait()
+    for n in range(updates):
+        ticket = {"ticket_id": writer_id * 1_000_000 + n, "zone": "REGULAR"}
+        if mode == "unlocked":
+            tickets = data_manager.load_tickets(FILENAME)
+            tickets.append(ticket)
+            data_manager._save(path, tickets)
+        elif mode == "locked":
+            data_manager.update_tickets(FILENAME, lambda tickets: tickets.append(ticket))
+        else:
+            data_manager.append_ticket(FILENAME, ticket)
+
+
+def run(mode, writers, updates):
+    """Run one mode; returns {"mode", "expected", "found", "lost", "seconds", "writes_per_sec"}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = multiprocessing.get_context()
+        start = ctx.Event()
+        procs = [ctx.Process(target=_writer, args=(tmp, mode, w, updates, start)) for w in range(writers)]
+        for p in procs:
+            p.start()
+        t0 = time.perf_counter()
+        start.set()
+        for p in procs:
+            p.join()
+        seconds = time.perf_counter() - t0
+
+        data_manager_dir, data_manager.DATA_DIR = data_manager.DATA_DIR, Path(tmp)
+        try:
+            found = len(data_manager.load_tickets(FILENAME))
+        finally:
+            data_manager.DATA_DIR = data_manager_dir
+
+    expected = writers * updates
+    return {
+        "mode": mode,
+        "expected": expected,
+        "found": found,
+        "lost": expected - found,
+        "seconds": seconds,
+        "writes_per_sec": expected / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent writer benchmark for src.data_manager")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--updates", type=int, default=50, help="tickets added per writer")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<10} {'expected':>9} {'found':>7} {'lost':>6} {'seconds':>8} {'writes/s':>9}")
+    results = [run(mode, args.writers, args.updates) for mode in args.modes]
+    for r in results:
+        print(f"{r['mode']:<10} {r['expected']:>9} {r['found']:>7} {r['lost']:>6} "
+              f"{r['seconds']:>8.2f} {r['writes_per_sec']:>9.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic tickets for benchmarks, drawn from the distributions of the sample data in
+data/*.json: zone, member tier, day type, lost-ticket rate, validations, entry hour and
+stay length are all sampled from what the sample files contain (stays with a little
+jitter, so the fee engine sees more than a handful of distinct durations).
+
+    python -m benchmarks.generate 100000 > tickets.jsonl
+"""
+import json
+import random
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import chain
+
+from src.data_manager import PENDING_FILE, iter_completed, iter_tickets
+
+START = datetime(2025, 11, 1)
+DAYS = 30
+
+
+def distributions(tickets=None):
+    """Weights per field (Counter of observed values) from the sample ticket files."""
+    if tickets is None:
+        tickets = chain(iter_tickets(PENDING_FILE), iter_completed())
+    dist = {name: Counter() for name in ("zone", "member_tier", "day_type", "lost_ticket", "validation", "hour")}
+    dist["duration"] = Counter()
+    for t in tickets:
+        for name in ("zone", "member_tier", "day_type"):
+            dist[name][t[name]] += 1
+        dist["lost_ticket"][bool(t.get("lost_ticket"))] += 1
+        v = t.get("validation")
+        dist["validation"][json.dumps(v, sort_keys=True) if v else None] += 1
+        dist["hour"][datetime.fromisoformat(t["entry_time"]).hour] += 1
+        if t.get("duration_minutes") and not t.get("lost_ticket"):
+            dist["duration"][t["duration_minutes"]] += 1
+    return dist
+
+
+def synthetic_tickets(n, seed=0, dist=None, start_id=1):
+    """Yield n completed-ticket records (tickets_completed.json shape), reproducible per seed."""
+    rng = random.Random(seed)
+    dist = dist or distributions()
+    if not dist["zone"]:
+        raise ValueError("No sample tickets to take distributions from")
+    draw = {name: (list(c), list(c.values())) for name, c in dist.items()}
+
+    def pick(name, k):
+        values, weights = draw[name]
+        return rng.choices(values, weights, k=k)
+
+    # draw in blocks so rng.choices (which is vectorised over k) does most of the work
+    block = 4096
+    made = 0
+    while made < n:
+        k = min(block, n - made)
+        columns = zip(pick("zone", k), pick("member_tier", k), pick("day_type", k), pick("lost_ticket", k),
+                      pick("validation", k), pick("hour", k), pick("duration", k))
+        for zone, tier, day_type, lost, validation, hour, duration in columns:
+            entry = START + timedelta(days=rng.randrange(DAYS), hours=hour, minutes=rng.randrange(60))
+            if lost:
+                exit_time = duration = None
+            else:
+                duration = max(1, int(duration * rng.uniform(0.5, 1.5)))
+                exit_time = (entry + timedelta(minutes=duration)).isoformat(timespec="minutes")
+            yield {
+                "ticket_id": start_id + made,
+                "zone": zone,
+                "member_tier": tier,
+                "entry_time": entry.isoformat(timespec="minutes"),
+                "exit_time": exit_time,
+                "day_type": day_type,
+                "lost_ticket": lost,
+                "validation": json.loads(validation) if validation else None,
+                "duration_minutes": duration,
+            }
+            made += 1
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for ticket in synthetic_tickets(count):
+        sys.stdout.write(json.dumps(ticket) + "\n")
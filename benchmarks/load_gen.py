@@ -0,0 +1,112 @@
+"""
+Load generator for src.server: keep-alive connections firing requests back to back at a
+local pricing service; reports p50/p99 latency and requests per second.
+
+    python -m benchmarks.load_gen [--url http://127.0.0.1:8080] [--connections 32]
+                                  [--requests 20000] [--endpoint price|ticket] [--spawn]
+
+--spawn starts `python -m src.server` on a free port for the run (against the data/ dir).
+"""
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+STAY = {"ticket_id": 1, "zone": "REGULAR", "member_tier": "MEMBER", "day_type": "WEEKDAY",
+        "entry_time": "2025-11-01T10:00", "exit_time": "2025-11-01T13:40", "lost_ticket": False,
+        "validation": {"store": "Woolworths", "kind": "HOURS", "spend": 35}}
+ENDPOINTS = ("price", "ticket")
+
+
+def _request(endpoint, host, ticket_id):
+    if endpoint == "price":
+        body = json.dumps(STAY).encode("utf-8")
+        head = f"POST /price HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n"
+        return head.encode("latin-1") + body
+    return f"GET /tickets/{ticket_id} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1")
+
+
+async def _client(host, port, request, count, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            t0 = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def run(url="http://127.0.0.1:8080", connections=32, requests=20_000, endpoint="price", ticket_id=1001):
+    """Fire `requests` requests over `connections` connections; returns the latency report."""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    request = _request(endpoint, host, ticket_id)
+    per_client = [requests // connections + (i < requests % connections) for i in range(connections)]
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, request, n, latencies) for n in per_client if n))
+    seconds = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "seconds": seconds,
+        "requests_per_sec": len(latencies) / seconds if seconds else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _spawn_server():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, "-m", "src.server", "--port", str(port)], stdout=subprocess.PIPE)
+    proc.stdout.readline()  # "Serving on ..." once the socket is bound
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the src.server pricing service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="price")
+    parser.add_argument("--ticket-id", type=int, default=1001, help="pending ticket for --endpoint ticket")
+    parser.add_argument("--spawn", action="store_true", help="start a server on a free port for the run")
+    args = parser.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if args.spawn:
+        proc, url = _spawn_server()
+    try:
+        r = asyncio.run(run(url, args.connections, args.requests, args.endpoint, args.ticket_id))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    print(f"{r['endpoint']}: {r['requests']} requests in {r['seconds']:.2f}s = {r['requests_per_sec']:.0f} req/s, "
+          f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms")
+    return r
+
+
+if __name__ == "__main__":
+    main()
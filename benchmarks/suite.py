@@ -0,0 +1,232 @@
+"""
+Benchmark suite for the fee engine and the storage layer.
+
+Scenarios (best of --repeat runs, reported as ops/s):
+  compute_fee.<ZONE>        scalar compute_fee, one call per synthetic ticket, per zone
+  compute_fee.cached        the sample mix through a new FeeCache per run (src.fee_engine)
+  compute_fee.lost          lost-ticket path
+  compute_fee.overnight     stays crossing the 04:00 cut-off
+  compute_fee.REGULAR.instrumented   compute_fee.REGULAR with src.instrumentation enabled
+  compute_fee.REGULAR.uninstrumented compute_fee.REGULAR without the disabled instrumentation check
+  load_tickets.<size>       JSON snapshot load at 1k / 100k / 1m tickets
+  save_tickets.<size>       atomic JSON snapshot save at the same sizes
+  receipts.render           bulk receipt rendering (src.receipts.write_receipts)
+
+    python -m benchmarks.suite [--sizes 1k 100k] [--only compute_fee] [--out results.json]
+                               [--compare baseline.json] [--threshold 0.10]
+
+Results are saved as JSON; --compare flags every scenario whose ops/s dropped by more
+than the threshold against a baseline file and exits with status 1 if there are any.
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.generate import distributions, synthetic_tickets
+from src import data_manager, fee_engine, instrumentation
+from src.fee_engine import FeeCache, _priced, compute_fee
+from src.policy import POLICY
+from src.receipts import write_receipts
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = ("1k", "100k")
+FEE_CALLS = 20_000
+RECEIPTS = 20_000
+THRESHOLD = 0.10
+
+
+def _fee_args(t):
+    return dict(
+        duration_minutes=t["duration_minutes"] or 0,
+        zone=t["zone"],
+        day_type=t["day_type"],
+        member_tier=t["member_tier"],
+        validation=t["validation"],
+        lost_ticket=t["lost_ticket"],
+        entry_at=t["entry_time"],
+        exit_at=t["exit_time"],
+        policy=POLICY,
+    )
+
+
+def _fee_scenario(make_tickets, instrumented=False, uninstrumented=False, cached=False):
+    def setup():
+        calls = [_fee_args(t) for t in make_tickets()]
+
+        def run():
+            # a fresh cache per run, so best-of-N still reports the cold cache
+            price = FeeCache().compute_fee if cached else compute_fee
+            if instrumented:
+                instrumentation.enable(instrumentation.MemorySink())
+            if uninstrumented:
+                fee_engine._priced = fee_engine._price
+            try:
+                for kwargs in calls:
+                    price(**kwargs)
+            finally:
+                if instrumented:
+                    instrumentation.disable()
+                    instrumentation.reset()
+                if uninstrumented:
+                    fee_engine._priced = _priced
+            return len(calls)
+        return run
+    return setup
+
+
+def _overnight(t):
+    entry = datetime.fromisoformat(t["entry_time"]).replace(hour=22)
+    duration = 420 + t["ticket_id"] % 300
+    return dict(t, lost_ticket=False, entry_time=entry.isoformat(timespec="minutes"),
+                exit_time=(entry + timedelta(minutes=duration)).isoformat(timespec="minutes"),
+                duration_minutes=duration)
+
+
+def scenarios(sizes=DEFAULT_SIZES):
+    """
+    name -> setup(); setup() prepares the inputs (outside the timing) and returns run(),
+    which performs the measured work and returns the number of operations.
+    """
+    dist = distributions()
+
+    def base():
+        return synthetic_tickets(FEE_CALLS, seed=1, dist=dist)
+
+    found = {}
+    for zone in POLICY["zones"]:
+        found[f"compute_fee.{zone}"] = _fee_scenario(
+            lambda zone=zone: (dict(t, zone=zone) for t in base() if not t["lost_ticket"]))
+    # the same stays with instrumentation on (its cost when enabled), and without the
+    # instrumentation check at all (compute_fee.REGULAR minus it is the cost when disabled)
+    regular = lambda: (dict(t, zone="REGULAR") for t in base() if not t["lost_ticket"])
+    found["compute_fee.REGULAR.instrumented"] = _fee_scenario(regular, instrumented=True)
+    found["compute_fee.REGULAR.uninstrumented"] = _fee_scenario(regular, uninstrumented=True)
+    found["compute_fee.cached"] = _fee_scenario(base, cached=True)
+    found["compute_fee.lost"] = _fee_scenario(lambda: (dict(t, lost_ticket=True, exit_time=None) for t in base()))
+    found["compute_fee.overnight"] = _fee_scenario(lambda: (_overnight(t) for t in base()))
+
+    for label in sizes:
+        found[f"save_tickets.{label}"] = lambda n=SIZES[label], label=label: _save(n, label, dist)
+        found[f"load_tickets.{label}"] = lambda n=SIZES[label], label=label: _load(n, label, dist)
+    found["receipts.render"] = lambda: _render(dist)
+    return found
+
+
+def _save(n, label, dist):
+    tickets = list(synthetic_tickets(n, seed=2, dist=dist))
+
+    def run():
+        data_manager.save_tickets(f"bench_save_{label}.json", tickets)
+        return n
+    return run
+
+
+def _load(n, label, dist):
+    filename = f"bench_load_{label}.json"
+    data_manager.write_tickets(filename, synthetic_tickets(n, seed=2, dist=dist))
+
+    def run():
+        return len(data_manager.load_tickets(filename))
+    return run
+
+
+def _render(dist):
+    tickets = list(synthetic_tickets(RECEIPTS, seed=3, dist=dist))
+
+    def run():
+        return write_receipts(io.StringIO(), tickets)
+    return run
+
+
+def run(names=None, sizes=DEFAULT_SIZES, repeat=3, data_dir=None):
+    """
+    Run the selected scenarios against a scratch data directory (the sample distributions
+    are read from the real one first); returns the results document (see save()).
+    """
+    selected = scenarios(sizes)
+    if names:
+        selected = {k: v for k, v in selected.items() if any(k.startswith(n) for n in names)}
+    with tempfile.TemporaryDirectory() as tmp:
+        saved, data_manager.DATA_DIR = data_manager.DATA_DIR, Path(data_dir or tmp)
+        try:
+            results = {}
+            for name, setup in selected.items():
+                scenario = setup()
+                best = None
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    ops = scenario()
+                    seconds = time.perf_counter() - t0
+                    best = seconds if best is None else min(best, seconds)
+                results[name] = {"ops": ops, "seconds": best, "ops_per_sec": ops / best if best else 0.0}
+        finally:
+            data_manager.DATA_DIR = saved
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Scenarios slower than baseline by more than threshold: [(name, old ops/s, new ops/s, change)]."""
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or not old["ops_per_sec"]:
+            continue
+        change = new["ops_per_sec"] / old["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append((name, old["ops_per_sec"], new["ops_per_sec"], change))
+    return regressions
+
+
+def save(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--only", nargs="+", help="scenario name prefixes to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario (best is kept)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.sizes, args.repeat)
+    print(f"{'scenario':<34} {'ops':>9} {'seconds':>9} {'ops/s':>12}")
+    for name, r in results["results"].items():
+        print(f"{name:<34} {r['ops']:>9} {r['seconds']:>9.3f} {r['ops_per_sec']:>12.0f}")
+    if args.out:
+        save(results, args.out)
+
+    if args.compare:
+        regressions = compare(load(args.compare), results, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.0f} -> {new:.0f} ops/s ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+import os
+import sys
+
+from src.cli import main
+
+try:
+    sys.exit(main())
+except BrokenPipeError:
+    # output piped into e.g. `head`: stop quietly, as other command-line filters do
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(1)
@@ -0,0 +1,316 @@
+"""
+Compact binary archive for completed tickets.
+
+Layout: an 8-byte magic, a uint32 header length and uint64 record count, a JSON header
+holding the code vocabularies (zones, tiers, day types, validations), zero padding to an
+8-byte boundary, then fixed-width little-endian records (RECORD_FORMAT, 40 bytes each):
+
+    ticket_id      int64
+    entry_min      int32   minutes since 1970-01-01T00:00 (naive local time)
+    exit_min       int32   NO_VALUE when there is no exit (lost ticket)
+    duration       int32   NO_VALUE when unknown
+    spend_cents    int32   validation spend
+    total_cents    int32
+    penalty_cents  int32   with HAS_BREAKDOWN, the billed lost-ticket penalty (LOST) or
+                           overnight penalty; the time charge is the rest of the total
+    zone, tier, day_type, validation  uint8 codes (validation 0 = none; the day type
+                   vocabulary holds null for tickets without one)
+    flags          uint8   LOST | HAS_TOTAL | HAS_BREAKDOWN | ENTRY_SECONDS | EXIT_SECONDS
+    entry_sec, exit_sec  uint8  seconds past entry_min/exit_min
+
+Timestamps keep whole seconds (written back with seconds only if they had them);
+fractions of a second are dropped.
+
+Archive opens the file with mmap; with NumPy, columns() are zero-copy views of the map
+and ticket_columns() feeds src.vector_engine.reprice directly.
+
+    python -m src.archive pack [tickets_completed.json] [data/tickets_completed.arc]
+    python -m src.archive unpack [data/tickets_completed.arc] [tickets_completed.json]
+"""
+import json
+import mmap
+import struct
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+    np = None
+
+from src.business_calendar import day_index
+from src.data_manager import COMPLETED_FILE, DATA_DIR, iter_completed, iter_tickets, write_tickets
+from src.vector_engine import DAY_TYPES, NO_DAY, TicketColumns
+
+MAGIC = b"TKTARC\x00\x01"
+_PREFIX = struct.Struct("<8sIQ")
+RECORD_FORMAT = "<qiiiiiiBBBBBBBx"
+RECORD = struct.Struct(RECORD_FORMAT)
+NO_VALUE = -(2 ** 31)
+
+LOST = 1
+HAS_TOTAL = 2
+HAS_BREAKDOWN = 4
+ENTRY_SECONDS = 8
+EXIT_SECONDS = 16
+
+FIELDS = ("ticket_id", "entry_min", "exit_min", "duration", "spend_cents", "total_cents",
+          "penalty_cents", "zone", "tier", "day_type", "validation", "flags", "entry_sec", "exit_sec")
+
+if np is not None:
+    RECORD_DTYPE = np.dtype({
+        "names": list(FIELDS),
+        "formats": ["<i8"] + ["<i4"] * 6 + ["u1"] * 7,
+        "offsets": [0, 8, 12, 16, 20, 24, 28, 32, 33, 34, 35, 36, 37, 38],
+        "itemsize": RECORD.size,
+    })
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def write_archive(path, tickets):
+    """Stream ticket records (tickets_completed.json shape) into an archive; returns the count."""
+    vocab = {"zones": {}, "tiers": {}, "day_types": {}, "validations": {}}
+    path = Path(path)
+    body = path.with_name(path.name + ".body")
+    count = 0
+    # records are written first (codes are assigned on the fly), then header + body are joined
+    with open(body, "wb") as out:
+        for t in tickets:
+            out.write(_pack(t, vocab))
+            count += 1
+    header = json.dumps({k: list(v) for k, v in vocab.items()}).encode("utf-8")
+    header += b" " * (-(len(header) + _PREFIX.size) % 8)
+    with open(path, "wb") as out, open(body, "rb") as src:
+        out.write(_PREFIX.pack(MAGIC, len(header), count))
+        out.write(header)
+        while chunk := src.read(1024 * 1024):
+            out.write(chunk)
+    body.unlink()
+    return count
+
+
+class Archive:
+    """Read-only, memory-mapped view of an archive file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len, self.count = _PREFIX.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a ticket archive")
+        header = json.loads(bytes(self._map[_PREFIX.size:_PREFIX.size + header_len]))
+        self.zones = tuple(header["zones"])
+        self.tiers = tuple(header["tiers"])
+        self.day_types = tuple(header["day_types"])
+        self.validations = tuple(tuple(v) for v in header["validations"])
+        self.offset = _PREFIX.size + header_len
+
+    def close(self):
+        """Unmap the file (column views handed out must be dropped first)."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def records(self):
+        """Structured NumPy array over the mapped records (no copy)."""
+        if np is None:
+            raise RuntimeError("NumPy is required for column views; use iter_records()")
+        return np.frombuffer(self._map, dtype=RECORD_DTYPE, count=self.count, offset=self.offset)
+
+    def columns(self):
+        """Dict of zero-copy NumPy column views, keyed by FIELDS."""
+        records = self.records()
+        return {name: records[name] for name in FIELDS}
+
+    def ticket_columns(self):
+        """The archive as vector_engine.TicketColumns, for repricing without decoding JSON."""
+        c = self.columns()
+        entry_day = (c["entry_min"] // 1440 + _EPOCH.toordinal()).astype(np.int32)
+        # tickets without a day_type take it from the calendar; with no entry time either
+        # they are not priced (NO_DAY), as in compute_fees
+        day_codes = np.array([DAY_TYPES.index(d) if d in DAY_TYPES else 0 for d in self.day_types] or [0],
+                             dtype=np.int8)
+        day = day_codes[c["day_type"]]
+        if None in self.day_types:
+            undated = c["day_type"] == self.day_types.index(None)
+            day[undated] = NO_DAY
+            dated = undated & (c["entry_min"] != NO_VALUE)
+            day[dated] = day_index().codes(entry_day[dated])
+
+        lost = (c["flags"] & LOST) != 0
+        has_exit = (c["exit_min"] != NO_VALUE) & ~lost
+        known = c["duration"] != NO_VALUE
+        if np.any(~known & ~lost & ~has_exit & (day != NO_DAY)):
+            raise ValueError("Archive has tickets with neither an exit time nor a duration")
+        exit_seconds = c["exit_min"].astype(np.int64) * 60 + c["exit_sec"]
+        entry_seconds = c["entry_min"].astype(np.int64) * 60 + c["entry_sec"]
+        duration = np.where(known, c["duration"], np.where(has_exit, (exit_seconds - entry_seconds) // 60, 0))
+        stores = sorted({store.lower() for store, _ in self.validations})
+        store_codes = np.array([-1] + [stores.index(store.lower()) for store, _ in self.validations],
+                               dtype=np.int16)
+        epoch_day = _EPOCH.toordinal()
+        return TicketColumns(
+            ticket_id=c["ticket_id"],
+            zone=c["zone"],
+            tier=c["tier"],
+            day=day,
+            duration=duration.astype(np.int64),
+            lost=lost,
+            store=store_codes[c["validation"]],
+            spend=c["spend_cents"] / 100.0,
+            has_exit=has_exit,
+            entry_day=entry_day,
+            exit_day=(c["exit_min"] // 1440 + epoch_day).astype(np.int32),
+            exit_second=(c["exit_min"] % 1440 * 60 + c["exit_sec"]).astype(np.int32),
+            zones=self.zones,
+            tiers=self.tiers,
+            stores=tuple(stores),
+        )
+
+    def iter_records(self):
+        """Raw record tuples (in FIELDS order) straight from the map."""
+        end = self.offset + self.count * RECORD.size
+        return RECORD.iter_unpack(memoryview(self._map)[self.offset:end])
+
+    def __iter__(self):
+        """Tickets decoded back to tickets_completed.json records."""
+        for rec in self.iter_records():
+            yield self._unpack(rec)
+
+    def _unpack(self, rec):
+        (ticket_id, entry_min, exit_min, duration, spend_cents, total_cents, penalty_cents,
+         zone, tier, day_type, validation, flags, entry_sec, exit_sec) = rec
+        ticket = {
+            "ticket_id": ticket_id,
+            "zone": self.zones[zone],
+            "member_tier": self.tiers[tier],
+            "entry_time": _from_minutes(entry_min, entry_sec, flags & ENTRY_SECONDS),
+            "exit_time": _from_minutes(exit_min, exit_sec, flags & EXIT_SECONDS),
+            "day_type": self.day_types[day_type],
+            "lost_ticket": bool(flags & LOST),
+            "validation": None,
+            "duration_minutes": None if duration == NO_VALUE else duration,
+        }
+        if ticket["day_type"] is None:
+            del ticket["day_type"]
+        if validation:
+            store, kind = self.validations[validation - 1]
+            spend = spend_cents // 100 if spend_cents % 100 == 0 else spend_cents / 100
+            ticket["validation"] = {"store": store, "kind": kind, "spend": spend}
+        if flags & HAS_TOTAL:
+            ticket["total"] = total_cents / 100
+        if flags & HAS_BREAKDOWN:
+            lost = flags & LOST
+            ticket["time_charge"] = (total_cents - penalty_cents) / 100
+            ticket["overnight_penalty"] = 0.0 if lost else penalty_cents / 100
+            ticket["lost_ticket_penalty"] = penalty_cents / 100 if lost else 0.0
+        return ticket
+
+
+def json_to_archive(archive_path, filename=COMPLETED_FILE):
+    """
+    Convert a ticket file in DATA_DIR (snapshot plus journal, streamed) to an archive;
+    COMPLETED_FILE stands for all completed tickets, in their date partitions if any.
+    """
+    tickets = iter_completed() if filename == COMPLETED_FILE else iter_tickets(filename)
+    return write_archive(archive_path, tickets)
+
+
+def archive_to_json(archive_path, filename=COMPLETED_FILE):
+    """Convert an archive back to a ticket file in DATA_DIR (streamed)."""
+    with Archive(archive_path) as archive:
+        write_tickets(filename, iter(archive))
+
+
+def _pack(t, vocab):
+    validation = t.get("validation")
+    v_code, spend_cents = 0, 0
+    if validation:
+        key = (validation.get("store", ""), validation.get("kind"))
+        v_code = vocab["validations"].setdefault(key, len(vocab["validations"])) + 1
+        spend_cents = _cents(validation.get("spend", 0))
+    flags = LOST if t.get("lost_ticket") else 0
+    total = t.get("total")
+    if total is not None:
+        flags |= HAS_TOTAL
+    penalty = 0
+    if "time_charge" in t:
+        # a lost ticket pays only its penalty, any other stay at most the overnight one
+        flags |= HAS_BREAKDOWN
+        overnight, lost = _cents(t.get("overnight_penalty") or 0), _cents(t.get("lost_ticket_penalty") or 0)
+        if overnight if t.get("lost_ticket") else lost:
+            raise ValueError(f"Ticket {t['ticket_id']} has a penalty its stay cannot incur")
+        penalty = lost if t.get("lost_ticket") else overnight
+    entry_min, entry_sec, entry_has_seconds = _to_minutes(t.get("entry_time"))
+    exit_min, exit_sec, exit_has_seconds = _to_minutes(t.get("exit_time"))
+    flags |= (ENTRY_SECONDS if entry_has_seconds else 0) | (EXIT_SECONDS if exit_has_seconds else 0)
+    duration = t.get("duration_minutes")
+    return RECORD.pack(
+        t["ticket_id"],
+        entry_min,
+        exit_min,
+        NO_VALUE if duration is None else duration,
+        spend_cents,
+        0 if total is None else _cents(total),
+        penalty,
+        _code(vocab["zones"], t["zone"]),
+        _code(vocab["tiers"], t["member_tier"]),
+        _code(vocab["day_types"], t.get("day_type")),
+        v_code,
+        flags,
+        entry_sec,
+        exit_sec,
+    )
+
+
+def _code(names, name):
+    code = names.setdefault(name, len(names))
+    if code > 255:
+        raise ValueError(f"More than 256 distinct values (at {name!r})")
+    return code
+
+
+def _cents(amount):
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def _to_minutes(timestamp):
+    # (minutes since _EPOCH, seconds past them, whether the timestamp spelled out seconds)
+    if not timestamp:
+        return NO_VALUE, 0, False
+    dt = datetime.fromisoformat(timestamp)
+    minutes = (dt - _EPOCH) // timedelta(minutes=1)
+    return minutes, dt.second, bool(dt.second or len(timestamp) > len("YYYY-MM-DDTHH:MM"))
+
+
+def _from_minutes(minutes, seconds=0, with_seconds=False):
+    if minutes == NO_VALUE:
+        return None
+    dt = _EPOCH + timedelta(minutes=minutes, seconds=seconds)
+    return dt.isoformat(timespec="seconds" if with_seconds else "minutes")
+
+
+if __name__ == "__main__":
+    command, *args = sys.argv[1:] or ["pack"]
+    if command == "pack":
+        name = args[0] if args else COMPLETED_FILE
+        target = args[1] if len(args) > 1 else DATA_DIR / (Path(name).stem + ".arc")
+        print(f"{json_to_archive(target, name)} tickets -> {target}")
+    elif command == "unpack":
+        source = args[0] if args else DATA_DIR / (Path(COMPLETED_FILE).stem + ".arc")
+        archive_to_json(source, args[1] if len(args) > 1 else COMPLETED_FILE)
+    else:
+        sys.exit("usage: python -m src.archive pack|unpack [source] [target]")
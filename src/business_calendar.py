@@ -0,0 +1,170 @@
+"""
+Day types from the calendar, so a ticket no longer needs a hand-entered day_type: WEEKEND
+for Saturday and Sunday, PUBLIC_HOLIDAY for dates in data/holidays.json, else WEEKDAY.
+
+The holiday file is compiled once into a DayIndex: one byte per day (a code into
+DAY_TYPES) for every day of the years the file covers, indexed by date ordinal, so a
+lookup is a subtraction and an index. Dates outside those years get weekday/weekend only,
+with a HolidayDataWarning (once per year and index): extend the file before the year starts.
+
+    day_type_for("2025-12-25T10:00")          # "PUBLIC_HOLIDAY"
+    day_types(entry_times)                    # batch: one parse per distinct date
+    day_index().codes(ordinals)               # NumPy int8 codes for an ordinal array
+
+An explicit day_type on a ticket always wins (ticket_day_type); the calendar only fills in
+a missing one.
+"""
+import json
+import warnings
+from datetime import date, datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+    np = None
+
+from src.tariff import DAY_KEYS
+
+HOLIDAY_FILE = Path("data") / "holidays.json"
+
+# Day type codes, in the order used by src.vector_engine.
+DAY_TYPES = tuple(DAY_KEYS)
+WEEKDAY, WEEKEND, PUBLIC_HOLIDAY = range(3)
+
+_index = None
+
+
+class HolidayDataWarning(UserWarning):
+    """A day type was looked up for a year the holiday file does not cover."""
+
+
+class DayIndex:
+    """Day type code per date ordinal for whole years (first .. last)."""
+
+    __slots__ = ("first", "table", "warned")
+
+    def __init__(self, holidays=()):
+        holidays = [_as_date(d) for d in holidays]
+        self.warned = set()
+        if not holidays:
+            self.first, self.table = 1, b""  # no year covered
+            return
+        years = [d.year for d in holidays]
+        self.first = date(min(years), 1, 1).toordinal()
+        last = date(max(years), 12, 31).toordinal()
+        table = bytearray(_weekday_code(o) for o in range(self.first, last + 1))
+        for d in holidays:
+            table[d.toordinal() - self.first] = PUBLIC_HOLIDAY
+        self.table = bytes(table)  # immutable, so codes() can view it without a copy
+
+    @classmethod
+    def from_file(cls, path=HOLIDAY_FILE):
+        """Index for the holidays in a {"holidays": {"YYYY-MM-DD": name}} file (none if it is missing)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f)["holidays"])
+        except FileNotFoundError:
+            return cls()
+
+    def code(self, ordinal):
+        """Day type code for a date ordinal."""
+        i = ordinal - self.first
+        if 0 <= i < len(self.table):
+            return self.table[i]
+        self._uncovered((ordinal,))
+        return _weekday_code(ordinal)
+
+    def day_type(self, when):
+        """Day type name for a date, datetime or ISO date/datetime string."""
+        return DAY_TYPES[self.code(_as_date(when).toordinal())]
+
+    def codes(self, ordinals):
+        """Codes for a sequence of ordinals: a NumPy int8 array when NumPy is available, else a list."""
+        if np is None:
+            return [self.code(o) for o in ordinals]
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        i = ordinals - self.first
+        inside = (i >= 0) & (i < len(self.table))
+        table = np.frombuffer(self.table, dtype=np.int8)
+        out = np.where((ordinals + 6) % 7 >= 5, WEEKEND, WEEKDAY).astype(np.int8)
+        out[inside] = table[i[inside]]
+        if not inside.all():
+            self._uncovered(np.unique(ordinals[~inside]).tolist())
+        return out
+
+    def _uncovered(self, ordinals):
+        years = {date.fromordinal(o).year for o in ordinals} - self.warned
+        if years:
+            self.warned.update(years)
+            warnings.warn(f"No holiday data for {', '.join(map(str, sorted(years)))}: public holidays "
+                          f"there resolve as WEEKDAY or WEEKEND", HolidayDataWarning, stacklevel=3)
+
+
+def day_index():
+    """The DayIndex for HOLIDAY_FILE, built on first use (see reload_holidays)."""
+    global _index
+    if _index is None:
+        _index = DayIndex.from_file(HOLIDAY_FILE)
+    return _index
+
+
+def reload_holidays(path=None):
+    """Rebuild the shared index (after editing the holiday file); returns it."""
+    global _index
+    _index = DayIndex.from_file(path or HOLIDAY_FILE)
+    return _index
+
+
+def day_type_for(when):
+    """WEEKDAY, WEEKEND or PUBLIC_HOLIDAY for a date, datetime or ISO string."""
+    return day_index().day_type(when)
+
+
+def day_types(values):
+    """
+    day_type_for over many ISO timestamps, parsing each distinct date once; None for a
+    value that is not a timestamp (as compute_fee treats it).
+    """
+    index = day_index()
+    seen = {}
+    out = []
+    for value in values:
+        key = value[:10] if isinstance(value, str) else value
+        if key in seen:
+            out.append(seen[key])
+            continue
+        try:
+            name = index.day_type(key)
+        except (TypeError, ValueError):
+            name = None
+        if isinstance(key, str):
+            seen[key] = name
+        out.append(name)
+    return out
+
+
+def ticket_day_type(ticket):
+    """
+    The ticket's own day_type, else the one for its entry_time; None if it has neither
+    (no or an unparseable entry_time), which compute_fee prices as Fee().
+    """
+    if ticket.get("day_type"):
+        return ticket["day_type"]
+    try:
+        return day_type_for(ticket.get("entry_time"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_date(when):
+    if isinstance(when, datetime):
+        return when.date()
+    if isinstance(when, date):
+        return when
+    return date.fromisoformat(when[:10])
+
+
+def _weekday_code(ordinal):
+    # ordinal 1 (0001-01-01) is a Monday
+    return WEEKEND if (ordinal + 6) % 7 >= 5 else WEEKDAY
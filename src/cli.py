@@ -0,0 +1,263 @@
+"""
+Non-interactive command line (python -m src). Input and output are JSON lines, processed
+in fixed-size batches, so memory stays flat however long the stream is.
+
+    python -m src price    < stays.jsonl   > fees.jsonl
+    python -m src price --segmented < stays.jsonl   (multi-day stays billed per business day)
+    python -m src close    < exits.jsonl   > completed.jsonl
+    python -m src close --all --at 2025-11-01T22:00
+    python -m src receipts [--from 9001] [--to 9100] [--start 2025-11-01] [--end 2025-11-02]
+    python -m src --policy data/policy.json price < stays.jsonl   (any command; see src.policy_store)
+
+price: each line is a ticket record (tickets_pending.json shape) plus "exit_time" and/or
+"duration_minutes"; each output line holds the fee breakdown (amounts as strings). A
+missing "day_type" is taken from the calendar (src.business_calendar), here and in close.
+close: each line is {"ticket_id": ..., "exit_time": ...} or {"ticket_id": ..., "lost_ticket":
+true}; the priced tickets are journalled to completed and dropped from pending, and the
+completed records are echoed. A line that cannot be handled produces {"ticket_id": ...,
+"error": ...} in its place and the exit status is 1.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+
+from src import data_manager, rollups
+from src.business_calendar import ticket_day_type
+from src.data_manager import COMPLETED_FILE, PENDING_FILE, TicketStore, iter_completed, iter_tickets
+from src.fee_engine import FEE_COLUMNS, compute_fee, compute_fees
+from src.policy import POLICY
+from src.policy_store import load_policy
+from src.receipts import write_receipts
+from src.segments import compute_stay_fee
+
+BATCH_SIZE = 10_000
+
+
+def price(lines, out, policy=POLICY, batch_size=BATCH_SIZE, segmented=False):
+    """
+    Price JSONL stays from `lines` into `out`; returns the number of failed lines. With
+    segmented=True multi-day stays are billed per business day (src.segments).
+    """
+    failed = 0
+    for batch in _batches(lines, batch_size):
+        stays = [t for t in batch if isinstance(t, dict)]
+        if segmented:
+            fees = [_price_segmented(t, policy) for t in stays]
+        else:
+            try:
+                fees = fee_rows(compute_fees(stays, policy))
+            except (KeyError, TypeError, ValueError):
+                # somewhere in the batch is a bad stay: price line by line to report it in place
+                fees = [_price_one(t, policy) for t in stays]
+        fees = iter(fees)
+        for t in batch:
+            row = next(fees) if isinstance(t, dict) else _error(None, _not_a_record(t))
+            failed += "error" in row
+            out.write(json.dumps(row) + "\n")
+    return failed
+
+
+def close(lines, out, policy=POLICY, batch_size=BATCH_SIZE):
+    """
+    Complete pending tickets from JSONL exits; returns the number of failed lines. Each
+    batch is journalled to completed (or its date partitions) before it leaves pending,
+    so a crash in between never loses a ticket. Tickets closed meanwhile by another
+    writer (a gate, another close) are reported as no longer pending.
+    """
+    store = TicketStore()
+    failed = 0
+    for batch in _batches(lines, batch_size):
+        rows, done = [], {}
+        for stop in batch:
+            try:
+                if not isinstance(stop, dict):
+                    raise ValueError(_not_a_record(stop))
+                ticket_id = stop.get("ticket_id")
+                ticket = None if ticket_id in done else store.get_pending(ticket_id)
+                if ticket is None:
+                    raise ValueError(f"No pending ticket {ticket_id}")
+                row = done[ticket_id] = completed_record(ticket, stop, policy)
+            except (KeyError, TypeError, ValueError) as e:
+                row = _error(stop, e)
+            rows.append(row)
+        stored = {t["ticket_id"] for t in store_completed(list(done.values()), policy, store)}
+        for row in rows:
+            if "error" not in row and row["ticket_id"] not in stored:
+                row = _error(row, ValueError(f"No pending ticket {row['ticket_id']}"))
+            failed += "error" in row
+            out.write(json.dumps(row) + "\n")
+    return failed
+
+
+def receipts(out, first=None, last=None, start=None, end=None, policy=POLICY):
+    """Render receipts for completed tickets with first <= ticket_id <= last; returns the count."""
+    selected = (t for t in iter_completed(start, end)
+                if (first is None or t["ticket_id"] >= first) and (last is None or t["ticket_id"] <= last))
+    return write_receipts(out, selected, policy)
+
+
+def _batches(lines, size):
+    """Decoded JSON lines in lists of `size`; undecodable lines come through as the exception."""
+    decoded = (_decode(line) for line in lines if line.strip())
+    while batch := list(islice(decoded, size)):
+        yield batch
+
+
+def _decode(line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+def fee_rows(columns):
+    """compute_fees columns -> one JSON-ready dict per ticket (amounts as strings)."""
+    return [_fee_row(*values) for values in zip(*(columns[name] for name in FEE_COLUMNS))]
+
+
+def _fee_row(ticket_id, time_charge, member_free_minutes, validation_hours, overnight, lost_ticket, total):
+    return {
+        "ticket_id": ticket_id,
+        "total": str(total),
+        "time_charge": str(time_charge),
+        "member_free_minutes": member_free_minutes,
+        "validation_hours": validation_hours,
+        "overnight": str(overnight),
+        "lost_ticket": str(lost_ticket),
+    }
+
+
+def _price_one(t, policy):
+    try:
+        return fee_rows(compute_fees([t], policy))[0]
+    except (KeyError, TypeError, ValueError) as e:
+        return _error(t, e)
+
+
+def _price_segmented(t, policy):
+    try:
+        fee = compute_stay_fee(t["entry_time"], t.get("exit_time"), t["zone"], t["member_tier"],
+                               validation=t.get("validation"), lost_ticket=bool(t.get("lost_ticket")),
+                               policy=policy, day_type=t.get("day_type"))
+    except (KeyError, TypeError, ValueError) as e:
+        return _error(t, e)
+    return _fee_row(t.get("ticket_id"), fee.time_charge, fee.member_free_minutes, fee.validation_hours,
+                    fee.penalties.overnight, fee.penalties.lost_ticket, fee.total)
+
+
+def completed_record(ticket, stop, policy):
+    """The completed record (tickets_completed.json shape) for a pending ticket and its exit."""
+    lost = bool(stop.get("lost_ticket"))
+    exit_time = duration = None
+    if not lost:
+        exit_time = stop.get("exit_time")
+        if not exit_time:
+            raise ValueError("No exit_time")
+        seconds = (datetime.fromisoformat(exit_time) - datetime.fromisoformat(ticket["entry_time"])).total_seconds()
+        if seconds < 0:
+            raise ValueError("Exit time cannot be earlier than entry time")
+        duration = int(seconds // 60)
+    day_type = ticket_day_type(ticket)
+    fee = compute_fee(
+        duration_minutes=duration or 0,
+        zone=ticket["zone"],
+        day_type=day_type,
+        member_tier=ticket["member_tier"],
+        validation=ticket.get("validation"),
+        lost_ticket=lost,
+        entry_at=ticket.get("entry_time"),
+        exit_at=exit_time,
+        policy=policy,
+    )
+    return {
+        "ticket_id": ticket["ticket_id"],
+        "zone": ticket["zone"],
+        "member_tier": ticket["member_tier"],
+        "entry_time": ticket.get("entry_time"),
+        "exit_time": exit_time,
+        "day_type": day_type,
+        "lost_ticket": lost,
+        "validation": ticket.get("validation"),
+        "duration_minutes": duration,
+        "total": float(fee.total),
+        # fee.time_charge is zero for overnight stays (the total carries it): derive it
+        "time_charge": float(fee.total - fee.penalties.overnight - fee.penalties.lost_ticket),
+        "overnight_penalty": float(fee.penalties.overnight),
+        "lost_ticket_penalty": float(fee.penalties.lost_ticket),
+    }
+
+
+def store_completed(tickets, policy=POLICY, store=None):
+    """
+    Journal completed records (to their date partitions, if any), drop them from pending,
+    then add them to the revenue rollups; returns the records stored. The pending check,
+    the journalling and the removal happen under the pending file's lock, so a record
+    whose ticket another writer closed meanwhile is left out and no ticket completes
+    twice. `store` (a TicketStore) answers the check and keeps its resident set current.
+    The rollups go last, still under the lock (so rollups.rebuild sees each close whole or
+    not at all): a crash before them leaves the tickets closed and the rollups short
+    (rollups.rebuild), never counted twice by a re-run.
+    """
+    store = store or TicketStore()
+    with data_manager.locked(PENDING_FILE):
+        tickets = [t for t in tickets if store.get_pending(t["ticket_id"]) is not None]
+        if not data_manager.partitioned():
+            data_manager.append_tickets(COMPLETED_FILE, tickets)
+        else:
+            by_partition = {}
+            for t in tickets:
+                by_partition.setdefault(data_manager.partition_for(t), []).append(t)
+            for name, group in by_partition.items():
+                data_manager.append_tickets(name, group)
+        store.remove_tickets(PENDING_FILE, [t["ticket_id"] for t in tickets])
+        rollups.record_completed(tickets, policy)
+    return tickets
+
+
+def _not_a_record(value):
+    return value if isinstance(value, Exception) else f"Expected a JSON object, got {value!r}"
+
+
+def _error(record, error):
+    ticket_id = record.get("ticket_id") if isinstance(record, dict) else None
+    if isinstance(error, KeyError):
+        return {"ticket_id": ticket_id, "error": f"Missing {error.args[0]!r}"}
+    return {"ticket_id": ticket_id, "error": str(error)}
+
+
+def _close_all(at):
+    """Exit lines closing every pending ticket at one time (end-of-day sweep)."""
+    for t in iter_tickets(PENDING_FILE):
+        yield json.dumps({"ticket_id": t["ticket_id"], "exit_time": at})
+
+
+def main(argv=None, stdin=None, stdout=None):
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    parser = argparse.ArgumentParser(prog="python -m src", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--policy", help="policy file (JSON or TOML) instead of the built-in POLICY")
+    commands = parser.add_subparsers(dest="command", required=True)
+    price_cmd = commands.add_parser("price", help="price JSONL stays from stdin")
+    price_cmd.add_argument("--segmented", action="store_true",
+                           help="bill multi-day stays per business day (needs entry_time and exit_time)")
+    close_cmd = commands.add_parser("close", help="complete pending tickets from JSONL exits on stdin")
+    close_cmd.add_argument("--all", action="store_true", help="close every pending ticket (needs --at)")
+    close_cmd.add_argument("--at", help="exit time for --all (YYYY-MM-DDTHH:MM)")
+    receipts_cmd = commands.add_parser("receipts", help="render receipts for completed tickets")
+    receipts_cmd.add_argument("--from", dest="first", type=int, help="first ticket ID")
+    receipts_cmd.add_argument("--to", dest="last", type=int, help="last ticket ID")
+    receipts_cmd.add_argument("--start", help="only tickets entered on/after this date")
+    receipts_cmd.add_argument("--end", help="only tickets entered before this date")
+    args = parser.parse_args(argv)
+    policy = load_policy(args.policy) if args.policy else POLICY
+
+    if args.command == "price":
+        return 1 if price(stdin, stdout, policy, segmented=args.segmented) else 0
+    if args.command == "close":
+        if args.all and not args.at:
+            parser.error("close --all needs --at")
+        return 1 if close(_close_all(args.at) if args.all else stdin, stdout, policy) else 0
+    receipts(stdout, args.first, args.last, args.start, args.end, policy)
+    return 0
@@ -1,16 +1,657 @@
 import json
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import count
 from pathlib import Path
 
+from src import instrumentation
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX: writes stay atomic but are not locked
+    fcntl = None
+
+PENDING_FILE = "tickets_pending.json"
+COMPLETED_FILE = "tickets_completed.json"
+
 DATA_DIR = Path("data")
 
+# Journal size that triggers compaction into the snapshot (the plain JSON file).
+COMPACT_BYTES = 1024 * 1024
+
+# Bytes read per step by iter_tickets.
+STREAM_CHUNK = 64 * 1024
+
+# Completed tickets partitioned by entry date: DATA_DIR/completed/YYYY-MM-DD.json, each an
+# ordinary ticket file (snapshot plus journal). Tickets without an entry_time go to "undated".
+PARTITION_DIR = "completed"
+UNDATED = "undated"
+
+# Tickets buffered per flush by partition_completed.
+PARTITION_BATCH = 50_000
+
+
+# Readers take no lock. A snapshot is only ever replaced by an atomic rename, and only a
+# replacement discards the journal, so a reader reads the journal first and then opens the
+# snapshot, checking that it is still the file that was current before the journal was
+# read (_open_consistent); if a compaction replaced it in between, the reader starts over.
+# Writers hold an exclusive fcntl lock on "<file>.lock" (see locked()).
+#
+# Replacing a snapshot that has a journal goes through "<file>.next" (_commit): the new
+# snapshot is written there, then the journal is deleted, then "<file>.next" is renamed
+# over the file. Deleting the journal is the commit point, so the journal is never
+# replayed onto a snapshot that already holds it: while "<file>.next" exists, it is the
+# snapshot if the journal is gone and is ignored otherwise. The next writer to take the
+# lock finishes or discards a replacement interrupted by a crash (_recover).
+
+
 def load_tickets(filename):
+    """Load the snapshot (a JSON array) and replay its journal on top, if there is one."""
+    if not instrumentation.ENABLED:
+        return _load(DATA_DIR / filename)
+    with instrumentation.timed("storage_seconds", op="load_tickets"):
+        tickets = _load(DATA_DIR / filename)
+    instrumentation.count("storage_tickets_total", len(tickets), op="load_tickets")
+    return tickets
+
+def save_tickets(filename, data):
+    """Replace the whole ticket set; the journal is folded in, so it is discarded."""
+    if not instrumentation.ENABLED:
+        save_journaled(filename, data)
+        return
+    with instrumentation.timed("storage_seconds", op="save_tickets"):
+        save_journaled(filename, data)
+    instrumentation.count("storage_tickets_total", len(data), op="save_tickets")
+
+
+def _load(path):
+    tickets, entries = _read_consistent(path)
+    return _replay(tickets, entries) if entries else tickets
+
+
+def load_journaled(filename, fold):
+    """
+    Contents of a file kept by append_journal, read without the lock like load_tickets:
+    fold(snapshot, journal entries), the same fold append_journal compacts with.
+    """
+    snapshot, entries = _read_consistent(DATA_DIR / filename)
+    return fold(snapshot, entries) if entries else snapshot
+
+
+def save_journaled(filename, data):
+    """Replace a file kept by append_journal with data (a JSON list) and discard its journal."""
+    path = DATA_DIR / filename
+    with _locked(path):
+        _save(path, data)
+
+
+def _read_consistent(path):
+    entries, f = _open_consistent(path)
+    if f is None:
+        return [], entries
+    with f:
+        return json.load(f), entries
+
+
+def _open_consistent(path):
+    """
+    (journal entries, open snapshot file or None) that belong together: the snapshot is
+    opened after the journal is read and must be the one that was in place before, so no
+    compaction can fold journal entries into a snapshot this reader never sees.
+    """
+    journal = journal_path(path)
+    staged = staged_path(path)
+    while True:
+        before = _snapshot_id(path)
+        staged_before = _snapshot_id(staged)
+        try:
+            entries = list(_journal_entries(journal))
+        except FileNotFoundError:
+            entries = None
+        if entries is None and staged_before is not None:
+            # a replacement past its commit point: the staged file is the snapshot
+            source, expected = staged, staged_before
+        else:
+            source, expected = path, before
+        try:
+            f = open(source, "r", encoding="utf-8")
+        except FileNotFoundError:
+            if expected is None and _snapshot_id(staged) == staged_before:
+                return entries or [], None
+            continue
+        st = os.fstat(f.fileno())
+        # a replacement that started after `before` was taken may have deleted the journal
+        # before it was read, so the staged file must not have changed either
+        if (st.st_ino, st.st_mtime_ns) == expected and _snapshot_id(staged) == staged_before:
+            return entries or [], f
+        f.close()
+
+
+def _snapshot_id(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def update_tickets(filename, update):
+    """
+    Read-modify-write under the file lock: update(tickets) may edit the list in place or
+    return a new one. Concurrent updates from other processes are serialised, never lost.
+    """
+    path = DATA_DIR / filename
+    with _locked(path):
+        tickets = load_tickets(filename)
+        result = update(tickets)
+        _save(path, tickets if result is None else result)
+
+
+@contextmanager
+def locked(filename):
+    """
+    Hold the exclusive writer lock for a ticket file (e.g. around a custom read-modify-write).
+    The lock is re-entrant within a thread, so the writes in this module can be called inside.
+    """
+    with _locked(DATA_DIR / filename):
+        yield
+
+
+# lock file -> [threading.RLock, depth]. A second flock on a new descriptor would wait for
+# the one this process already holds, so nested holders only count, and the RLock keeps
+# the other threads of the process out.
+_HELD = {}
+_HELD_GUARD = threading.Lock()
+
+
+@contextmanager
+def _locked(path):
+    lock_file = os.path.abspath(path.with_name(path.name + ".lock"))
+    with _HELD_GUARD:
+        held = _HELD.setdefault(lock_file, [threading.RLock(), 0])
+    with held[0]:
+        if held[1]:
+            held[1] += 1
+            try:
+                yield
+            finally:
+                held[1] -= 1
+            return
+        with _flock(lock_file):
+            _recover(path)
+            held[1] = 1
+            try:
+                yield
+            finally:
+                held[1] = 0
+
+
+@contextmanager
+def _flock(lock_file):
+    if fcntl is None:
+        yield
+        return
+    with open(lock_file, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def staged_path(path):
+    """tickets_pending.json -> tickets_pending.json.next (a snapshot being put in place)"""
+    path = Path(path)
+    return path.with_name(path.name + ".next")
+
+
+def _recover(path):
+    # finish (journal gone) or discard (journal kept) a replacement cut short by a crash
+    staged = staged_path(path)
+    if staged.exists():
+        if journal_path(path).exists():
+            staged.unlink()
+        else:
+            os.replace(staged, path)
+
+
+def _save(path, data):
+    _commit(path, lambda f: json.dump(data, f, indent=2))
+
+
+def _commit(path, write):
+    """Replace the snapshot with what write(f) writes and discard the journal (see above)."""
+    journal = journal_path(path)
+    if not journal.exists():
+        _atomic_write(path, write)
+        return
+    staged = staged_path(path)
+    _atomic_write(staged, write, mode_of=path)
+    journal.unlink()
+    os.replace(staged, path)
+
+
+def _atomic_write(path, write, mode_of=None):
+    """
+    Write via a unique temp file in the same directory, fsync, then os.replace over path
+    (with the permissions of mode_of, default path, if it exists).
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(mode_of or path).st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def iter_tickets(filename):
+    """
+    Yield tickets one at a time without loading the whole file: the snapshot array is
+    decoded incrementally and the (small, bounded) journal is applied on the fly.
+    Yields the same tickets, in the same order, as load_tickets.
+    """
+    entries, f = _open_consistent(DATA_DIR / filename)
+    puts, dels = {}, set()
+    for entry in entries:
+        if entry["op"] == "put":
+            puts[entry["ticket"]["ticket_id"]] = entry["ticket"]
+        elif entry["op"] == "del":
+            # a ticket deleted and put again moves to the end, as in _replay: its
+            # snapshot position stays skipped
+            puts.pop(entry["ticket_id"], None)
+            dels.add(entry["ticket_id"])
+    if f is not None:
+        with f:
+            for t in _stream_array(f):
+                tid = t["ticket_id"]
+                if tid in dels:
+                    continue
+                yield puts.pop(tid, t)
+    yield from puts.values()
+
+
+def write_tickets(filename, tickets):
+    """
+    Stream tickets (any iterable) into the file in save_tickets' format, one record at a
+    time, via a temp file renamed over the target; the journal is discarded.
+    """
+    def write(f):
+        first = True
+        for t in tickets:
+            f.write("[\n  " if first else ",\n  ")
+            f.write(json.dumps(t, indent=2).replace("\n", "\n  "))
+            first = False
+        f.write("[]" if first else "\n]")
+
     path = DATA_DIR / filename
+    with _locked(path):
+        _commit(path, write)
+
+
+def _stream_array(f):
+    """Decode the objects of a top-level JSON array (an open text file) one by one."""
+    decoder = json.JSONDecoder()
+    buf = f.read(STREAM_CHUNK).lstrip()
+    if not buf.startswith("["):
+        raise ValueError(f"{f.name} is not a JSON array")
+    pos = 1
+    while True:
+        pos = _skip_separators(buf, pos)
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            item, pos = decoder.raw_decode(buf, pos)
+        except ValueError:
+            more = f.read(STREAM_CHUNK)
+            if not more:
+                raise
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        yield item
+
+
+def _skip_separators(buf, pos):
+    n = len(buf)
+    while pos < n and buf[pos] in " \t\r\n,":
+        pos += 1
+    return pos
+
+
+def journal_path(path):
+    """tickets_pending.json -> tickets_pending.journal.jsonl"""
+    path = Path(path)
+    return path.with_name(path.stem + ".journal.jsonl")
+
+
+def append_ticket(filename, ticket):
+    """Add (or replace, by ticket_id) one ticket with a single fsynced journal line."""
+    _append(DATA_DIR / filename, [{"op": "put", "ticket": ticket}])
+
+
+def remove_ticket(filename, ticket_id):
+    """Drop one ticket by id with a single fsynced journal line."""
+    _append(DATA_DIR / filename, [{"op": "del", "ticket_id": ticket_id}])
+
+
+def append_tickets(filename, tickets):
+    """append_ticket for many tickets: one locked write and one fsync for the whole batch."""
+    _append(DATA_DIR / filename, [{"op": "put", "ticket": t} for t in tickets])
+
+
+def remove_tickets(filename, ticket_ids):
+    """remove_ticket for many ids: one locked write and one fsync for the whole batch."""
+    _append(DATA_DIR / filename, [{"op": "del", "ticket_id": tid} for tid in ticket_ids])
+
+
+def complete_ticket(completed, pending_file=PENDING_FILE, completed_file=COMPLETED_FILE):
+    """
+    Move a ticket from pending to completed (its date partition, once completed tickets
+    are partitioned): one journal line each. The completed record is written first, so a
+    crash in between leaves the ticket in both files rather than losing it; repeating the
+    call is harmless.
+    """
+    if completed_file == COMPLETED_FILE and partitioned():
+        append_completed(completed)
+    else:
+        append_ticket(completed_file, completed)
+    remove_ticket(pending_file, completed["ticket_id"])
+
+
+def compact(filename):
+    """Fold the journal into the snapshot (written to a temp file, then renamed) and drop it."""
+    path = DATA_DIR / filename
+    with _locked(path):
+        _compact(path)
+
+
+def _compact(path, fold=None):
+    journal = journal_path(path)
+    if journal.exists():
+        _save(path, (fold or _replay)(_read_snapshot(path), _journal_entries(journal)))
+
+
+def _read_snapshot(path):
     if not path.exists():
         return []
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def save_tickets(filename, data):
-    path = DATA_DIR / filename
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+
+def _replay(tickets, entries):
+    by_id = {t["ticket_id"]: t for t in tickets}
+    for entry in entries:
+        if entry["op"] == "put":
+            ticket = entry["ticket"]
+            by_id[ticket["ticket_id"]] = ticket
+        elif entry["op"] == "del":
+            by_id.pop(entry["ticket_id"], None)
+    return list(by_id.values())
+
+
+def _journal_entries(journal):
+    with open(journal, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # torn line from a crash mid-append: that operation never completed
+                continue
+
+
+def append_journal(filename, entries, fold=None):
+    """
+    Append JSON objects to a file's journal: one locked write and one fsync for the batch.
+    Once the journal reaches COMPACT_BYTES it is folded into the snapshot under the same
+    lock by fold(snapshot, entries) -> new snapshot (default: ticket puts and deletes).
+    """
+    _append(DATA_DIR / filename, list(entries), fold)
+
+
+def _append(path, entries, fold=None):
+    if not entries:
+        return
+    with _locked(path):
+        _append_locked(path, entries, fold)
+
+
+def _append_locked(path, entries, fold=None):
+    journal = journal_path(path)
+    line = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+    with open(journal, "a", encoding="utf-8") as f:
+        # a torn line left by an earlier crash must not swallow this one
+        if f.tell() > 0 and not _ends_with_newline(journal):
+            line = "\n" + line
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    if size >= COMPACT_BYTES:
+        _compact(path, fold)
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def partition_for(ticket):
+    """Partition file (relative to DATA_DIR) holding a completed ticket, by entry date."""
+    return f"{PARTITION_DIR}/{(ticket.get('entry_time') or '')[:10] or UNDATED}.json"
+
+
+def partitioned():
+    """True once completed tickets are stored by date (the partition directory exists)."""
+    return (DATA_DIR / PARTITION_DIR).is_dir()
+
+
+def iso_bound(value):
+    """
+    A date, datetime or ISO string as the string entry_time values are compared with (None
+    stays None). A datetime on the minute is written without seconds, as entry times are,
+    so it bounds "YYYY-MM-DDTHH:MM" stamps the way the datetime itself would.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime) and not (value.second or value.microsecond):
+        return value.isoformat(timespec="minutes")
+    return value.isoformat()
+
+
+def partition_days(start=None, end=None):
+    """
+    Sorted partition days ("YYYY-MM-DD") that can hold tickets entered in [start, end),
+    decided from file names alone. Bounds are as for iso_bound; None is open-ended.
+    The undated partition is only listed when neither bound is given.
+    """
+    folder = DATA_DIR / PARTITION_DIR
+    if not folder.is_dir():
+        return []
+    days = {p.name.split(".", 1)[0] for p in folder.iterdir() if p.name.endswith((".json", ".json.next", ".journal.jsonl"))}
+    if start is None and end is None:
+        return sorted(days)
+    days.discard(UNDATED)
+    lo = iso_bound(start)[:10] if start is not None else None
+    hi = iso_bound(end)
+    return sorted(d for d in days if (lo is None or d >= lo) and (hi is None or d < hi))
+
+
+def iter_completed(start=None, end=None):
+    """
+    Stream completed tickets entered in [start, end) (dates, datetimes or ISO strings;
+    None is open). With partitions only the overlapping day files are opened; otherwise
+    the single completed file is streamed and filtered.
+    """
+    lo, hi = iso_bound(start), iso_bound(end)
+    if partitioned():
+        sources = (iter_tickets(f"{PARTITION_DIR}/{day}.json") for day in partition_days(start, end))
+    else:
+        sources = (iter_tickets(COMPLETED_FILE),)
+    for tickets in sources:
+        for t in tickets:
+            if lo is None and hi is None:
+                yield t
+                continue
+            entered = t.get("entry_time") or ""
+            if entered and (lo is None or entered >= lo) and (hi is None or entered < hi):
+                yield t
+
+
+def append_completed(ticket):
+    """Journal a completed ticket into its date partition."""
+    (DATA_DIR / PARTITION_DIR).mkdir(exist_ok=True)
+    append_ticket(partition_for(ticket), ticket)
+
+
+def partition_completed(filename=COMPLETED_FILE):
+    """
+    Split a single completed-ticket file into date partitions (merged by ticket_id into
+    any existing ones); returns the number of tickets copied. The source file is left
+    in place.
+    """
+    (DATA_DIR / PARTITION_DIR).mkdir(exist_ok=True)
+    batch, count = {}, 0
+    for t in iter_tickets(filename):
+        batch.setdefault(partition_for(t), []).append(t)
+        count += 1
+        if count % PARTITION_BATCH == 0:
+            _flush_partitions(batch)
+            batch = {}
+    _flush_partitions(batch)
+    return count
+
+
+def _flush_partitions(batch):
+    for name, tickets in batch.items():
+        def merge(existing, tickets=tickets):
+            by_id = {t["ticket_id"]: t for t in existing}
+            by_id.update((t["ticket_id"], t) for t in tickets)
+            return list(by_id.values())
+        update_tickets(name, merge)
+
+
+class TicketStore:
+    """
+    Resident, indexed view of the pending and completed ticket files. Tickets are kept
+    in dicts keyed by ticket_id, with secondary indexes by zone and entry date. A file
+    is re-read only when its snapshot or journal changes size or mtime. Once completed
+    tickets are partitioned, COMPLETED_FILE stands for all the partitions together (as in
+    iter_completed), re-read when any of them changes.
+    """
+
+    def __init__(self, loader=None):
+        self.loader = loader or load_tickets
+        self._sets = {}
+        self._loads = count(1)
+
+    def pending(self):
+        return list(self._set(PENDING_FILE).by_id.values())
+
+    def completed(self):
+        return list(self._set(COMPLETED_FILE).by_id.values())
+
+    def get_pending(self, ticket_id):
+        return self._set(PENDING_FILE).by_id.get(ticket_id)
+
+    def get_completed(self, ticket_id):
+        return self._set(COMPLETED_FILE).by_id.get(ticket_id)
+
+    def generation(self, filename=PENDING_FILE):
+        """
+        Number of the load behind the resident set: it changes when another writer changed
+        the file (not after this store's own remove_tickets), so anything counted from the
+        tickets, like occupancy, knows to count again.
+        """
+        return self._set(filename).generation
+
+    def by_zone(self, zone, filename=PENDING_FILE):
+        return list(self._set(filename).by_zone.get(zone, ()))
+
+    def by_entry_date(self, date, filename=COMPLETED_FILE):
+        """Tickets entered on a date ("YYYY-MM-DD" or datetime.date)."""
+        return list(self._set(filename).by_date.get(str(date), ()))
+
+    def remove_tickets(self, filename, ticket_ids):
+        """
+        remove_tickets, dropping the tickets from the resident set in place instead of
+        re-reading the file (which still happens if another writer changed it meanwhile).
+        """
+        ticket_ids = list(ticket_ids)
+        if not ticket_ids:
+            return
+        path = DATA_DIR / filename
+        with _locked(path):
+            ticket_set = self._sets.get(filename)
+            current = ticket_set is not None and ticket_set.stamp == _stamp(path)
+            _append_locked(path, [{"op": "del", "ticket_id": tid} for tid in ticket_ids])
+            if current:
+                ticket_set.discard(ticket_ids)
+                ticket_set.stamp = _stamp(path)
+
+    def _set(self, filename):
+        if filename == COMPLETED_FILE and partitioned():
+            return self._partitions()
+        stamp = _stamp(DATA_DIR / filename)
+        ticket_set = self._sets.get(filename)
+        if ticket_set is None or ticket_set.stamp != stamp:
+            ticket_set = _TicketSet(self.loader(filename), stamp, next(self._loads))
+            self._sets[filename] = ticket_set
+        return ticket_set
+
+    def _partitions(self):
+        names = [f"{PARTITION_DIR}/{day}.json" for day in partition_days()]
+        stamp = tuple((name, _stamp(DATA_DIR / name)) for name in names)
+        ticket_set = self._sets.get(PARTITION_DIR)
+        if ticket_set is None or ticket_set.stamp != stamp:
+            ticket_set = _TicketSet((t for name in names for t in self.loader(name)), stamp, next(self._loads))
+            self._sets[PARTITION_DIR] = ticket_set
+        return ticket_set
+
+
+class _TicketSet:
+    __slots__ = ("by_id", "by_zone", "by_date", "stamp", "generation")
+
+    def __init__(self, tickets, stamp, generation):
+        self.by_id = {}
+        self.by_zone = {}
+        self.by_date = {}
+        self.stamp = stamp
+        self.generation = generation
+        for t in tickets:
+            self.by_id[t["ticket_id"]] = t
+            self.by_zone.setdefault(t.get("zone"), []).append(t)
+            self.by_date.setdefault((t.get("entry_time") or "")[:10], []).append(t)
+
+    def discard(self, ticket_ids):
+        for ticket_id in ticket_ids:
+            t = self.by_id.pop(ticket_id, None)
+            if t is not None:
+                self.by_zone[t.get("zone")].remove(t)
+                self.by_date[(t.get("entry_time") or "")[:10]].remove(t)
+
+
+def _stamp(path):
+    """(size, mtime) of a ticket file's snapshot and journal; None for a missing file."""
+    stamp = []
+    for p in (path, journal_path(path)):
+        try:
+            st = os.stat(p)
+            stamp.append((st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
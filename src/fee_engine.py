@@ -1,21 +1,41 @@
+from collections import OrderedDict
+from dataclasses import dataclass
 from decimal import Decimal
 import math
-from datetime import datetime, time
+import sys
+import threading
+import time
+from datetime import datetime
 
+from src import instrumentation
+from src.business_calendar import day_type_for, day_types
+from src.tariff import CompiledPolicy, compile_policy, from_cents
 
+
+ZERO = Decimal("0.00")
+
+
+@dataclass(frozen=True, slots=True)
+class Penalties:
+    """Penalty amounts charged on top of (or instead of) the time charge."""
+
+    overnight: Decimal = ZERO
+    lost_ticket: Decimal = ZERO
+
+
+NO_PENALTIES = Penalties()
+
+
+@dataclass(frozen=True, slots=True)
 class Fee:
     """Encapsulates all computed fee details (used by tests)."""
 
-    def __init__(self):
-        self.total = Decimal("0.00")
-        self.time_charge = Decimal("0.00")
-        self.member_free_minutes = 0
-        self.validation_hours = 0
-        self.penalties = type(
-            "Penalties",
-            (),
-            {"overnight": Decimal("0.00"), "lost_ticket": Decimal("0.00")},
-        )
+    total: Decimal = ZERO
+    time_charge: Decimal = ZERO
+    member_free_minutes: int = 0
+    validation_hours: int = 0
+    penalties: Penalties = NO_PENALTIES
+    policy_version: str = None  # CompiledPolicy.version the fee was priced under
 
 
 def compute_fee(
@@ -31,31 +51,97 @@ def compute_fee(
 ):
     """
     Compute total parking fee based on duration, zone, membership tier, and rules in policy.
+    Without a day_type, the day type for entry_at comes from the calendar (src.business_calendar).
     """
-    fee = Fee()
+    if not day_type and entry_at:
+        day_type = _calendar_day(entry_at)
 
     # Step 1: Handle empty inputs 
     if not policy or not zone or not day_type or duration_minutes is None:
-        return fee
+        return Fee()
 
-    # Step 2: Apply lost-ticket penalty  
+    if type(policy) is not CompiledPolicy:
+        policy = compile_policy(policy)
+    tariff = policy.tariff(zone, day_type)
+    membership = policy.membership(member_tier)
+
+    # Parse timestamps for the 4:00 AM cut-off check (Step 7b)
+    entry_dt = exit_dt = None
+    if entry_at and exit_at and not lost_ticket:
+        try:
+            entry_dt = datetime.fromisoformat(entry_at)
+            exit_dt = datetime.fromisoformat(exit_at)
+        except Exception:
+            entry_dt = exit_dt = None
+
+    return _priced(policy, tariff, membership, duration_minutes, validation, lost_ticket, entry_dt, exit_dt)
+
+
+def _calendar_day(entry_at):
+    """Calendar day type for entry_at, or None if it is not a timestamp (compute_fee then returns Fee())."""
+    try:
+        return day_type_for(entry_at)
+    except (TypeError, ValueError):
+        return None
+
+
+def _priced(policy, tariff, membership, duration_minutes, validation, lost_ticket, entry_dt, exit_dt):
+    """_price, timed and counted when instrumentation is enabled."""
+    if not instrumentation.ENABLED:
+        return _price(policy, tariff, membership, duration_minutes, validation, lost_ticket, entry_dt, exit_dt)
+    t0 = time.perf_counter()
+    fee = _price(policy, tariff, membership, duration_minutes, validation, lost_ticket, entry_dt, exit_dt)
+    _record(policy, tariff, membership, duration_minutes, lost_ticket, fee, time.perf_counter() - t0)
+    return fee
+
+
+def _record(policy, tariff, membership, duration_minutes, lost_ticket, fee, seconds):
+    """Count which branch priced the stay and time it (instrumentation enabled only)."""
     if lost_ticket:
-        lt = policy["penalties"]["lost_ticket"]
-        if zone == "VALET":
-            penalty = lt["valet"]
+        branch = "lost_ticket"
+    elif duration_minutes < tariff.grace_minutes:
+        branch = "grace"
+    else:
+        charge = fee.total - fee.penalties.overnight
+        caps = [tariff.daily_cap]
+        if tariff.zone != "VALET":
+            caps.append(membership.daily_cap)
+        caps = [c for c in caps if c is not None]
+        cap = min(caps) if caps else None
+        if cap is not None and policy.cents:
+            cap = from_cents(cap)
+        if not charge:
+            branch = "free"
+        elif cap is not None and charge >= cap:
+            branch = "capped"
         else:
-            is_member = member_tier in ("MEMBER", "SILVER", "GOLD", "STAFF")
-            penalty = lt["member"] if is_member else lt["non_member"]
-        fee.penalties.lost_ticket = penalty
-        fee.time_charge = Decimal("0.00")
-        fee.total = penalty
-        return fee
+            branch = "charged"
+    instrumentation.count("fee_branch_total", branch=branch)
+    if fee.penalties.overnight:
+        instrumentation.count("fee_branch_total", branch="overnight")
+    if fee.validation_hours:
+        instrumentation.count("fee_branch_total", branch="validation")
+    instrumentation.observe("fee_seconds", seconds, zone=tariff.zone)
+
+
+def _price(policy, tariff, membership, duration_minutes, validation, lost_ticket, entry_dt, exit_dt):
+    """
+    Price one stay against a compiled tariff (shared by compute_fee and compute_fees).
+    Amounts are in the policy's units (Decimal, or int cents for a cents policy) until the Fee is built.
+    """
+    zone = tariff.zone
+    cents = policy.cents
+
+    # Step 2: Apply lost-ticket penalty  
+    if lost_ticket:
+        penalty = policy.lost_ticket_penalty(zone, membership.tier)
+        if cents:
+            penalty = from_cents(penalty)
+        return Fee(total=penalty, penalties=Penalties(lost_ticket=penalty), policy_version=policy.version)
 
     # Step 3: Grace period 
-    grace = policy["zones"][zone]["grace_minutes"]
-    if duration_minutes < grace:
-        fee.total = Decimal("0.00")
-        return fee
+    if duration_minutes < tariff.grace_minutes:
+        return Fee(policy_version=policy.version)
 
     # Step 4: Compute hours (round down) 
     hours = math.floor(duration_minutes / 60)
@@ -64,25 +150,165 @@ def compute_fee(
         hours = 1
 
     # Step 5a: Apply membership perks 
-    member_check = policy["memberships"].get(member_tier, {"free_hours": 0, "daily_cap": None})
-    free_hours = int(member_check.get("free_hours", 0))
-    fee.member_free_minutes = free_hours * 60
+    free_hours = membership.free_hours
     
     # Step 5b: Apply retailer validation 
     validation_hours = 0
-    if validation and not lost_ticket and zone not in ("VALET", "OUTDOOR"):
-        # check if Woolworths and spend >= threshold
-        store = validation.get("store", "").lower()
-        spend = validation.get("spend", 0)
-        partners = policy["validations"]["partners"]
-        if store in partners:
-            v = partners[store]
-            if spend >= v["min_spend"]:
-                validation_hours = v["free_hours"]
-
-    fee.validation_hours = validation_hours
-
-    # total free hours = membership + validation (stacked)
+    if validation and zone not in ("VALET", "OUTDOOR"):
+        validation_hours = validation_hours_for(policy, validation)
+
+    # Steps 5c-7: free hours, zone pricing and caps, looked up by billed hours
+    time_charge = lookup_time_charge(policy, tariff, membership, hours, validation_hours)
+        
+    # Step 7b: Apply 4:00 AM cut-off penalty (stacks with duration fee)
+    if exit_dt is not None and exit_dt.date() > entry_dt.date():
+        if exit_dt.time() > tariff.cutoff:
+            penalty = tariff.overnight_penalty
+            total = time_charge + penalty
+            if cents:
+                total, penalty = from_cents(total), from_cents(penalty)
+            # time_charge is left at zero here; the penalty total carries it
+            return Fee(total=total, member_free_minutes=free_hours * 60,
+                       validation_hours=validation_hours, penalties=Penalties(overnight=penalty),
+                       policy_version=policy.version)
+
+    # Step 8: Assign and return
+    if cents:
+        time_charge = from_cents(time_charge)
+    return Fee(total=time_charge, time_charge=time_charge, member_free_minutes=free_hours * 60,
+               validation_hours=validation_hours, policy_version=policy.version)
+
+
+class FeeCache:
+    """
+    Bounded LRU cache in front of compute_fee (same arguments, same result). Stays are keyed
+    by what actually decides the fee: zone and day type (after the weekday fallback), tier,
+    lost ticket, grace or billed hours, qualifying validation hours and whether the stay
+    crosses the cut-off. Fees are immutable, so cached ones are shared safely.
+
+    The cache belongs to one compiled policy: a call with a different CompiledPolicy (a new
+    POLICY dict, or the same dict after an edit) clears it.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._policy = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def compute_fee(self, duration_minutes=None, zone=None, day_type=None, member_tier=None, validation=None,
+                    lost_ticket=False, policy=None, entry_at=None, exit_at=None):
+        if not day_type and entry_at:
+            day_type = _calendar_day(entry_at)
+        if not policy or not zone or not day_type or duration_minutes is None:
+            return Fee()
+        if type(policy) is not CompiledPolicy:
+            policy = compile_policy(policy)
+        tariff = policy.tariff(zone, day_type)
+        membership = policy.membership(member_tier)
+
+        entry_dt = exit_dt = None
+        if lost_ticket:
+            key = (tariff.zone, membership.tier, "lost")
+        elif duration_minutes < tariff.grace_minutes:
+            key = "grace"
+        else:
+            if entry_at and exit_at:
+                try:
+                    entry_dt = datetime.fromisoformat(entry_at)
+                    exit_dt = datetime.fromisoformat(exit_at)
+                except Exception:
+                    entry_dt = exit_dt = None
+            validation_hours = 0
+            if validation and tariff.zone not in ("VALET", "OUTDOOR"):
+                validation_hours = validation_hours_for(policy, validation)
+            overnight = (exit_dt is not None and exit_dt.date() > entry_dt.date()
+                         and exit_dt.time() > tariff.cutoff)
+            key = (tariff.zone, tariff.day_type, membership.tier, max(duration_minutes // 60, 1),
+                   validation_hours, overnight)
+
+        with self._lock:
+            if policy is not self._policy:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._policy = policy
+            fee = self._entries.get(key)
+            if fee is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fee
+            self.misses += 1
+
+        fee = _priced(policy, tariff, membership, duration_minutes, validation, lost_ticket, entry_dt, exit_dt)
+        with self._lock:
+            if policy is self._policy:
+                self._entries[key] = fee
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return fee
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._policy = None
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+# Process-wide cache used by cached_compute_fee.
+FEE_CACHE = FeeCache()
+
+
+def cached_compute_fee(**kwargs):
+    """compute_fee through the shared FEE_CACHE (keyword arguments as for compute_fee)."""
+    return FEE_CACHE.compute_fee(**kwargs)
+
+
+def validation_hours_for(policy, validation):
+    """Free hours earned by a retailer validation (0 unless a partner and spend >= threshold)."""
+    # check if Woolworths and spend >= threshold
+    store = validation.get("store", "").lower()
+    spend = validation.get("spend", 0)
+    v = policy.partners.get(store)
+    if v is not None and spend >= v.min_spend:
+        return v.free_hours
+    return 0
+
+
+def lookup_time_charge(policy, tariff, membership, hours, validation_hours):
+    """Time charge for billed hours via the policy's ChargeTable (Steps 5c-7)."""
+    table = policy.tables.get((tariff.zone, tariff.day_type, membership.tier, validation_hours))
+    if table is None:
+        table = charge_table(policy, tariff, membership, validation_hours)
+    charges = table.charges
+    if hours < len(charges):
+        return charges[hours]
+    if table.plateau:
+        return charges[-1]
+    return _time_charge(policy, tariff, membership, hours, validation_hours)
+
+
+def _time_charge(policy, tariff, membership, hours, validation_hours):
+    """Time charge for a stay of `hours` billed hours after free hours and caps (Steps 5c-7)."""
+    zone = tariff.zone
+    zero = 0 if policy.cents else ZERO
+    free_hours = membership.free_hours
+
+    # Step 5c: total free hours = membership + validation (stacked)
     # Membership free-hours apply to REGULAR and PREFERRED (not OUTDOOR/VALET). STAFF has 0 free hours anyway.
     # Validation hours apply to REGULAR, PREFERRED, STAFF (not VALET/OUTDOOR).
     if zone in ("REGULAR", "PREFERRED"):
@@ -98,133 +324,193 @@ def compute_fee(
     else:
         hours_to_bill = hours
 
-    # Step 6: Zone-based pricing
-    time_charge = Decimal("0.00")
+    # Step 6: Zone-based pricing (day_type already resolved to a tariff, weekday fallback)
+    time_charge = zero
 
     # REGULAR (weekday, weekend, public holiday)
     if zone == "REGULAR":
-        rates = policy["zones"][zone]
-        if day_type == "WEEKDAY":
-            rate = rates["weekday"]
-        elif day_type == "WEEKEND":
-            rate = rates["weekend"]
-        elif day_type == "PUBLIC_HOLIDAY":
-            rate = rates["public_holiday"]
-        else:
-            # Fallback if unspecified
-            rate = rates["weekday"]
-
         # Free hours remove the flat 2h block if they cover it.
         if hours_to_bill <= 0:
-            time_charge = Decimal("0.00")
+            time_charge = zero
         elif total_free_hours >= 2:
             # already skipped first-2h flat; charge only remaining at per-hour rate
-            time_charge = rate["per_hour"] * hours_to_bill
+            time_charge = tariff.per_hour * hours_to_bill
         elif hours_to_bill <= 2 - total_free_hours:
             # still within discounted 2h bundle after partial free time
-            time_charge = rate["first2h_flat"]
+            time_charge = tariff.first2h_flat
         else:
             # partially consume flat, then per-hour for remainder
             remaining_after_flat = hours_to_bill - (2 - total_free_hours)
-            time_charge = rate["first2h_flat"] + remaining_after_flat * rate["per_hour"]
+            time_charge = tariff.first2h_flat + remaining_after_flat * tariff.per_hour
             
     # Preferred (members-only)
     elif zone == "PREFERRED":
-        rates = policy["zones"][zone]
-        if day_type == "WEEKDAY":
-            rate = rates["weekday"]
-        elif day_type == "WEEKEND":
-            rate = rates["weekend"]
-        elif day_type == "PUBLIC_HOLIDAY":
-            rate = rates["public_holiday"]
-        else:
-            rate = rates["weekday"]
-
         if hours_to_bill <= 0:
-            time_charge = Decimal("0.00")
+            time_charge = zero
         else:
-            time_charge = rate["per_hour"] * hours_to_bill
+            time_charge = tariff.per_hour * hours_to_bill
 
     # Outdoor (per-entry style)
     elif zone == "OUTDOOR":
-        rates = policy["zones"][zone]
-        if day_type == "WEEKDAY":
-            base = rates["weekday"]
-        elif day_type == "WEEKEND":
-            base = rates["weekend"]
-        elif day_type == "PUBLIC_HOLIDAY":
-            base = rates["public_holiday"]
+        if membership.tier in ("MEMBER", "SILVER", "GOLD"):
+            time_charge = tariff.per_entry_member
         else:
-            base = rates["weekday"]
-
-        if member_tier in ("MEMBER", "SILVER", "GOLD"):
-            time_charge = base["per_entry_member"]
-        else:
-            time_charge = base["per_entry_non_member"]
+            time_charge = tariff.per_entry_non_member
 
     # Valet
     elif zone == "VALET":
-        rates = policy["zones"][zone]
-        if day_type == "WEEKDAY":
-            rate = rates["weekday"]
-        elif day_type == "WEEKEND":
-            rate = rates["weekend"]
-        elif day_type == "PUBLIC_HOLIDAY":
-            rate = rates["public_holiday"]
-        else:
-            rate = rates["weekday"]
-
         if hours <= 2:
-            time_charge = rate["first2h_flat"]
+            time_charge = tariff.first2h_flat
         else:
-            time_charge = rate["first2h_flat"] + (hours - 2) * rate["per_hour"]
+            time_charge = tariff.first2h_flat + (hours - 2) * tariff.per_hour
 
     # Staff
     elif zone == "STAFF":
-        rates = policy["zones"][zone]
-        if day_type == "WEEKDAY":
-            rate = rates["weekday"]["per_hour"]
-        elif day_type == "WEEKEND":
-            rate = rates["weekend"]["per_hour"]
-        elif day_type == "PUBLIC_HOLIDAY":
-            rate = rates["public_holiday"]["per_hour"]
-        else:
-            rate = policy["zones"][zone]["weekday"]["per_hour"]
-
-        time_charge = rate * hours_to_bill
-
-        cap = policy["zones"][zone].get("daily_cap")
-        time_charge = min(time_charge, cap)
+        time_charge = tariff.per_hour * hours_to_bill
+        time_charge = min(time_charge, tariff.daily_cap)
 
     # Step 7: Apply member and zone caps
-    member_cap = member_check.get("daily_cap")
+    member_cap = membership.daily_cap
     if zone != "VALET" and member_cap is not None:
         time_charge = min(time_charge, member_cap)
 
-    zone_cap = policy["zones"][zone].get("daily_cap")
+    zone_cap = tariff.daily_cap
     if zone_cap is not None:
         time_charge = min(time_charge, zone_cap)
-        
-    # Step 7b: Apply 4:00 AM cut-off penalty (stacks with duration fee)
-    fee.penalties.overnight = Decimal("0.00")
-    if entry_at and exit_at:
-        try:
-            entry_dt = datetime.fromisoformat(entry_at)
-            exit_dt = datetime.fromisoformat(exit_at)
+    return time_charge
 
-            if exit_dt.date() > entry_dt.date():
-                cutoff_hour, cutoff_min = map(int, policy["cutoff_time"].split(":"))
-                cutoff_time = time(cutoff_hour, cutoff_min)
-                if exit_dt.time() > cutoff_time:
-                    penalty = policy["zones"][zone]["overnight_penalty"]
-                    fee.penalties.overnight = penalty
-                    fee.total = time_charge + penalty
-                    return fee
-        except Exception:
-            fee.total = time_charge
 
+# Billed hours covered by every ChargeTable; longer stays use the plateau or _time_charge.
+TABLE_HOURS = 24
 
-    # Step 8: Assign and return
-    fee.time_charge = time_charge
-    fee.total = time_charge
-    return fee
+# Far beyond any real stay; used to check that a table's charge stops growing after TABLE_HOURS.
+_PLATEAU_PROBE_HOURS = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class ChargeTable:
+    """Time charge indexed by billed hours (0..TABLE_HOURS) for one pricing key."""
+
+    charges: tuple
+    plateau: bool  # True when the charge is capped (constant) beyond the last entry
+
+
+def charge_table(policy, tariff, membership, validation_hours):
+    """
+    Build (once) and return the ChargeTable for a tariff, membership and validation hours.
+    Tables live on the CompiledPolicy, so a new or refreshed policy starts with fresh tables.
+    """
+    key = (tariff.zone, tariff.day_type, membership.tier, validation_hours)
+    table = policy.tables.get(key)
+    if table is None:
+        charges = tuple(
+            _time_charge(policy, tariff, membership, h, validation_hours) for h in range(TABLE_HOURS + 1)
+        )
+        last = _time_charge(policy, tariff, membership, _PLATEAU_PROBE_HOURS, validation_hours)
+        table = ChargeTable(charges, last == charges[-1])
+        policy.tables[key] = table
+    return table
+
+
+def build_tables(policy):
+    """Eagerly build every table for the policy's zones, day types, tiers and validations."""
+    policy = compile_policy(policy)
+    validation_options = {0} | {p.free_hours for p in policy.partners.values()}
+    for tariff in policy.tariffs.values():
+        for membership in policy.memberships.values():
+            for validation_hours in validation_options:
+                charge_table(policy, tariff, membership, validation_hours)
+    return table_memory(policy)
+
+
+def table_memory(policy):
+    """Report how many tables a policy holds and their approximate size in bytes."""
+    policy = compile_policy(policy)
+    tables = list(policy.tables.values())
+    size = sys.getsizeof(policy.tables)
+    for table in tables:
+        size += sys.getsizeof(table) + sys.getsizeof(table.charges)
+        size += sum(sys.getsizeof(c) for c in table.charges)
+    return {
+        "tables": len(tables),
+        "entries": sum(len(t.charges) for t in tables),
+        "bytes": size,
+    }
+
+
+FEE_COLUMNS = ("ticket_id", "time_charge", "member_free_minutes", "validation_hours",
+               "overnight", "lost_ticket", "total")
+
+
+def compute_fees(tickets, policy):
+    """
+    Batch version of compute_fee for whole ticket sets (e.g. end-of-day settlement).
+
+    Each ticket is a record shaped like data/tickets_pending.json plus an "exit_time"
+    (and optionally "duration_minutes", otherwise derived from the timestamps); "day_type"
+    may be left out. A ticket with neither a day_type nor a valid entry_time gets Fee(), as
+    in compute_fee.
+    Tickets are grouped by (zone, day_type, member_tier) so tariff lookups happen once
+    per group. Results come back in column form: a dict of lists keyed by FEE_COLUMNS,
+    in the same order as the input tickets.
+    """
+    tickets = list(tickets)
+    columns = {name: [None] * len(tickets) for name in FEE_COLUMNS}
+    if not policy:
+        return columns
+
+    # tickets without a day_type take it from the calendar (one lookup per distinct entry date)
+    undated = [i for i, t in enumerate(tickets) if not t.get("day_type")]
+    resolved = dict(zip(undated, day_types([tickets[i].get("entry_time") for i in undated])))
+    groups = {}
+    for i, t in enumerate(tickets):
+        day_type = resolved[i] if i in resolved else t["day_type"]
+        groups.setdefault((t["zone"], day_type, t["member_tier"]), []).append(i)
+
+    policy = compile_policy(policy)
+    instrumented = instrumentation.ENABLED
+    for (zone, day_type, member_tier), indexes in groups.items():
+        if day_type is None:
+            tariff = None  # no day type and no calendar date: nothing to price
+        else:
+            tariff = policy.tariff(zone, day_type)
+            membership = policy.membership(member_tier)
+        for i in indexes:
+            t = tickets[i]
+            if tariff is None:
+                fee = Fee()
+            else:
+                lost_ticket = bool(t.get("lost_ticket"))
+                entry_dt, exit_dt, duration = parse_stay(t, lost_ticket)
+                if instrumented:
+                    t0 = time.perf_counter()
+                fee = _price(policy, tariff, membership, duration, t.get("validation"), lost_ticket,
+                             entry_dt, exit_dt)
+                if instrumented:
+                    _record(policy, tariff, membership, duration, lost_ticket, fee, time.perf_counter() - t0)
+            columns["ticket_id"][i] = t.get("ticket_id")
+            columns["time_charge"][i] = fee.time_charge
+            columns["member_free_minutes"][i] = fee.member_free_minutes
+            columns["validation_hours"][i] = fee.validation_hours
+            columns["overnight"][i] = fee.penalties.overnight
+            columns["lost_ticket"][i] = fee.penalties.lost_ticket
+            columns["total"][i] = fee.total
+    return columns
+
+
+def parse_stay(ticket, lost_ticket):
+    """Parse a ticket's timestamps once; returns (entry_dt, exit_dt, duration_minutes)."""
+    duration = ticket.get("duration_minutes")
+    if lost_ticket:
+        return None, None, duration or 0
+    entry_dt = exit_dt = None
+    try:
+        entry_dt = datetime.fromisoformat(ticket["entry_time"])
+        exit_dt = datetime.fromisoformat(ticket["exit_time"])
+    except (KeyError, TypeError, ValueError):
+        entry_dt = exit_dt = None
+    if duration is None:
+        if entry_dt is None:
+            raise ValueError(f"Ticket {ticket.get('ticket_id')} has no exit time or duration")
+        duration = int((exit_dt - entry_dt).total_seconds() // 60)
+    return entry_dt, exit_dt, duration
@@ -0,0 +1,169 @@
+"""
+Optional instrumentation for the fee engine and the ticket store: counters and timing
+histograms, exported through a pluggable sink.
+
+Disabled by default. Instrumented code checks the module-level ENABLED flag once per call
+and otherwise runs exactly as before, so the disabled cost is one attribute lookup (compare
+compute_fee.REGULAR, instrumented but disabled, with compute_fee.REGULAR.uninstrumented in
+benchmarks.suite; compute_fee.REGULAR.instrumented is the cost when enabled).
+
+    from src import instrumentation
+    instrumentation.enable(instrumentation.PrometheusSink("data/parking.prom"))
+    ...
+    instrumentation.flush()      # write the current snapshot to the sink
+
+Metrics recorded:
+  fee_branch_total{branch=...}       compute_fee/compute_fees outcome: lost_ticket, grace,
+                                     free, capped or charged; plus overnight and validation
+  fee_seconds{zone=...}              time spent pricing one stay
+  storage_seconds{op=...}            load_tickets / save_tickets wall time
+  storage_tickets_total{op=...}      tickets loaded / saved
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from src import data_manager
+
+ENABLED = False
+
+# Histogram bucket upper bounds in seconds (a final +Inf bucket is implied).
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 1e-2, 0.1, 1.0, 10.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_sink = None
+
+
+def enable(sink=None):
+    """Start recording; `sink` (if given) receives snapshots on flush()."""
+    global ENABLED, _sink
+    _sink = sink
+    ENABLED = True
+
+
+def disable():
+    """Stop recording (the collected values are kept until reset())."""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def count(name, n=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def observe(name, seconds, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0, 0.0]
+        hist[0][bisect_left(BUCKETS, seconds)] += 1
+        hist[1] += 1
+        hist[2] += seconds
+
+
+@contextmanager
+def timed(name, **labels):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+
+def snapshot():
+    """
+    Current values: {"counters": [{"name", "labels", "value"}], "histograms": [{"name",
+    "labels", "buckets": [[upper bound, cumulative count], ...], "count", "sum"}]}.
+    """
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), (buckets, n, total) in sorted(_histograms.items()):
+            cumulative, running = [], 0
+            for bound, c in zip(BUCKETS + ("+Inf",), buckets):
+                running += c
+                cumulative.append([bound, running])
+            histograms.append({"name": name, "labels": dict(labels), "buckets": cumulative, "count": n, "sum": total})
+    return {"counters": counters, "histograms": histograms}
+
+
+def flush():
+    """Hand the current snapshot to the sink given to enable(); returns the snapshot."""
+    snap = snapshot()
+    if _sink is not None:
+        _sink.write(snap)
+    return snap
+
+
+class MemorySink:
+    """Keeps every flushed snapshot in .snapshots (tests, notebooks)."""
+
+    def __init__(self):
+        self.snapshots = []
+
+    def write(self, snap):
+        self.snapshots.append(snap)
+
+
+class JSONSink:
+    """Writes each snapshot as JSON to a local file (replaced atomically)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def write(self, snap):
+        data_manager._atomic_write(self.path, lambda f: json.dump(snap, f, indent=2))
+
+
+class PrometheusSink:
+    """Writes each snapshot in the Prometheus text format (e.g. for a textfile collector)."""
+
+    def __init__(self, path, prefix="parking_"):
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def write(self, snap):
+        data_manager._atomic_write(self.path, lambda f: f.write(prometheus_text(snap, self.prefix)))
+
+
+def prometheus_text(snap, prefix="parking_"):
+    lines, typed = [], set()
+    for c in snap["counters"]:
+        name = prefix + c["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_labels(c['labels'])} {c['value']}")
+    for h in snap["histograms"]:
+        name = prefix + h["name"]
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        for bound, n in h["buckets"]:
+            lines.append(f"{name}_bucket{_labels(dict(h['labels'], le=bound))} {n}")
+        lines.append(f"{name}_sum{_labels(h['labels'])} {h['sum']!r}")
+        lines.append(f"{name}_count{_labels(h['labels'])} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
@@ -0,0 +1,146 @@
+"""
+Live occupancy per zone and per member tier.
+
+Occupancy keeps one counter per zone and per tier plus the set of tickets inside, so an
+entry or exit is a constant-time update. Capacities come from POLICY["zones"][zone]
+["capacity"]. snapshot() returns an immutable OccupancySnapshot that is rebuilt only
+after a change, so a display board can poll it as often as it likes.
+
+    board = Occupancy.from_pending()      # one pass over the pending tickets
+    board.enter(ticket); board.exit(ticket)
+    board.snapshot().zones["VALET"].free
+"""
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from src.data_manager import PENDING_FILE, iter_tickets
+from src.policy import POLICY
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneOccupancy:
+    occupied: int
+    capacity: int = None
+
+    @property
+    def free(self):
+        return None if self.capacity is None else max(self.capacity - self.occupied, 0)
+
+    @property
+    def full(self):
+        return self.capacity is not None and self.occupied >= self.capacity
+
+
+@dataclass(frozen=True, slots=True)
+class OccupancySnapshot:
+    version: int
+    total: int
+    zones: MappingProxyType   # zone -> ZoneOccupancy
+    tiers: MappingProxyType   # member tier -> cars inside
+
+    def as_dict(self):
+        """JSON-ready form (e.g. for GET /occupancy)."""
+        return {
+            "version": self.version,
+            "total": self.total,
+            "zones": {zone: {"occupied": z.occupied, "capacity": z.capacity, "free": z.free, "full": z.full}
+                      for zone, z in self.zones.items()},
+            "tiers": dict(self.tiers),
+        }
+
+
+class Occupancy:
+    """Counters for the cars currently inside; entries and exits are idempotent per ticket_id."""
+
+    def __init__(self, policy=POLICY):
+        self.capacities = {zone: rates.get("capacity") for zone, rates in policy["zones"].items()}
+        self._lock = threading.Lock()
+        self._inside = {}
+        self._zones = dict.fromkeys(self.capacities, 0)
+        self._tiers = {}
+        self.skipped = 0
+        self._version = 0
+        self._snapshot = None
+
+    @classmethod
+    def from_pending(cls, filename=PENDING_FILE, policy=POLICY):
+        """Occupancy rebuilt from the pending ticket file in a single streamed pass."""
+        board = cls(policy)
+        board.rebuild(iter_tickets(filename))
+        return board
+
+    def rebuild(self, tickets):
+        """
+        Replace the counts with the given tickets (those inside the car park). Tickets missing
+        a ticket_id, zone or member_tier are left out and counted in `skipped`.
+        """
+        inside, zones, tiers, skipped = {}, dict.fromkeys(self.capacities, 0), {}, 0
+        for t in tickets:
+            try:
+                key = (t["zone"], t["member_tier"])
+                t["ticket_id"]
+            except KeyError:
+                skipped += 1
+                continue
+            if inside.setdefault(t["ticket_id"], key) is key:
+                zones[key[0]] = zones.get(key[0], 0) + 1
+                tiers[key[1]] = tiers.get(key[1], 0) + 1
+        with self._lock:
+            self._inside, self._zones, self._tiers = inside, zones, tiers
+            self.skipped = skipped
+            self._changed()
+
+    def set_capacities(self, policy):
+        """Take the zone capacities from a (reloaded) policy; zones it adds start empty."""
+        capacities = {zone: rates.get("capacity") for zone, rates in policy["zones"].items()}
+        with self._lock:
+            self.capacities = capacities
+            for zone in capacities:
+                self._zones.setdefault(zone, 0)
+            self._changed()
+
+    def enter(self, ticket):
+        """Count a car in; returns False if the ticket was already inside."""
+        zone, tier = ticket["zone"], ticket["member_tier"]
+        with self._lock:
+            if ticket["ticket_id"] in self._inside:
+                return False
+            self._inside[ticket["ticket_id"]] = (zone, tier)
+            self._zones[zone] = self._zones.get(zone, 0) + 1
+            self._tiers[tier] = self._tiers.get(tier, 0) + 1
+            self._changed()
+        return True
+
+    def exit(self, ticket):
+        """Count a car out (ticket record or ticket_id); returns False if it was not inside."""
+        ticket_id = ticket["ticket_id"] if isinstance(ticket, dict) else ticket
+        with self._lock:
+            key = self._inside.pop(ticket_id, None)
+            if key is None:
+                return False
+            zone, tier = key
+            self._zones[zone] -= 1
+            self._tiers[tier] -= 1
+            self._changed()
+        return True
+
+    def snapshot(self):
+        """The current OccupancySnapshot (the same object until the next entry or exit)."""
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                snap = self._snapshot
+                if snap is None:
+                    snap = self._snapshot = OccupancySnapshot(
+                        version=self._version,
+                        total=len(self._inside),
+                        zones=MappingProxyType({zone: ZoneOccupancy(n, self.capacities.get(zone))
+                                                for zone, n in self._zones.items()}),
+                        tiers=MappingProxyType(dict(self._tiers)),
+                    )
+        return snap
+
+    def _changed(self):
+        self._version += 1
+        self._snapshot = None
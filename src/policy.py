@@ -8,6 +8,7 @@ POLICY = {
     # Zones
     "zones": {
         "REGULAR": {
+            "capacity": 1200,        # parking bays (src.occupancy)
             "members_only": False,
             "grace_minutes": 15,
             "weekday": {"first2h_flat": Decimal("4.00"), "per_hour": Decimal("4.00")},
@@ -17,6 +18,7 @@ POLICY = {
             "overnight_penalty": Decimal("80.00"),
         },
         "PREFERRED": {
+            "capacity": 200,
             "members_only": True,
             "grace_minutes": 15,
             "weekday": {"first2h_flat": Decimal("3.00"), "per_hour": Decimal("4.00")},
@@ -26,6 +28,7 @@ POLICY = {
             "overnight_penalty": Decimal("80.00"),
         },
         "OUTDOOR": {
+            "capacity": 400,
             "members_only": False,
             "grace_minutes": 0,
             "weekday": {"per_entry_member": Decimal("2.00"), "per_entry_non_member": Decimal("4.00")},
@@ -34,6 +37,7 @@ POLICY = {
             "overnight_penalty": Decimal("80.00"),
         },
         "VALET": {
+            "capacity": 80,
             "members_only": False,
             "grace_minutes": 0,
             "weekday": {"first2h_flat": Decimal("10.00"), "per_hour": Decimal("15.00")},
@@ -42,6 +46,7 @@ POLICY = {
             "overnight_penalty": Decimal("120.00"),
         },
         "STAFF": {
+            "capacity": 150,
             "members_only": True,
             "grace_minutes": 0,
             "weekday": {"per_hour": Decimal("1.00")},
@@ -0,0 +1,167 @@
+"""
+Tariff policy from a data file (JSON or TOML) instead of the POLICY literal, reloaded
+without a restart when the file changes.
+
+The file has the same shape as POLICY in src.policy. Amounts are parsed as Decimal, never
+float: JSON and TOML numbers with a fraction come in as Decimal, and money fields (rates,
+caps, penalties) may also be written as strings ("4.00") or whole numbers. TOML has no
+null, so a missing daily_cap means no cap. The optional "version" key names the policy;
+without it the version is a hash of the file contents.
+
+    store = PolicyStore("data/policy.json").start()   # watcher thread, checks the mtime
+    policy = store.current()                          # take once per request
+    fee = compute_fee(..., policy=policy)             # fee.policy_version == policy.version
+
+A changed file is parsed and compiled on the watcher thread, then swapped in with a single
+assignment: current() never waits for a reload, and a request that already took a policy
+keeps pricing under that version. A file that fails to load leaves the current policy in
+place (see .error; the failure is also logged).
+
+    python -m src.policy_store export data/policy.json    # write POLICY out as a file
+    python -m src.policy_store check data/policy.json     # validate, print the version
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import tomllib
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from src.policy import POLICY
+from src.tariff import compile_policy
+
+log = logging.getLogger(__name__)
+
+# Seconds between mtime checks by the watcher thread.
+CHECK_INTERVAL = 1.0
+
+# Keys whose values are money amounts (converted to Decimal wherever they appear).
+AMOUNT_KEYS = frozenset({"first2h_flat", "per_hour", "per_entry_member", "per_entry_non_member",
+                         "daily_cap", "overnight_penalty", "non_member", "member", "valet"})
+
+
+def load_policy(path):
+    """POLICY-shaped dict from a .json or .toml file, amounts as Decimal and "version" set."""
+    raw = Path(path).read_bytes()
+    if Path(path).suffix == ".toml":
+        policy = tomllib.loads(raw.decode("utf-8"), parse_float=Decimal)
+    else:
+        policy = json.loads(raw, parse_float=Decimal)
+    policy = _amounts(policy)
+    policy["version"] = str(policy.get("version") or hashlib.sha256(raw).hexdigest()[:12])
+    compile_policy(policy)  # fail here, not on the first fee, if the file is incomplete
+    return policy
+
+
+def dump_policy(policy, path):
+    """Write a POLICY dict as JSON (amounts as strings, so nothing passes through float)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(policy, f, indent=2, default=str)
+        f.write("\n")
+
+
+def _amounts(node, key=None):
+    if isinstance(node, dict):
+        return {k: _amounts(v, k) for k, v in node.items()}
+    if key in AMOUNT_KEYS and node is not None and not isinstance(node, bool):
+        try:
+            return Decimal(str(node))
+        except InvalidOperation:
+            raise ValueError(f"{key}: {node!r} is not an amount") from None
+    return node
+
+
+class PolicyStore:
+    """The compiled policy for a file, replaced atomically when the file changes."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.error = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stamp = _stamp(self.path)
+        self.data = load_policy(self.path)
+        self._policy = compile_policy(self.data)
+
+    @property
+    def version(self):
+        return self._policy.version
+
+    def current(self):
+        """The latest compiled policy (a plain attribute read; never blocks on a reload)."""
+        return self._policy
+
+    def check(self):
+        """Reload if the file's mtime or size changed; returns True if a new policy was swapped in."""
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # another thread is already reloading
+        try:
+            try:
+                stamp = _stamp(self.path)
+            except FileNotFoundError as e:
+                self.error = e
+                return False
+            if stamp == self._stamp:
+                return False
+            try:
+                data = load_policy(self.path)
+                compiled = compile_policy(data)
+            except (OSError, ValueError, ArithmeticError, KeyError, TypeError, AttributeError) as e:
+                self.error = e
+                self._stamp = stamp  # don't retry the same broken file every interval
+                log.warning("Keeping policy %s: %s failed to load: %s", self.version, self.path, e)
+                return False
+            self.data, self.error, self._stamp = data, None, stamp
+            self._policy = compiled
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def start(self, interval=CHECK_INTERVAL):
+        """Check the file every `interval` seconds on a daemon thread; returns self."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, args=(interval,), name="policy-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception as e:  # the watcher must outlive any one bad check
+                self.error = e
+                log.exception("Policy check for %s failed", self.path)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.policy_store", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("export", help="write the built-in POLICY as JSON").add_argument("path")
+    commands.add_parser("check", help="load a policy file and print its version").add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        dump_policy(POLICY, args.path)
+        return 0
+    print(load_policy(args.path)["version"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
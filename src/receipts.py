@@ -0,0 +1,140 @@
+"""
+Receipt rendering. The static layout is compiled once into a single format string, so a
+receipt costs one str.format call; write_receipts renders completed tickets in batches
+with one write per batch (end-of-day reprint runs).
+
+src.ui.print_receipt_output renders through the same template, so the approved receipt
+snapshots in tests/ cover both paths.
+"""
+from datetime import datetime
+
+from src.business_calendar import ticket_day_type
+from src.fee_engine import cached_compute_fee
+from src.policy import POLICY
+from src.tariff import compile_policy
+
+RULE = "=============================================="
+LINE = "----------------------------------------------"
+
+TEMPLATE = "\n".join([
+    RULE,
+    "             1U PARKING RECEIPT               ",
+    RULE,
+    "Receipt ID       : RCP-{rid}",
+    "Ticket ID        : T-{tid}",
+    "",
+    LINE,
+    "Customer / Ticket",
+    LINE,
+    "Ticket Type        : PAPER TICKET",
+    "Membership Tier    : {member_tier}",
+    "",
+    LINE,
+    "Parking Details",
+    LINE,
+    "Zone               : {zone}",
+    "Day Type           : {day_type}",
+    "Entry Date/Time    : {entry_at}",
+    "Exit  Date/Time    : {exit_at}",
+    "Duration           : {duration}",
+    "",
+    LINE,
+    "Charges Breakdown",
+    LINE,
+    "Time Charge            : ${time_charge:.2f}",
+    "Free Hours (Tier Perk) : {free_hours}",
+    "Validation             : {validation}",
+    LINE,
+    "TOTAL DUE              : ${total:.2f}",
+    "AMOUNT PAID            : ${total:.2f}",
+    LINE,
+    "Thank you for visiting 1U Shopping Centre!",
+    "For assistance, contact support@1uparking.my",
+    RULE,
+]).format
+
+# Receipts rendered per write by write_receipts.
+BATCH_SIZE = 1000
+
+# Validation partners shown as "2 FREE HOURS" on the receipt (store -> minimum spend).
+_RECEIPT_PARTNERS = {"woolworths": 30}
+
+
+def render_receipt(ticket_id=None, zone=None, member_tier=None, fee=None, day_type=None, entry_at=None,
+                   exit_at=None, duration_minutes=None, validation=None):
+    """One receipt as text (the print_receipt_output layout)."""
+    if duration_minutes is not None:
+        duration = f"{duration_minutes // 60}h {duration_minutes % 60}m"
+    else:
+        duration = "N/A"
+    free_hours = getattr(fee, "member_free_minutes", 0) // 60
+    return TEMPLATE(
+        rid=ticket_id or datetime.now().strftime('%H%M%S'),
+        tid=ticket_id or 'XXXXXX',
+        member_tier=member_tier or 'N/A',
+        zone=zone or 'N/A',
+        day_type=day_type or 'N/A',
+        entry_at=entry_at or 'N/A',
+        exit_at=exit_at or 'N/A',
+        duration=duration,
+        time_charge=fee.time_charge,
+        free_hours=f"{free_hours}h" if free_hours else "NONE",
+        validation=_validation_display(validation),
+        total=fee.total,
+    )
+
+
+def write_receipts(out, tickets, policy=POLICY, batch_size=BATCH_SIZE):
+    """
+    Reprice completed tickets (tickets_completed.json records) and write their receipts
+    to `out`, each followed by a blank line; returns the number written.
+    """
+    policy = compile_policy(policy)
+    batch, count = [], 0
+    for t in tickets:
+        batch.append(render_completed(t, policy))
+        batch.append("\n\n")
+        count += 1
+        if len(batch) >= 2 * batch_size:
+            out.write("".join(batch))
+            batch = []
+    if batch:
+        out.write("".join(batch))
+    return count
+
+
+def render_completed(ticket, policy=POLICY):
+    """Receipt for a completed ticket, repriced under policy (as the receipt menu does)."""
+    day_type = ticket_day_type(ticket)
+    fee = cached_compute_fee(
+        duration_minutes=ticket.get("duration_minutes") or 0,
+        zone=ticket["zone"],
+        day_type=day_type,
+        member_tier=ticket["member_tier"],
+        validation=ticket.get("validation"),
+        lost_ticket=ticket["lost_ticket"],
+        entry_at=ticket.get("entry_time"),
+        exit_at=ticket.get("exit_time"),
+        policy=policy,
+    )
+    return render_receipt(
+        ticket_id=ticket["ticket_id"],
+        zone=ticket["zone"],
+        member_tier=ticket["member_tier"],
+        fee=fee,
+        day_type=day_type,
+        entry_at=ticket.get("entry_time"),
+        exit_at=ticket.get("exit_time") or "LOST TICKET",
+        duration_minutes=ticket.get("duration_minutes"),
+        validation=ticket.get("validation"),
+    )
+
+
+def _validation_display(validation):
+    # checks the spend threshold only; the fee engine applies the actual validation hours
+    if validation:
+        store = validation.get("store", "").lower()
+        spend = validation.get("spend", 0)
+        if store in _RECEIPT_PARTNERS and spend >= _RECEIPT_PARTNERS[store]:
+            return "2 FREE HOURS"
+    return "NONE"
@@ -0,0 +1,212 @@
+"""
+Revenue rollups: running totals per (business date, zone, member tier, day type), updated
+as tickets complete, so revenue reports never rescan the completed tickets.
+
+The business date is the ticket's entry date (the same date its completed partition is
+named after). Amounts are kept in exact integer cents. Like a ticket file, the rollups are
+a JSON snapshot (DATA_DIR/rollups.json, a list of rows) plus a journal of increments
+(rollups.journal.jsonl) that is folded into the snapshot once it reaches COMPACT_BYTES.
+Increments are additive, so compaction relies on data_manager discarding the journal
+before the folded snapshot is put in place: no increment is ever read twice.
+
+store_completed in src.cli records every batch it closes (CLI close and the server's exit
+endpoint), after the tickets have left pending but still under the pending file's lock.
+Increments are not idempotent, so a ticket must reach them once: store_completed only
+records the tickets it took out of pending itself, re-checked under that lock, so neither
+a re-run nor a concurrent close or gate exit can add them twice. They are written last, so
+a crash before them leaves the rollups short; rebuild() recomputes the rollups from the
+completed tickets, holding both locks so no close lands between its scan and its save.
+
+    python -m src.rollups report [--start 2025-11-01] [--end 2025-12-01] [--by zone day_type]
+    python -m src.rollups rebuild
+"""
+import argparse
+import json
+import sys
+
+from src import data_manager
+from src.business_calendar import ticket_day_type
+from src.fee_engine import cached_compute_fee
+from src.policy import POLICY
+from src.tariff import compile_policy, from_cents, to_cents
+
+ROLLUP_FILE = "rollups.json"
+
+KEY = ("date", "zone", "member_tier", "day_type")
+
+# Summed per key: ticket counts and amounts in cents (revenue is the recorded total; the
+# time charge and penalties are its breakdown as billed, stored with the completed record).
+MEASURES = ("tickets", "revenue", "time_charge", "overnight", "lost_ticket", "overnight_tickets", "lost_tickets")
+AMOUNTS = ("revenue", "time_charge", "overnight", "lost_ticket")
+
+
+def business_date(ticket):
+    """YYYY-MM-DD the ticket's revenue is booked on (its entry date)."""
+    entry = ticket.get("entry_time")
+    return entry[:10] if entry else data_manager.UNDATED
+
+
+def increments(tickets, policy=POLICY):
+    """
+    Rollup rows (KEY fields plus MEASURES) for a batch of completed records, one per key.
+    The policy only prices records written before completed records carried their fee
+    breakdown.
+    """
+    policy = compile_policy(policy)
+    rows = {}
+    for t in tickets:
+        day_type = ticket_day_type(t)
+        time_charge, overnight, lost_ticket = _breakdown(t, day_type, policy)
+        key = (business_date(t), t["zone"], t["member_tier"], day_type)
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = dict(zip(KEY, key), **dict.fromkeys(MEASURES, 0))
+        row["tickets"] += 1
+        row["revenue"] += _cents(t.get("total"))
+        row["time_charge"] += time_charge
+        row["overnight"] += overnight
+        row["lost_ticket"] += lost_ticket
+        row["overnight_tickets"] += overnight > 0
+        row["lost_tickets"] += bool(t["lost_ticket"])
+    return list(rows.values())
+
+
+def record_completed(tickets, policy=POLICY):
+    """Add a batch of completed records to the rollups: one locked, fsynced journal write."""
+    data_manager.append_journal(ROLLUP_FILE, increments(tickets, policy), fold=_fold)
+
+
+def load_rollups():
+    """{(date, zone, member_tier, day_type): {measure: total}} from the snapshot and journal."""
+    table = {}
+    _add_rows(table, _load())
+    return table
+
+
+def rebuild(policy=POLICY):
+    """
+    Recompute the rollups from every completed ticket (recovery); returns the ticket count.
+    Closes wait meanwhile: the pending file's lock keeps tickets from completing and the
+    rollups lock keeps increments out of the journal the new snapshot discards.
+    """
+    with data_manager.locked(data_manager.PENDING_FILE), data_manager.locked(ROLLUP_FILE):
+        table, count = {}, 0
+        batch = []
+        for t in data_manager.iter_completed():
+            batch.append(t)
+            if len(batch) >= data_manager.PARTITION_BATCH:
+                count += _add_rows(table, increments(batch, policy))
+                batch = []
+        count += _add_rows(table, increments(batch, policy))
+        _save(_rows(table))
+    return count
+
+
+def report(start=None, end=None, by=("date",)):
+    """
+    Rollup totals for business dates in [start, end), grouped by the KEY fields in `by`
+    (() for a grand total); amounts as Decimal dollars, rows sorted by group.
+    """
+    groups = {}
+    for key, sums in load_rollups().items():
+        date = key[0]
+        if (start and date < start) or (end and date >= end):
+            continue
+        group = tuple(key[KEY.index(name)] for name in by)
+        total = groups.setdefault(group, dict.fromkeys(MEASURES, 0))
+        for name in MEASURES:
+            total[name] += sums[name]
+    rows = []
+    for group, sums in sorted(groups.items()):
+        row = dict(zip(by, group))
+        row.update((name, from_cents(v) if name in AMOUNTS else v) for name, v in sums.items())
+        rows.append(row)
+    return rows
+
+
+def _load():
+    return data_manager.load_journaled(ROLLUP_FILE, _fold)
+
+
+def _save(rows):
+    data_manager.save_journaled(ROLLUP_FILE, rows)
+
+
+def _breakdown(ticket, day_type, policy):
+    # (time charge, overnight, lost ticket) in cents, as billed when the record has them.
+    # The time charge is whatever the penalties leave of the total: Fee.time_charge is zero
+    # for overnight stays, and records written before that was accounted for carry the zero.
+    if "time_charge" in ticket:
+        overnight, lost_ticket = _cents(ticket.get("overnight_penalty")), _cents(ticket.get("lost_ticket_penalty"))
+        return _cents(ticket.get("total")) - overnight - lost_ticket, overnight, lost_ticket
+    fee = cached_compute_fee(
+        duration_minutes=ticket.get("duration_minutes") or 0,
+        zone=ticket["zone"],
+        day_type=day_type,
+        member_tier=ticket["member_tier"],
+        validation=ticket.get("validation"),
+        lost_ticket=ticket["lost_ticket"],
+        entry_at=ticket.get("entry_time"),
+        exit_at=ticket.get("exit_time"),
+        policy=policy,
+    )
+    overnight, lost_ticket = to_cents(fee.penalties.overnight), to_cents(fee.penalties.lost_ticket)
+    return to_cents(fee.total) - overnight - lost_ticket, overnight, lost_ticket
+
+
+def _cents(total):
+    # recorded amounts are floats with two decimals (tickets_completed.json)
+    return round((total or 0) * 100)
+
+
+def _add_rows(table, rows):
+    added = 0
+    for row in rows:
+        sums = table.setdefault(tuple(row[k] for k in KEY), dict.fromkeys(MEASURES, 0))
+        for name in MEASURES:
+            sums[name] += row.get(name, 0)
+        added += row["tickets"]
+    return added
+
+
+def _fold(snapshot, entries):
+    # compaction: the journalled increments summed into the snapshot rows
+    table = {}
+    _add_rows(table, snapshot)
+    _add_rows(table, entries)
+    return _rows(table)
+
+
+def _rows(table):
+    return [dict(zip(KEY, key), **sums) for key, sums in sorted(table.items())]
+
+
+def main(argv=None, stdout=None):
+    stdout = stdout or sys.stdout
+    parser = argparse.ArgumentParser(prog="python -m src.rollups", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    report_cmd = commands.add_parser("report", help="revenue totals from the rollups")
+    report_cmd.add_argument("--start", help="first business date (YYYY-MM-DD)")
+    report_cmd.add_argument("--end", help="business date to stop before (YYYY-MM-DD)")
+    report_cmd.add_argument("--by", nargs="*", choices=KEY, default=["date"], help="group by (none: grand total)")
+    report_cmd.add_argument("--json", action="store_true", help="JSON lines instead of a table")
+    commands.add_parser("rebuild", help="recompute the rollups from the completed tickets")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        stdout.write(f"Rebuilt rollups from {rebuild()} completed tickets.\n")
+        return 0
+    rows = report(args.start, args.end, tuple(args.by))
+    if args.json:
+        for row in rows:
+            stdout.write(json.dumps(row, default=str) + "\n")
+        return 0
+    columns = list(args.by) + list(MEASURES)
+    stdout.write(" ".join(f"{name:>12}" for name in columns) + "\n")
+    for row in rows:
+        stdout.write(" ".join(f"{row[name]!s:>12}" for name in columns) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
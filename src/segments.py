@@ -0,0 +1,127 @@
+"""
+Multi-day stays priced per business day. compute_fee bills a stay as one duration with at
+most one overnight penalty; compute_stay_fee splits the stay at every cut-off (04:00) it
+crosses and prices each day segment under that day's day type and caps, plus one
+overnight penalty per crossed cut-off.
+
+    entry Mon 10:00, exit Thu 12:00 (REGULAR, non-member)
+      Mon 10:00 - Tue 04:00   weekday, capped      20.00
+      Tue 04:00 - Wed 04:00   weekday, capped      20.00
+      Wed 04:00 - Thu 04:00   weekday, capped      20.00
+      Thu 04:00 - Thu 12:00   weekday, capped      20.00
+      3 cut-offs x 80.00 overnight penalty        240.00
+
+A cut-off counts once the car is still parked after it on a later date than the entry, as
+in compute_fee, so a stay that crosses no cut-off prices exactly as compute_fee does. The
+first segment runs from entry to the next day's cut-off and carries the per-visit perks
+(member free hours, retail validation); later days get the tier's daily cap only.
+
+Every whole day between the first and last segment lasts exactly 24 hours, so its charge
+depends only on its day type: each day type is priced once and multiplied by its day
+count. The cost is one calendar lookup per day, never per hour.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from src.business_calendar import DAY_TYPES, day_index
+from src.fee_engine import ZERO, Fee, Penalties, _time_charge, lookup_time_charge, validation_hours_for
+from src.policy import POLICY
+from src.tariff import Membership, compile_policy, from_cents
+
+DAY_MINUTES = 24 * 60
+
+
+def compute_stay_fee(entry_at, exit_at=None, zone=None, member_tier=None, validation=None, lost_ticket=False,
+                     policy=POLICY, day_type=None):
+    """
+    Fee for a stay from entry_at to exit_at (ISO strings or datetimes), segmented by
+    business day. day_type, if given, applies to the entry day; the other days take theirs
+    from the calendar (src.business_calendar).
+    """
+    policy = compile_policy(policy)
+    entry_dt = _as_datetime(entry_at)
+    index = day_index()
+    membership = policy.membership(member_tier)
+    tariff = policy.tariff(zone, day_type or DAY_TYPES[index.code(entry_dt.toordinal())])
+
+    if lost_ticket:
+        penalty = policy.lost_ticket_penalty(tariff.zone, membership.tier)
+        if policy.cents:
+            penalty = from_cents(penalty)
+        return Fee(total=penalty, penalties=Penalties(lost_ticket=penalty), policy_version=policy.version)
+
+    exit_dt = _as_datetime(exit_at)
+    if exit_dt < entry_dt:
+        raise ValueError("Exit time cannot be earlier than entry time")
+    if _minutes(entry_dt, exit_dt) < tariff.grace_minutes:
+        return Fee(policy_version=policy.version)
+
+    validation_hours = 0
+    if validation and tariff.zone not in ("VALET", "OUTDOOR"):
+        validation_hours = validation_hours_for(policy, validation)
+
+    zero = 0 if policy.cents else ZERO
+    crossed = crossed_cutoffs(entry_dt, exit_dt, policy.cutoff)
+    if not crossed:
+        time_charge = _charge(policy, tariff, membership, _minutes(entry_dt, exit_dt), validation_hours)
+        overnight = zero
+    else:
+        first_end = datetime.combine(entry_dt.date() + timedelta(days=1), policy.cutoff)
+        last_start = first_end + timedelta(days=crossed - 1)
+        later = Membership(membership.tier, 0, membership.daily_cap)
+        time_charge = _charge(policy, tariff, membership, _minutes(entry_dt, first_end), validation_hours)
+        # whole days in between: priced once per day type
+        start = first_end.toordinal()
+        for code, days in Counter(index.code(o) for o in range(start, start + crossed - 1)).items():
+            day_tariff = policy.tariff(tariff.zone, DAY_TYPES[code])
+            time_charge += days * _later_charge(policy, day_tariff, later, DAY_MINUTES)
+        last_tariff = policy.tariff(tariff.zone, DAY_TYPES[index.code(last_start.toordinal())])
+        time_charge += _later_charge(policy, last_tariff, later, _minutes(last_start, exit_dt))
+        overnight = crossed * (tariff.overnight_penalty or zero)
+
+    total = time_charge + overnight
+    if policy.cents:
+        total, time_charge, overnight = from_cents(total), from_cents(time_charge), from_cents(overnight)
+    return Fee(total=total, time_charge=time_charge, member_free_minutes=membership.free_hours * 60,
+               validation_hours=validation_hours, penalties=Penalties(overnight=overnight),
+               policy_version=policy.version)
+
+
+def crossed_cutoffs(entry_dt, exit_dt, cutoff):
+    """Cut-offs a stay is billed an overnight penalty for (0 for a same-day stay)."""
+    days = (exit_dt.date() - entry_dt.date()).days
+    if days <= 0:
+        return 0
+    return days - 1 + (exit_dt.time() > cutoff)
+
+
+def split_stay(entry_at, exit_at, policy=POLICY):
+    """The stay's (start, end, day_type) segments, for display; pricing never materialises them."""
+    policy = compile_policy(policy)
+    entry_dt, exit_dt = _as_datetime(entry_at), _as_datetime(exit_at)
+    index = day_index()
+    start = entry_dt
+    end = datetime.combine(entry_dt.date() + timedelta(days=1), policy.cutoff)
+    for _ in range(crossed_cutoffs(entry_dt, exit_dt, policy.cutoff)):
+        yield start, end, DAY_TYPES[index.code(start.toordinal())]
+        start, end = end, end + timedelta(days=1)
+    yield start, exit_dt, DAY_TYPES[index.code(start.toordinal())]
+
+
+def _charge(policy, tariff, membership, minutes, validation_hours):
+    # billed hours as in compute_fee: whole hours, at least one
+    return lookup_time_charge(policy, tariff, membership, max(minutes // 60, 1), validation_hours)
+
+
+def _later_charge(policy, tariff, membership, minutes):
+    # no perks after the first day: priced directly, since the charge tables (keyed by tier)
+    # hold the tier's free hours
+    return _time_charge(policy, tariff, membership, max(minutes // 60, 1), 0)
+
+
+def _minutes(start, end):
+    return int((end - start).total_seconds() // 60)
+
+
+def _as_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
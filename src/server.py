@@ -0,0 +1,259 @@
+"""
+Pricing service for exit gates: a small stdlib asyncio HTTP/1.1 server (keep-alive, JSON).
+
+    POST /price               body: a stay, as for `python -m src price`  -> fee breakdown
+    GET  /tickets/{id}        -> the pending ticket
+    GET  /occupancy           -> cars inside per zone (with capacity) and per tier
+    POST /tickets/{id}/exit   body: {"exit_time": ...} or {"lost_ticket": true}
+                              -> the completed record (journalled, removed from pending)
+
+    python -m src.server [--host 127.0.0.1] [--port 8080] [--policy data/policy.json]
+
+The policy is compiled once at startup, or with --policy loaded from a file and reloaded
+when it changes (src.policy_store); each request prices under the version current when it
+arrived, reported as "policy_version". Pending tickets stay resident in a TicketStore;
+exits drop their ticket from it in place rather than forcing a reload. Occupancy counts
+this server's exits out in place and is recounted when another writer changes the pending
+tickets, with capacities from the current policy.
+Nothing touches files on the event loop: lookups (which stat the ticket files) run on the
+default executor, exits run one at a time on a single writer thread, and the holiday
+calendar that prices stays without a day_type is loaded by warm() before the first request. An exit is
+committed only if its ticket is still pending when the pending file's lock is held
+(cli.store_completed), so gates sharing data/ cannot close the same ticket twice.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from src.business_calendar import day_index
+from src.cli import completed_record, fee_rows, store_completed
+from src.data_manager import PENDING_FILE, TicketStore
+from src.fee_engine import compute_fees
+from src.occupancy import Occupancy
+from src.policy import POLICY
+from src.policy_store import PolicyStore
+from src.tariff import compile_policy
+
+MAX_BODY = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class PricingServer:
+    """Request handling; serve() binds it to a socket."""
+
+    def __init__(self, policy=POLICY):
+        # a PolicyStore supplies the latest reloaded policy; anything else is fixed
+        self.policies = policy if isinstance(policy, PolicyStore) else None
+        self._policy = None if self.policies else compile_policy(policy)
+        self.store = TicketStore()
+        self.occupancy = Occupancy(self.policies.data if self.policies else policy)
+        self._counted = self._capacities = None  # pending load and policy data behind the counts
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticket-writer")
+
+    @property
+    def policy(self):
+        """The compiled policy for a request starting now."""
+        return self.policies.current() if self.policies else self._policy
+
+    async def warm(self):
+        """
+        Load the pending tickets (and count them in) and the holiday calendar, which /price
+        reads for stays without a day_type, before the first request needs them.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(loop.run_in_executor(self.writer, self.refresh_occupancy),
+                             loop.run_in_executor(None, day_index))
+
+    def refresh_occupancy(self):
+        """
+        Recount the cars inside if another writer changed the pending tickets, and take new
+        capacities from a reloaded policy; returns the snapshot. Runs on the writer thread,
+        so a recount never interleaves with this server's own exits (which count out in place).
+        """
+        if self.policies and self.policies.data is not self._capacities:
+            self._capacities = self.policies.data
+            self.occupancy.set_capacities(self._capacities)
+        generation = self.store.generation(PENDING_FILE)
+        if generation != self._counted:
+            self.occupancy.rebuild(self.store.pending())
+            self._counted = generation
+        return self.occupancy.snapshot()
+
+    def close(self):
+        self.writer.shutdown(wait=True)
+
+    async def handle(self, method, path, body):
+        """Route one request; returns (status, JSON-ready payload) or raises HTTPError."""
+        parts = path.strip("/").split("/")
+        if parts == ["occupancy"]:
+            _allow(method, "GET")
+            snapshot = await asyncio.get_running_loop().run_in_executor(self.writer, self.refresh_occupancy)
+            return HTTPStatus.OK, snapshot.as_dict()
+        if parts == ["price"]:
+            _allow(method, "POST")
+            return HTTPStatus.OK, self.price(_json(body))
+        if len(parts) in (2, 3) and parts[0] == "tickets":
+            ticket_id = _ticket_id(parts[1])
+            loop = asyncio.get_running_loop()
+            if len(parts) == 2:
+                _allow(method, "GET")
+                ticket = await loop.run_in_executor(None, self.store.get_pending, ticket_id)
+                if ticket is None:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f"No pending ticket {ticket_id}")
+                return HTTPStatus.OK, ticket
+            if parts[2] == "exit":
+                _allow(method, "POST")
+                stop = _json(body)
+                return HTTPStatus.OK, await loop.run_in_executor(self.writer, self.exit, ticket_id, stop)
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    def price(self, stay):
+        policy = self.policy
+        try:
+            return dict(fee_rows(compute_fees([stay], policy))[0], policy_version=policy.version)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+    def exit(self, ticket_id, stop):
+        """Complete one pending ticket (runs on the writer thread)."""
+        ticket = self.store.get_pending(ticket_id)
+        if ticket is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No pending ticket {ticket_id}")
+        policy = self.policy
+        try:
+            record = completed_record(ticket, stop, policy)
+        except KeyError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Pending ticket {ticket_id} has no {e.args[0]!r}") from None
+        except (TypeError, ValueError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+        if not store_completed([record], policy, store=self.store):
+            # another gate closed it since the lookup above
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No pending ticket {ticket_id}")
+        self.occupancy.exit(record)
+        return record
+
+    async def connection(self, reader, writer):
+        """Serve requests on one keep-alive connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    await _respond(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                method, path, body, keep_alive = request
+                try:
+                    status, payload = await self.handle(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:  # noqa: BLE001 - a bad request must not take the gate down
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(e)}
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8080, policy=POLICY, ready=None):
+    """Run the service until cancelled; ready(port) is called once the socket is bound."""
+    app = PricingServer(policy)
+    await app.warm()
+    server = await asyncio.start_server(app.connection, host, port, reuse_address=True)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
+
+
+async def _read_request(reader):
+    """(method, path, body, keep_alive), or None once the client has gone."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Bad Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, path.split("?", 1)[0], body, keep_alive
+
+
+async def _respond(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def _allow(method, allowed):
+    if method != allowed:
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+
+def _json(body):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON") from None
+    if not isinstance(data, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+    return data
+
+
+def _ticket_id(text):
+    try:
+        return int(text)
+    except ValueError:
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No pending ticket {text}") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.server", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--policy", help="policy file (JSON or TOML), reloaded when it changes")
+    args = parser.parse_args(argv)
+    policy = PolicyStore(args.policy).start() if args.policy else POLICY
+    def ready(port):
+        print(f"Serving on http://{args.host}:{port}", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, policy, ready=ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Tariff what-if simulator: reprice the same ticket history under several POLICY variants
+and report revenue per variant, zone and member tier.
+
+    python -m src.simulator --variants variants.json [--tickets tickets_completed.json]
+                            [--workers 4] [--chunk-size 100000] [--repeat 1]
+
+variants.json maps a variant name to dotted-path overrides of POLICY, e.g.
+    {"regular_5": {"zones.REGULAR.weekday.per_hour": "5.00"},
+     "gold_cap_12": {"memberships.GOLD.daily_cap": "12.00"}}
+The unchanged POLICY is always included as "current".
+"""
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from src.data_manager import COMPLETED_FILE, iter_completed, load_tickets
+from src.policy import POLICY
+from src.tariff import from_cents
+from src.vector_engine import HAVE_NUMPY, TicketColumns, encode_tickets, reprice
+
+if HAVE_NUMPY:
+    import numpy as np
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Set in the parent before the pool forks (inherited, never pickled per task), or by
+# _init_worker once per worker when fork is unavailable.
+_columns = None
+_policies = None
+
+
+def apply_overrides(policy, overrides):
+    """Deep copy of policy with {"a.b.c": value} overrides applied; amounts become Decimal."""
+    policy = copy.deepcopy(policy)
+    for path, value in overrides.items():
+        *parents, leaf = path.split(".")
+        node = policy
+        for key in parents:
+            node = node[key]
+        if leaf not in node:
+            raise KeyError(path)
+        old = node[leaf]
+        if value is not None and (old is None or isinstance(old, Decimal)):
+            value = Decimal(str(value))
+        node[leaf] = value
+    return policy
+
+
+def simulate(tickets, variants, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reprice tickets (records or TicketColumns) under every policy in `variants` (name -> policy).
+    Returns {name: {"revenue": Decimal, "tickets": int, "zones": {zone: Decimal},
+    "tiers": {tier: Decimal}}}. workers=1 runs in-process; None uses every CPU.
+    """
+    global _columns, _policies
+    columns = tickets if isinstance(tickets, TicketColumns) else encode_tickets(tickets)
+    names = list(variants)
+    policies = [variants[n] for n in names]
+    n = len(columns)
+    chunk_size = max(int(chunk_size), 1)
+    tasks = [(v, start, min(start + chunk_size, n)) for v in range(len(names)) for start in range(0, n, chunk_size)]
+
+    sums = [_empty_rollup(columns) for _ in names]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        _columns, _policies = columns, policies
+        results = map(_run_chunk, tasks)
+        _merge_all(sums, results)
+    else:
+        if "fork" in multiprocessing.get_all_start_methods():
+            _columns, _policies = columns, policies
+            pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(columns, policies))
+        with pool:
+            _merge_all(sums, pool.map(_run_chunk, tasks, chunksize=max(len(tasks) // (workers * 4), 1)))
+    _columns = _policies = None
+
+    report = {}
+    for name, (zones, tiers, count) in zip(names, sums):
+        report[name] = {
+            "revenue": from_cents(sum(zones)),
+            "tickets": count,
+            "zones": {columns.zones[i]: from_cents(c) for i, c in enumerate(zones)},
+            "tiers": {columns.tiers[i]: from_cents(c) for i, c in enumerate(tiers)},
+        }
+    return report
+
+
+def _init_worker(columns, policies):
+    global _columns, _policies
+    _columns, _policies = columns, policies
+
+
+def _empty_rollup(columns):
+    return [0] * len(columns.zones), [0] * len(columns.tiers), 0
+
+
+def _run_chunk(task):
+    """Reprice one slice of the shared columns under one variant; returns per-code sums."""
+    variant, start, stop = task
+    cols = _columns.rows(start, stop)
+    totals = reprice(cols, _policies[variant])
+    if HAVE_NUMPY and isinstance(totals, np.ndarray):
+        zones = np.bincount(cols.zone, weights=totals, minlength=len(cols.zones))
+        tiers = np.bincount(cols.tier, weights=totals, minlength=len(cols.tiers))
+        return variant, ([int(round(c)) for c in zones], [int(round(c)) for c in tiers], len(cols))
+    zones, tiers, _ = _empty_rollup(cols)
+    for z, t, total in zip(cols.zone, cols.tier, totals):
+        zones[z] += total
+        tiers[t] += total
+    return variant, (zones, tiers, len(cols))
+
+
+def _merge_all(sums, results):
+    for variant, (zones, tiers, count) in results:
+        z_sum, t_sum, total_count = sums[variant]
+        sums[variant] = (
+            [a + b for a, b in zip(z_sum, zones)],
+            [a + b for a, b in zip(t_sum, tiers)],
+            total_count + count,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.simulator", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--variants", required=True, help="JSON file of variant name -> POLICY overrides")
+    parser.add_argument("--tickets", default=COMPLETED_FILE,
+                        help="ticket file in data/ (the default reads the date partitions, if any)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="tickets per task")
+    parser.add_argument("--repeat", type=int, default=1, help="replicate the history N times (load testing)")
+    args = parser.parse_args(argv)
+
+    with open(args.variants, "r", encoding="utf-8") as f:
+        overrides = json.load(f, parse_float=Decimal)
+    variants = {"current": POLICY}
+    variants.update({name: apply_overrides(POLICY, o) for name, o in overrides.items()})
+
+    tickets = list(iter_completed()) if args.tickets == COMPLETED_FILE else load_tickets(args.tickets)
+    tickets *= args.repeat
+    report = simulate(tickets, variants, workers=args.workers, chunk_size=args.chunk_size)
+
+    for name, r in report.items():
+        print(f"\n{name}: ${r['revenue']:.2f} from {r['tickets']} tickets")
+        for label in ("zones", "tiers"):
+            for key, amount in sorted(r[label].items()):
+                print(f"  {key:<12}: ${amount:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+SQLite ticket storage (stdlib sqlite3, WAL mode, local file, no server).
+
+SQLiteTicketStore offers the same load_tickets/save_tickets calls as src.data_manager,
+the lookups of data_manager.TicketStore, and indexed queries. Each ticket file maps to a
+table and each ticket is stored as its JSON record, with the indexed fields copied into
+columns; rows keep the order tickets were added in (seq), as the JSON files do.
+
+The UI uses it instead of the JSON files when PARKING_TICKET_DB names a database
+(src.ui.open_ticket_store).
+
+    python -m src.sqlite_store [data/tickets.db]   # migrate data/*.json into the database
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from src.data_manager import (COMPLETED_FILE, DATA_DIR, PENDING_FILE, iso_bound, iter_completed as iter_json_completed,
+                               load_tickets as load_json_tickets)
+
+DEFAULT_DB = DATA_DIR / "tickets.db"
+
+# Ticket file name -> table name.
+TABLES = {"tickets_pending.json": "pending", "tickets_completed.json": "completed"}
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS {table} (
+    seq         INTEGER PRIMARY KEY,
+    ticket_id   INTEGER NOT NULL UNIQUE,
+    zone        TEXT,
+    member_tier TEXT,
+    entry_time  TEXT,
+    data        TEXT NOT NULL
+)""",
+    "CREATE INDEX IF NOT EXISTS {table}_entry_time ON {table} (entry_time)",
+    "CREATE INDEX IF NOT EXISTS {table}_zone ON {table} (zone)",
+    "CREATE INDEX IF NOT EXISTS {table}_member_tier ON {table} (member_tier)",
+)
+
+
+class SQLiteTicketStore:
+    """Pending and completed tickets in one SQLite database."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            # DDL does not open a transaction by itself: BEGIN so the schema is created whole or not at all
+            self.conn.execute("BEGIN")
+            for table in TABLES.values():
+                for statement in _SCHEMA:
+                    self.conn.execute(statement.format(table=table))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # data_manager-compatible interface
+
+    def load_tickets(self, filename):
+        table = _table(filename)
+        rows = self.conn.execute(f"SELECT data FROM {table} ORDER BY seq")
+        return [json.loads(data) for (data,) in rows]
+
+    def save_tickets(self, filename, data):
+        table = _table(filename)
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(_INSERT.format(table=table), (_row(t) for t in data))
+
+    # data_manager.TicketStore-compatible lookups
+
+    def pending(self):
+        return self.load_tickets(PENDING_FILE)
+
+    def completed(self):
+        return self.load_tickets(COMPLETED_FILE)
+
+    def get_pending(self, ticket_id):
+        return self.get_ticket(ticket_id, PENDING_FILE)
+
+    def get_completed(self, ticket_id):
+        return self.get_ticket(ticket_id, COMPLETED_FILE)
+
+    def by_zone(self, zone, filename=PENDING_FILE):
+        rows = self.conn.execute(f"SELECT data FROM {_table(filename)} WHERE zone = ? ORDER BY seq", (zone,))
+        return [json.loads(data) for (data,) in rows]
+
+    def by_entry_date(self, date, filename=COMPLETED_FILE):
+        """Tickets entered on a date ("YYYY-MM-DD" or datetime.date)."""
+        date = str(date)
+        rows = self.conn.execute(
+            f"SELECT data FROM {_table(filename)} WHERE entry_time >= ? AND entry_time < ? ORDER BY seq",
+            (date, date + "~"),  # "~" sorts after the "T..." time part
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def remove_tickets(self, filename, ticket_ids):
+        with self.conn:
+            self.conn.executemany(f"DELETE FROM {_table(filename)} WHERE ticket_id = ?",
+                                  [(tid,) for tid in ticket_ids])
+
+    # indexed queries
+
+    def get_ticket(self, ticket_id, filename=None):
+        """One ticket by id (pending first, then completed, unless filename picks a table)."""
+        tables = [_table(filename)] if filename else TABLES.values()
+        for table in tables:
+            row = self.conn.execute(f"SELECT data FROM {table} WHERE ticket_id = ?", (ticket_id,)).fetchone()
+            if row:
+                return json.loads(row[0])
+        return None
+
+    def tickets_entered_between(self, start, end, filename=COMPLETED_FILE):
+        """Tickets whose entry_time is in [start, end) (dates, datetimes or ISO strings)."""
+        table = _table(filename)
+        rows = self.conn.execute(
+            f"SELECT data FROM {table} WHERE entry_time >= ? AND entry_time < ? ORDER BY entry_time",
+            (iso_bound(start), iso_bound(end)),
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def iter_completed(self, start=None, end=None):
+        """
+        Completed tickets entered in [start, end) (None is open-ended), streamed from the
+        cursor like data_manager.iter_completed.
+        """
+        if start is None and end is None:
+            rows = self.conn.execute("SELECT data FROM completed ORDER BY seq")
+        else:
+            rows = self.conn.execute(
+                "SELECT data FROM completed WHERE entry_time >= ? AND entry_time < ? ORDER BY seq",
+                ("" if start is None else iso_bound(start), "~" if end is None else iso_bound(end)),
+            )
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def put_ticket(self, filename, ticket):
+        with self.conn:
+            self.conn.execute(_UPSERT.format(table=_table(filename)), _row(ticket))
+
+    def complete_ticket(self, completed):
+        """Move a pending ticket to completed (the given completed record) in one transaction."""
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM pending WHERE ticket_id = ?", (completed["ticket_id"],))
+            if cur.rowcount != 1:
+                raise KeyError(completed["ticket_id"])
+            self.conn.execute(_UPSERT.format(table="completed"), _row(completed))
+
+    def migrate_from_json(self):
+        """
+        Import the JSON ticket files in DATA_DIR (snapshot plus journal) into the database;
+        completed tickets come from their date partitions, if any, and are streamed.
+        """
+        self.save_tickets(PENDING_FILE, load_json_tickets(PENDING_FILE))
+        self.save_tickets(COMPLETED_FILE, iter_json_completed())
+
+
+_INSERT = "INSERT INTO {table} (ticket_id, zone, member_tier, entry_time, data) VALUES (?, ?, ?, ?, ?)"
+# a replaced ticket keeps its place (seq), as a journal put does in the JSON files
+_UPSERT = _INSERT + (" ON CONFLICT (ticket_id) DO UPDATE SET zone = excluded.zone, "
+                     "member_tier = excluded.member_tier, entry_time = excluded.entry_time, data = excluded.data")
+
+
+def _table(filename):
+    try:
+        return TABLES[Path(filename).name]
+    except KeyError:
+        raise ValueError(f"No table for {filename}") from None
+
+
+def _row(ticket):
+    return (ticket["ticket_id"], ticket.get("zone"), ticket.get("member_tier"), ticket.get("entry_time"),
+            json.dumps(ticket, separators=(",", ":")))
+
+
+if __name__ == "__main__":
+    with SQLiteTicketStore(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB) as store:
+        store.migrate_from_json()
+        for filename in TABLES:
+            print(f"{filename}: {len(store.load_tickets(filename))} tickets")
@@ -0,0 +1,186 @@
+import copy
+from dataclasses import dataclass, field
+from datetime import time
+from decimal import Decimal
+from types import MappingProxyType
+
+
+# Day types the policy prices explicitly; anything else falls back to weekday.
+DAY_KEYS = {"WEEKDAY": "weekday", "WEEKEND": "weekend", "PUBLIC_HOLIDAY": "public_holiday"}
+
+# Tiers that get the member lost-ticket penalty (STAFF counts as a member here).
+LOST_TICKET_MEMBER_TIERS = ("MEMBER", "SILVER", "GOLD", "STAFF")
+
+
+@dataclass(frozen=True, slots=True)
+class Tariff:
+    """Pre-resolved rates for one (zone, day_type)."""
+
+    zone: str
+    day_type: str
+    grace_minutes: int
+    first2h_flat: Decimal = None
+    per_hour: Decimal = None
+    per_entry_member: Decimal = None
+    per_entry_non_member: Decimal = None
+    daily_cap: Decimal = None
+    overnight_penalty: Decimal = None
+    cutoff: time = None
+
+
+@dataclass(frozen=True, slots=True)
+class Membership:
+    """Free hours and daily cap for one member tier."""
+
+    tier: str
+    free_hours: int = 0
+    daily_cap: Decimal = None
+
+
+@dataclass(frozen=True, slots=True)
+class Partner:
+    """Retail validation partner: spend at least min_spend to get free_hours."""
+
+    min_spend: Decimal
+    free_hours: int
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPolicy:
+    """Immutable, pre-resolved form of a POLICY dict (see compile_policy)."""
+
+    tariffs: MappingProxyType
+    memberships: MappingProxyType
+    partners: MappingProxyType
+    lost_ticket: MappingProxyType
+    cutoff: time
+    grace_minutes: int
+    cents: bool = False
+    # Version id from the policy's "version" key (set for policies loaded by src.policy_store).
+    version: str = None
+    # Charge tables built on demand by fee_engine.charge_table, keyed by
+    # (zone, day_type, member_tier, validation_hours).
+    tables: dict = field(default_factory=dict, compare=False, repr=False)
+
+    def tariff(self, zone, day_type):
+        """Tariff for zone/day_type, falling back to weekday for unknown day types."""
+        tariffs = self.tariffs
+        t = tariffs.get((zone, day_type))
+        if t is None:
+            t = tariffs.get((zone, "WEEKDAY"))
+            if t is None:
+                raise KeyError(zone)
+        return t
+
+    def membership(self, member_tier):
+        """Membership perks for a tier; unknown tiers get no perks."""
+        m = self.memberships.get(member_tier)
+        if m is None:
+            m = Membership(member_tier)
+        return m
+
+    def lost_ticket_penalty(self, zone, member_tier):
+        """Flat lost-ticket charge: valet rate, else member or non-member rate."""
+        lt = self.lost_ticket
+        if zone == "VALET":
+            return lt["valet"]
+        return lt["member"] if member_tier in LOST_TICKET_MEMBER_TIERS else lt["non_member"]
+
+
+def to_cents(amount):
+    """Exact int cents for a Decimal amount (None stays None)."""
+    if amount is None:
+        return None
+    cents = Decimal(amount) * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Amount {amount} is not a whole number of cents")
+    return int(cents)
+
+
+def from_cents(cents):
+    """Decimal dollars with two places for an int cents amount."""
+    return Decimal(cents).scaleb(-2)
+
+
+def _same(amount):
+    return amount
+
+
+def parse_cutoff(value):
+    """Turn an "HH:MM" cut-off string into a datetime.time."""
+    cutoff_hour, cutoff_min = map(int, value.split(":"))
+    return time(cutoff_hour, cutoff_min)
+
+
+# Compiled forms of raw policy dicts, keyed by (id(), cents), each stored with the dict and
+# a deep copy of it. The dict itself keeps the id from being reused while cached; the copy
+# is compared with the dict on every lookup (a C-level dict comparison, well under a
+# microsecond against hundreds for a compile), so a dict edited in place is recompiled
+# on its next use. Callers on a hot path compile once and pass the CompiledPolicy.
+_CACHE_SIZE = 8
+_compiled = {}
+
+
+def compile_policy(policy, refresh=False, cents=False):
+    """
+    Turn a POLICY dict into a CompiledPolicy with one Tariff per (zone, day_type).
+    Already compiled policies are returned unchanged. A dict is compiled once and reused
+    until its contents change; refresh=True forces a new compile.
+
+    With cents=True every charge, cap and penalty is converted once to int cents so the
+    engine runs on int arithmetic; compute_fee converts back to Decimal when building the Fee.
+    """
+    if isinstance(policy, CompiledPolicy):
+        return policy
+
+    key = (id(policy), cents)
+    if not refresh:
+        hit = _compiled.get(key)
+        if hit is not None and hit[0] is policy and hit[1] == policy:
+            return hit[2]
+
+    amount = to_cents if cents else _same
+    cutoff = parse_cutoff(policy["cutoff_time"])
+    tariffs = {}
+    for zone, zone_rates in policy["zones"].items():
+        for day_type, day_key in DAY_KEYS.items():
+            rate = zone_rates.get(day_key)
+            if rate is None:
+                continue
+            tariffs[(zone, day_type)] = Tariff(
+                zone=zone,
+                day_type=day_type,
+                grace_minutes=zone_rates["grace_minutes"],
+                first2h_flat=amount(rate.get("first2h_flat")),
+                per_hour=amount(rate.get("per_hour")),
+                per_entry_member=amount(rate.get("per_entry_member")),
+                per_entry_non_member=amount(rate.get("per_entry_non_member")),
+                daily_cap=amount(zone_rates.get("daily_cap")),
+                overnight_penalty=amount(zone_rates.get("overnight_penalty")),
+                cutoff=cutoff,
+            )
+
+    memberships = {
+        tier: Membership(tier, int(m.get("free_hours", 0)), amount(m.get("daily_cap")))
+        for tier, m in policy["memberships"].items()
+    }
+    partners = {
+        store: Partner(v["min_spend"], v["free_hours"])
+        for store, v in policy["validations"]["partners"].items()
+    }
+
+    compiled = CompiledPolicy(
+        tariffs=MappingProxyType(tariffs),
+        memberships=MappingProxyType(memberships),
+        partners=MappingProxyType(partners),
+        lost_ticket=MappingProxyType({k: amount(v) for k, v in policy["penalties"]["lost_ticket"].items()}),
+        cutoff=cutoff,
+        grace_minutes=policy.get("grace_minutes", 0),
+        cents=cents,
+        version=policy.get("version"),
+    )
+    _compiled.pop(key, None)
+    if len(_compiled) >= _CACHE_SIZE:
+        _compiled.pop(next(iter(_compiled)))
+    _compiled[key] = (policy, copy.deepcopy(policy), compiled)
+    return compiled
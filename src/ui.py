@@ -1,8 +1,25 @@
 # src/ui.py
+import os
 from datetime import datetime
+from src.business_calendar import day_type_for, ticket_day_type
 from src.fee_engine import compute_fee
 from src.policy import POLICY
-from src.data_manager import load_tickets
+from src.receipts import render_receipt
+from src.data_manager import TicketStore, iso_bound, iter_completed, load_tickets
+from src.sqlite_store import SQLiteTicketStore
+
+# Names a SQLite database (built by `python -m src.sqlite_store`) to look tickets up in
+# instead of the JSON files.
+TICKET_DB_ENV = "PARKING_TICKET_DB"
+
+def open_ticket_store(db=None):
+    """SQLiteTicketStore over `db` if given, else a TicketStore over the JSON ticket files."""
+    if db:
+        return SQLiteTicketStore(db)
+    return TicketStore(load_tickets)
+
+# Resident view of the ticket files (re-reads a file only when it changes), or the database.
+ticket_store = open_ticket_store(os.environ.get(TICKET_DB_ENV))
 
 def main():
     print("\n============================================")
@@ -29,11 +46,11 @@ def main():
             print("Invalid choice.")
 
 def compute_fee_manual():
-    def prompt_choice(prompt, options):
+    def prompt_choice(prompt, options, allow_blank=False):
         opts_str = "/".join(options)
         while True:
             s = input(f"{prompt} ({opts_str}): ").strip().upper()
-            if s in options:
+            if s in options or (allow_blank and not s):
                 return s
             print(f"Invalid input. Please enter one of: {opts_str}")
 
@@ -75,7 +92,8 @@ def compute_fee_manual():
 
     tier = prompt_choice("Membership tier", TIERS)
     zone = prompt_choice("Zone", ZONES)
-    day_type = prompt_choice("Day type", DAYS)
+    # blank: take the day type from the calendar for the entry date
+    day_type = prompt_choice("Day type [blank = calendar]", DAYS, allow_blank=True)
     lost_ticket = prompt_yes_no("Lost ticket")
 
     duration = None
@@ -101,6 +119,7 @@ def compute_fee_manual():
     now = datetime.now()
     entry_at = now.replace(hour=12, minute=0).isoformat(timespec="minutes")
     exit_at  = now.replace(hour=16, minute=10).isoformat(timespec="minutes")
+    day_type = day_type or day_type_for(entry_at)
 
     fee = compute_fee(
         duration_minutes=duration or 0,
@@ -127,7 +146,8 @@ def compute_fee_manual():
     )
 
 def compute_from_pending():
-    tickets = load_tickets("tickets_pending.json")
+    store = ticket_store
+    tickets = store.pending()
     if not tickets:
         print("No pending tickets found.")
         return
@@ -142,10 +162,11 @@ def compute_from_pending():
         print("Invalid ID.")
         return
 
-    ticket = next((t for t in tickets if t["ticket_id"] == tid), None)
+    ticket = store.get_pending(tid)
     if not ticket:
         print("Ticket not found.")
         return
+    ticket = dict(ticket)
 
     print("\nTicket Details")
     print("------------------------------")
@@ -184,7 +205,7 @@ def compute_from_pending():
     fee = compute_fee(
         duration_minutes=duration or 0,
         zone=ticket["zone"],
-        day_type=ticket["day_type"],
+        day_type=ticket_day_type(ticket),
         member_tier=ticket["member_tier"],
         validation=ticket["validation"],
         lost_ticket=ticket["lost_ticket"],
@@ -197,23 +218,30 @@ def compute_from_pending():
         zone=ticket["zone"],
         member_tier=ticket["member_tier"],
         fee=fee,
-        day_type=ticket["day_type"],
+        day_type=ticket_day_type(ticket),
         entry_at=ticket["entry_time"],
         exit_at=exit_at,
         duration_minutes=duration,
         validation=ticket["validation"],
     )
 
-def print_receipt():
-    tickets = load_tickets("tickets_completed.json")
-    if not tickets:
-        print("No completed tickets found.")
-        return
-
-    print("\nAvailable receipts:")
-    for t in tickets:
+def print_receipt(start=None, end=None):
+    # completed tickets are streamed for the listing (never held in memory) since the history
+    # grows without bound; with date partitions only the days overlapping [start, end) are
+    # read. A SQLite store lists from its cursor. The chosen ticket is looked up by id in the
+    # store's index rather than by streaming the history a second time.
+    store = ticket_store
+    completed = store.iter_completed if isinstance(store, SQLiteTicketStore) else iter_completed
+    listed = False
+    for t in completed(start, end):
+        if not listed:
+            print("\nAvailable receipts:")
+            listed = True
         tag = "LOST TICKET" if t["lost_ticket"] else f"Total: ${t['total']:.2f}"
         print(f"{t['ticket_id']} | {t['zone']} | {t['member_tier']} | {tag}")
+    if not listed:
+        print("No completed tickets found.")
+        return
 
     try:
         tid = int(input("\nEnter ticket ID to view: "))
@@ -221,7 +249,12 @@ def print_receipt():
         print("Invalid ID.")
         return
 
-    ticket = next((t for t in tickets if t["ticket_id"] == tid), None)
+    ticket = store.get_completed(tid)
+    if ticket and (start is not None or end is not None):
+        # only the listed range can be chosen from
+        entered, lo, hi = ticket.get("entry_time") or "", iso_bound(start), iso_bound(end)
+        if not (entered and (lo is None or entered >= lo) and (hi is None or entered < hi)):
+            ticket = None
     if not ticket:
         print("Ticket not found.")
         return
@@ -229,7 +262,7 @@ def print_receipt():
     fee = compute_fee(
         duration_minutes=ticket.get("duration_minutes") or 0,
         zone=ticket["zone"],
-        day_type=ticket["day_type"],
+        day_type=ticket_day_type(ticket),
         member_tier=ticket["member_tier"],
         validation=ticket.get("validation"),
         lost_ticket=ticket["lost_ticket"],
@@ -243,7 +276,7 @@ def print_receipt():
         zone=ticket["zone"],
         member_tier=ticket["member_tier"],
         fee=fee,
-        day_type=ticket["day_type"],
+        day_type=ticket_day_type(ticket),
         entry_at=ticket.get("entry_time"),
         exit_at=ticket.get("exit_time") or "LOST TICKET",
         duration_minutes=ticket.get("duration_minutes"),
@@ -261,68 +294,17 @@ def print_receipt_output(ticket_id=None,
                          validation=None,
                          return_str=False):
     """Pretty-print a 1U-style parking receipt. If return_str=True, returns the text."""
-    # duration display
-    if duration_minutes is not None:
-        hours = duration_minutes // 60
-        mins = duration_minutes % 60
-        duration_display = f"{hours}h {mins}m"
-    else:
-        duration_display = "N/A"
-
-    # validation display (checks spend threshold)
-    if validation:
-        store = validation.get("store", "").lower()
-        spend = validation.get("spend", 0)
-        partners = {"woolworths": 30}
-        if store in partners and spend >= partners[store]:
-            validation_display = "2 FREE HOURS"
-        else:
-            validation_display = "NONE"
-    else:
-        validation_display = "NONE"
-
-    # free hours display (membership perks)
-    free_hours = getattr(fee, "member_free_minutes", 0) // 60
-    free_hours_display = f"{free_hours}h" if free_hours else "NONE"
-
-    rid = f"RCP-{ticket_id or datetime.now().strftime('%H%M%S')}"
-    lines = [
-        "==============================================",
-        "             1U PARKING RECEIPT               ",
-        "==============================================",
-        f"Receipt ID       : {rid}",
-        f"Ticket ID        : T-{ticket_id or 'XXXXXX'}",
-        "",
-        "----------------------------------------------",
-        "Customer / Ticket",
-        "----------------------------------------------",
-        f"Ticket Type        : PAPER TICKET",
-        f"Membership Tier    : {member_tier or 'N/A'}",
-        "",
-        "----------------------------------------------",
-        "Parking Details",
-        "----------------------------------------------",
-        f"Zone               : {zone or 'N/A'}",
-        f"Day Type           : {day_type or 'N/A'}",
-        f"Entry Date/Time    : {entry_at or 'N/A'}",
-        f"Exit  Date/Time    : {exit_at or 'N/A'}",
-        f"Duration           : {duration_display}",
-        "",
-        "----------------------------------------------",
-        "Charges Breakdown",
-        "----------------------------------------------",
-        f"Time Charge            : ${fee.time_charge:.2f}",
-        f"Free Hours (Tier Perk) : {free_hours_display}",
-        f"Validation             : {validation_display}",
-        "----------------------------------------------",
-        f"TOTAL DUE              : ${fee.total:.2f}",
-        f"AMOUNT PAID            : ${fee.total:.2f}",
-        "----------------------------------------------",
-        "Thank you for visiting 1U Shopping Centre!",
-        "For assistance, contact support@1uparking.my",
-        "==============================================",
-    ]
-    output = "\n".join(lines)
+    output = render_receipt(
+        ticket_id=ticket_id,
+        zone=zone,
+        member_tier=member_tier,
+        fee=fee,
+        day_type=day_type,
+        entry_at=entry_at,
+        exit_at=exit_at,
+        duration_minutes=duration_minutes,
+        validation=validation,
+    )
     if return_str:
         return output
     print(output)
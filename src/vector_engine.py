@@ -0,0 +1,279 @@
+"""
+Vectorized repricing of historical tickets (e.g. a proposed tariff against months of
+tickets_completed.json). Tickets are encoded once into small-int columns that do not depend
+on any policy, then repriced per policy with NumPy array operations. Without NumPy the
+same columns are priced row by row through the scalar engine's helpers.
+"""
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+    np = None
+
+from src.business_calendar import day_types
+from src.fee_engine import lookup_time_charge, parse_stay
+from src.tariff import LOST_TICKET_MEMBER_TIERS, compile_policy, from_cents
+
+HAVE_NUMPY = np is not None
+
+# Day type codes; unrecognised day types are encoded as WEEKDAY, like compute_fee's fallback.
+DAY_TYPES = ("WEEKDAY", "WEEKEND", "PUBLIC_HOLIDAY")
+
+# Day code for a ticket with no day_type and no usable entry_time: priced at 0, as
+# compute_fees gives it Fee().
+NO_DAY = -1
+
+# Tiers charged the member per-entry rate in OUTDOOR.
+OUTDOOR_MEMBER_TIERS = ("MEMBER", "SILVER", "GOLD")
+
+# Stand-in for "no cap" in int-cents arrays.
+NO_CAP = 2 ** 62
+
+
+@dataclass(frozen=True)
+class TicketColumns:
+    """
+    Column form of a ticket set. zone/tier/store are codes into the zones/tiers/stores
+    name tuples (store -1 = no validation); day is a code into DAY_TYPES (or NO_DAY). Exit timestamps
+    are kept as entry/exit day ordinals plus exit second-of-day (has_exit False when the
+    timestamps are missing or unparseable) for the cut-off check.
+    """
+
+    ticket_id: object
+    zone: object
+    tier: object
+    day: object
+    duration: object
+    lost: object
+    store: object
+    spend: object
+    has_exit: object
+    entry_day: object
+    exit_day: object
+    exit_second: object
+    zones: tuple
+    tiers: tuple
+    stores: tuple
+
+    def __len__(self):
+        return len(self.ticket_id)
+
+    def rows(self, start, stop):
+        """Columns for tickets[start:stop] (NumPy slices are views, so no data is copied)."""
+        sliced = {name: getattr(self, name)[start:stop] for name in _ROW_FIELDS}
+        return TicketColumns(zones=self.zones, tiers=self.tiers, stores=self.stores, **sliced)
+
+
+_ROW_FIELDS = ("ticket_id", "zone", "tier", "day", "duration", "lost", "store", "spend",
+               "has_exit", "entry_day", "exit_day", "exit_second")
+
+
+def encode_tickets(tickets, use_numpy=None):
+    """
+    Encode ticket records (tickets_completed.json shape) into TicketColumns.
+    Columns are NumPy arrays when NumPy is available (and use_numpy is not False), else lists.
+    """
+    if use_numpy is None:
+        use_numpy = HAVE_NUMPY
+    day_codes = {name: code for code, name in enumerate(DAY_TYPES)}
+    names = {"zone": {}, "tier": {}, "store": {}}
+    cols = {k: [] for k in _ROW_FIELDS}
+
+    tickets = list(tickets)
+    # tickets without a day_type take it from the calendar, as in compute_fees
+    undated = [i for i, t in enumerate(tickets) if not t.get("day_type")]
+    resolved = dict(zip(undated, day_types([tickets[i].get("entry_time") for i in undated])))
+
+    for i, t in enumerate(tickets):
+        day_type = resolved[i] if i in resolved else t["day_type"]
+        lost_ticket = bool(t.get("lost_ticket"))
+        if day_type is None:
+            # nothing to price: no timestamps are needed (or parsed)
+            entry_dt = exit_dt = None
+            duration = 0
+        else:
+            entry_dt, exit_dt, duration = parse_stay(t, lost_ticket)
+        validation = t.get("validation")
+        cols["ticket_id"].append(t.get("ticket_id"))
+        cols["zone"].append(names["zone"].setdefault(t["zone"], len(names["zone"])))
+        cols["tier"].append(names["tier"].setdefault(t["member_tier"], len(names["tier"])))
+        cols["day"].append(NO_DAY if day_type is None else day_codes.get(day_type, 0))
+        cols["duration"].append(duration)
+        cols["lost"].append(lost_ticket)
+        if validation:
+            store = validation.get("store", "").lower()
+            cols["store"].append(names["store"].setdefault(store, len(names["store"])))
+            cols["spend"].append(validation.get("spend", 0))
+        else:
+            cols["store"].append(-1)
+            cols["spend"].append(0)
+        cols["has_exit"].append(exit_dt is not None)
+        if exit_dt is not None:
+            cols["entry_day"].append(entry_dt.toordinal())
+            cols["exit_day"].append(exit_dt.toordinal())
+            exit_t = exit_dt.time()
+            # round sub-second exits up so "> cut-off" stays exact at second resolution
+            cols["exit_second"].append(exit_t.hour * 3600 + exit_t.minute * 60 + exit_t.second
+                                       + (exit_t.microsecond > 0))
+        else:
+            cols["entry_day"].append(0)
+            cols["exit_day"].append(0)
+            cols["exit_second"].append(0)
+
+    if use_numpy:
+        dtypes = {"zone": np.int16, "tier": np.int16, "day": np.int8, "duration": np.int64,
+                  "lost": np.bool_, "store": np.int16, "spend": np.float64, "has_exit": np.bool_,
+                  "entry_day": np.int32, "exit_day": np.int32, "exit_second": np.int32}
+        for k, dtype in dtypes.items():
+            cols[k] = np.asarray(cols[k], dtype=dtype)
+        cols["ticket_id"] = np.asarray(cols["ticket_id"], dtype=object)
+
+    return TicketColumns(
+        zones=tuple(names["zone"]),
+        tiers=tuple(names["tier"]),
+        stores=tuple(names["store"]),
+        **cols,
+    )
+
+
+def reprice(columns, policy):
+    """
+    Total due for every ticket in `columns` (TicketColumns or ticket records) under `policy`,
+    as int cents: a NumPy int64 array on the NumPy path, else a list of ints.
+    """
+    if not isinstance(columns, TicketColumns):
+        columns = encode_tickets(columns)
+    cents_policy = compile_policy(policy, cents=True)
+    if HAVE_NUMPY and isinstance(columns.duration, np.ndarray):
+        return _reprice_numpy(columns, cents_policy)
+    return _reprice_python(columns, cents_policy)
+
+
+def to_decimal(totals):
+    """Convert int-cents totals from reprice() to Decimal amounts."""
+    return [from_cents(int(c)) for c in totals]
+
+
+def _reprice_numpy(cols, policy):
+    zones, tiers = cols.zones, cols.tiers
+    nz, nd, nt = len(zones), len(DAY_TYPES), len(tiers)
+
+    # Per-zone / per-(zone, day) / per-tier parameters, gathered per ticket below.
+    grace = np.zeros(nz, np.int64)
+    zone_cap = np.full(nz, NO_CAP, np.int64)
+    overnight = np.zeros(nz, np.int64)
+    flat = np.zeros((nz, nd), np.int64)
+    per_hour = np.zeros((nz, nd), np.int64)
+    entry_member = np.zeros((nz, nd), np.int64)
+    entry_non_member = np.zeros((nz, nd), np.int64)
+    used_zones = np.unique(cols.zone)
+    for z, zone in enumerate(zones):
+        if z not in used_zones:
+            continue
+        for d, day_type in enumerate(DAY_TYPES):
+            t = policy.tariff(zone, day_type)
+            flat[z, d] = t.first2h_flat or 0
+            per_hour[z, d] = t.per_hour or 0
+            entry_member[z, d] = t.per_entry_member or 0
+            entry_non_member[z, d] = t.per_entry_non_member or 0
+        grace[z] = t.grace_minutes
+        zone_cap[z] = NO_CAP if t.daily_cap is None else t.daily_cap
+        overnight[z] = t.overnight_penalty or 0
+
+    free = np.zeros(nt, np.int64)
+    member_cap = np.full(nt, NO_CAP, np.int64)
+    outdoor_member = np.zeros(nt, np.bool_)
+    lost_member = np.zeros(nt, np.bool_)
+    for i, tier in enumerate(tiers):
+        m = policy.membership(tier)
+        free[i] = m.free_hours
+        member_cap[i] = NO_CAP if m.daily_cap is None else m.daily_cap
+        outdoor_member[i] = tier in OUTDOOR_MEMBER_TIERS
+        lost_member[i] = tier in LOST_TICKET_MEMBER_TIERS
+
+    z, d, tr = cols.zone, cols.day, cols.tier
+    code = {name: zones.index(name) if name in zones else -1
+            for name in ("REGULAR", "PREFERRED", "OUTDOOR", "VALET", "STAFF")}
+    is_regular = z == code["REGULAR"]
+    is_preferred = z == code["PREFERRED"]
+    is_outdoor = z == code["OUTDOOR"]
+    is_valet = z == code["VALET"]
+    is_staff = z == code["STAFF"]
+
+    # Step 4: billed hours, rounded down, at least one
+    hours = np.maximum(cols.duration // 60, 1)
+
+    # Step 5: validation spend mask -> free hours (not VALET/OUTDOOR), stacked with membership
+    validation_hours = np.zeros(len(cols), np.int64)
+    for s, store in enumerate(cols.stores):
+        partner = policy.partners.get(store)
+        if partner is not None:
+            mask = (cols.store == s) & (cols.spend >= float(partner.min_spend))
+            validation_hours[mask] = partner.free_hours
+    validation_hours[is_valet | is_outdoor] = 0
+    free_hours = np.where(is_regular | is_preferred, free[tr] + validation_hours,
+                          np.where(is_staff, validation_hours, 0))
+    bill = np.where(is_outdoor | is_valet, hours, np.maximum(hours - free_hours, 0))
+
+    # Step 6: zone pricing
+    f, ph = flat[z, d], per_hour[z, d]
+    regular = np.where(
+        bill <= 0, 0,
+        np.where(free_hours >= 2, ph * bill,
+                 np.where(bill <= 2 - free_hours, f, f + (bill - (2 - free_hours)) * ph)))
+    preferred = np.where(bill <= 0, 0, ph * bill)
+    outdoor = np.where(outdoor_member[tr], entry_member[z, d], entry_non_member[z, d])
+    valet = np.where(hours <= 2, f, f + (hours - 2) * ph)
+    staff = np.minimum(ph * bill, zone_cap[z])
+    charge = np.select([is_regular, is_preferred, is_outdoor, is_valet, is_staff],
+                       [regular, preferred, outdoor, valet, staff], 0)
+
+    # Step 7: member cap (not VALET) and zone cap
+    charge = np.where(is_valet, charge, np.minimum(charge, member_cap[tr]))
+    charge = np.minimum(charge, zone_cap[z])
+
+    # Step 7b: overnight penalty when exit is on a later day and after the cut-off
+    c = policy.cutoff
+    cutoff_second = c.hour * 3600 + c.minute * 60 + c.second
+    crossed = cols.has_exit & (cols.exit_day > cols.entry_day) & (cols.exit_second > cutoff_second)
+    total = charge + np.where(crossed, overnight[z], 0)
+
+    # Step 3: grace period, Step 2: lost ticket (checked first by the scalar engine)
+    total = np.where(cols.duration < grace[z], 0, total)
+    lt = policy.lost_ticket
+    lost_penalty = np.where(is_valet, lt["valet"], np.where(lost_member[tr], lt["member"], lt["non_member"]))
+    total = np.where(cols.lost, lost_penalty, total)
+    # no day type to price under (its rates above were gathered from the last column)
+    return np.where(d == NO_DAY, 0, total).astype(np.int64)
+
+
+def _reprice_python(cols, policy):
+    c = policy.cutoff
+    cutoff_second = c.hour * 3600 + c.minute * 60 + c.second
+    totals = []
+    for i in range(len(cols)):
+        if cols.day[i] == NO_DAY:
+            totals.append(0)
+            continue
+        zone, tier = cols.zones[cols.zone[i]], cols.tiers[cols.tier[i]]
+        tariff = policy.tariff(zone, DAY_TYPES[cols.day[i]])
+        membership = policy.membership(tier)
+        duration = cols.duration[i]
+        if cols.lost[i]:
+            totals.append(policy.lost_ticket_penalty(zone, tier))
+            continue
+        if duration < tariff.grace_minutes:
+            totals.append(0)
+            continue
+        hours = max(duration // 60, 1)
+        validation_hours = 0
+        if cols.store[i] >= 0 and zone not in ("VALET", "OUTDOOR"):
+            partner = policy.partners.get(cols.stores[cols.store[i]])
+            if partner is not None and cols.spend[i] >= partner.min_spend:
+                validation_hours = partner.free_hours
+        total = lookup_time_charge(policy, tariff, membership, hours, validation_hours)
+        if cols.has_exit[i] and cols.exit_day[i] > cols.entry_day[i] and cols.exit_second[i] > cutoff_second:
+            total += tariff.overnight_penalty
+        totals.append(total)
+    return totals
@@ -0,0 +1,102 @@
+"""Fixtures shared by the test modules: sample tickets, the scalar reference pricer, a scratch data/."""
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from src import data_manager
+from src.fee_engine import compute_fee
+from src.policy import POLICY
+
+
+ZONES = ("REGULAR", "PREFERRED", "OUTDOOR", "VALET", "STAFF")
+TIERS = ("NON-MEMBER", "MEMBER", "SILVER", "GOLD", "STAFF")
+DAYS = ("WEEKDAY", "WEEKEND", "PUBLIC_HOLIDAY")
+
+
+def make_tickets():
+    """Every zone/tier/day combination over a spread of durations, validations and exits."""
+    tickets = []
+    entry = datetime(2025, 11, 1, 20, 0)
+    tid = 1
+    for zone in ZONES:
+        for tier in TIERS:
+            for day_type in DAYS:
+                for minutes in (0, 14, 15, 59, 61, 150, 179, 360, 480, 600, 1000):
+                    for validation in (None, {"store": "Woolworths", "kind": "HOURS", "spend": 35}):
+                        exit_at = entry + timedelta(minutes=minutes)
+                        tickets.append({
+                            "ticket_id": tid,
+                            "zone": zone,
+                            "member_tier": tier,
+                            "entry_time": entry.isoformat(timespec="minutes"),
+                            "exit_time": exit_at.isoformat(timespec="minutes"),
+                            "day_type": day_type,
+                            "lost_ticket": minutes == 0,
+                            "validation": validation,
+                        })
+                        tid += 1
+    return tickets
+
+
+def scalar_fee(ticket):
+    duration = ticket.get("duration_minutes")
+    if duration is None and not ticket["lost_ticket"]:
+        entry_dt = datetime.fromisoformat(ticket["entry_time"])
+        exit_dt = datetime.fromisoformat(ticket["exit_time"])
+        duration = int((exit_dt - entry_dt).total_seconds() // 60)
+    return compute_fee(
+        duration_minutes=duration or 0,
+        zone=ticket["zone"],
+        day_type=ticket["day_type"],
+        member_tier=ticket["member_tier"],
+        validation=ticket.get("validation"),
+        lost_ticket=ticket["lost_ticket"],
+        entry_at=ticket.get("entry_time"),
+        exit_at=ticket.get("exit_time"),
+        policy=POLICY,
+    )
+
+
+def history():
+    """make_tickets() plus long, overnight and multi-day stays."""
+    tickets = make_tickets()
+    tid = len(tickets) + 1
+    for t in make_tickets()[::7]:
+        for entry, minutes in ((datetime(2025, 11, 1, 23, 30), 271), (datetime(2025, 11, 1, 9, 0), 3 * 1440 + 17)):
+            tickets.append(dict(
+                t,
+                ticket_id=tid,
+                entry_time=entry.isoformat(timespec="minutes"),
+                exit_time=(entry + timedelta(minutes=minutes)).isoformat(timespec="minutes"),
+                lost_ticket=False,
+            ))
+            tid += 1
+    tickets.append(dict(tickets[5], ticket_id=tid, entry_time="bad", exit_time="bad",
+                        duration_minutes=200, lost_ticket=False))
+    # no day_type and no usable entry_time: compute_fees prices these at 0
+    undated = {k: v for k, v in tickets[5].items() if k not in ("day_type", "entry_time", "exit_time")}
+    tickets.append(dict(undated, ticket_id=tid + 1, entry_time="bad", exit_time="bad", lost_ticket=True))
+    tickets.append(dict(undated, ticket_id=tid + 2, duration_minutes=None, lost_ticket=False))
+    return tickets
+
+
+def jsonl(records):
+    return io.StringIO("".join(json.dumps(r) + "\n" for r in records))
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Runs each test against a scratch copy of data/."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        for name in ("tickets_pending.json", "tickets_completed.json"):
+            shutil.copy(Path("data") / name, self.tmp / name)
+        patcher = mock.patch.object(data_manager, "DATA_DIR", self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
@@ -0,0 +1,90 @@
+import unittest
+
+from src import rollups
+from src.archive import RECORD, Archive, archive_to_json, json_to_archive, write_archive
+from src.cli import completed_record
+from src.data_manager import load_tickets
+from src.fee_engine import compute_fees
+from src.policy import POLICY
+from src.vector_engine import HAVE_NUMPY, reprice, to_decimal
+from tests.helpers import DataDirTestCase, history
+
+
+class TestArchive(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.tmp / "completed.arc"
+
+    def test_a1_round_trip_with_json(self):
+        tickets = load_tickets("tickets_completed.json")
+        self.assertEqual(json_to_archive(self.path), len(tickets))
+        archive_to_json(self.path, "restored.json")
+        self.assertEqual(load_tickets("restored.json"), tickets)
+
+    def test_a2_fixed_width_and_smaller_than_json(self):
+        json_to_archive(self.path)
+        with Archive(self.path) as archive:
+            self.assertEqual(len(archive), 7)
+            self.assertEqual(self.path.stat().st_size, archive.offset + 7 * RECORD.size)
+            self.assertEqual(next(archive.iter_records())[0], 9001)
+        self.assertLess(self.path.stat().st_size, (self.tmp / "tickets_completed.json").stat().st_size / 4)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy not installed")
+    def test_a3_zero_copy_columns(self):
+        json_to_archive(self.path)
+        archive = Archive(self.path)
+        cols = archive.columns()
+        self.assertFalse(cols["total_cents"].flags.owndata)
+        self.assertEqual(int(cols["total_cents"].sum()), 29800)
+        self.assertEqual(list(cols["ticket_id"]), list(range(9001, 9008)))
+        del cols
+        archive.close()
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy not installed")
+    def test_a4_reprice_straight_from_archive(self):
+        tickets = history()[:-3]  # the last three have unparseable or missing timestamps
+        write_archive(self.path, tickets)
+        archive = Archive(self.path)
+        totals = reprice(archive.ticket_columns(), POLICY)
+        self.assertEqual(to_decimal(totals), compute_fees(tickets, POLICY)["total"])
+        del totals
+        archive.close()
+
+    def test_a5_round_trip_keeps_billed_breakdown_and_seconds(self):
+        stay = {"zone": "REGULAR", "member_tier": "NON-MEMBER", "entry_time": "2025-11-03T10:00",
+                "day_type": "WEEKDAY", "validation": None}
+        tickets = [
+            dict(stay, ticket_id=1, exit_time="2025-11-04T05:00:30", lost_ticket=False, duration_minutes=1140,
+                 total=100.0, time_charge=20.0, overnight_penalty=80.0, lost_ticket_penalty=0.0),
+            dict(stay, ticket_id=2, exit_time=None, lost_ticket=True, duration_minutes=None,
+                 total=50.0, time_charge=0.0, overnight_penalty=0.0, lost_ticket_penalty=50.0),
+            dict(stay, ticket_id=3, exit_time="2025-11-03T12:00:00", lost_ticket=False, duration_minutes=120,
+                 total=4.0, time_charge=4.0, overnight_penalty=0.0, lost_ticket_penalty=0.0),
+        ]
+        write_archive(self.path, tickets)
+        with Archive(self.path) as archive:
+            self.assertEqual(list(archive), tickets)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy not installed")
+    def test_a6_undated_tickets_price_like_compute_fees(self):
+        tickets = [{k: v for k, v in t.items() if k != "day_type"} for t in history()[-40:-3]] + history()[-1:]
+        write_archive(self.path, tickets)
+        archive = Archive(self.path)
+        totals = reprice(archive.ticket_columns(), POLICY)
+        self.assertEqual(to_decimal(totals), compute_fees(tickets, POLICY)["total"])
+        del totals
+        archive.close()
+
+    def test_a7_round_trip_keeps_undated_tickets(self):
+        pending = {"zone": "REGULAR", "member_tier": "NON-MEMBER", "entry_time": "2025-11-03T10:00"}
+        tickets = [
+            completed_record(dict(pending, ticket_id=1), {"exit_time": "2025-11-04T05:00:30"}, POLICY),
+            completed_record(dict(pending, ticket_id=2), {"lost_ticket": True}, POLICY),
+            {"ticket_id": 3, "zone": "REGULAR", "member_tier": "GOLD", "entry_time": None, "exit_time": None,
+             "lost_ticket": True, "validation": None, "duration_minutes": None},
+        ]
+        write_archive(self.path, tickets)
+        with Archive(self.path) as archive:
+            self.assertEqual(list(archive), tickets)
+        with Archive(self.path) as archive:
+            self.assertEqual(rollups.increments(tickets), rollups.increments(list(archive)))
@@ -0,0 +1,35 @@
+import unittest
+from decimal import Decimal
+
+from src.data_manager import load_tickets
+from src.fee_engine import compute_fees
+from src.policy import POLICY
+from tests.helpers import make_tickets, scalar_fee
+
+
+class TestBatchFee(unittest.TestCase):
+    def test_b1_matches_scalar_for_all_combinations(self):
+        tickets = make_tickets()
+        cols = compute_fees(tickets, POLICY)
+        for i, t in enumerate(tickets):
+            fee = scalar_fee(t)
+            self.assertEqual(cols["ticket_id"][i], t["ticket_id"])
+            self.assertEqual(cols["total"][i], fee.total, t)
+            self.assertEqual(cols["time_charge"][i], fee.time_charge, t)
+            self.assertEqual(cols["overnight"][i], fee.penalties.overnight, t)
+            self.assertEqual(cols["lost_ticket"][i], fee.penalties.lost_ticket, t)
+
+    def test_b2_completed_file_uses_recorded_duration(self):
+        tickets = load_tickets("tickets_completed.json")
+        cols = compute_fees(tickets, POLICY)
+        self.assertEqual(cols["total"], [scalar_fee(t).total for t in tickets])
+        self.assertEqual(cols["lost_ticket"][3], Decimal("50.00"))
+
+    def test_b3_empty_input(self):
+        cols = compute_fees([], POLICY)
+        self.assertEqual(cols["total"], [])
+
+    def test_b4_missing_exit_time_rejected(self):
+        ticket = dict(make_tickets()[2], exit_time=None)
+        with self.assertRaises(ValueError):
+            compute_fees([ticket], POLICY)
@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+from benchmarks import suite
+from benchmarks.generate import distributions, synthetic_tickets
+from src import fee_engine, instrumentation
+from src.data_manager import load_tickets
+from src.fee_engine import FeeCache
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_k1_synthetic_tickets_follow_the_sample_data(self):
+        sample = load_tickets("tickets_pending.json") + load_tickets("tickets_completed.json")
+        tickets = list(synthetic_tickets(2000, seed=7))
+        self.assertEqual(tickets, list(synthetic_tickets(2000, seed=7)))
+        self.assertEqual([t["ticket_id"] for t in tickets], list(range(1, 2001)))
+        for field in ("zone", "member_tier", "day_type"):
+            self.assertLessEqual({t[field] for t in tickets}, {t[field] for t in sample})
+        lost = sum(t["lost_ticket"] for t in tickets) / len(tickets)
+        expected = distributions()["lost_ticket"][True] / len(sample)
+        self.assertAlmostEqual(lost, expected, delta=0.05)
+        self.assertTrue(all(t["exit_time"] is None for t in tickets if t["lost_ticket"]))
+
+    def test_k2_results_document_and_regression_check(self):
+        results = suite.run(["compute_fee.lost", "load_tickets"], sizes=("1k",), repeat=1)
+        self.assertEqual(set(results["results"]), {"compute_fee.lost", "load_tickets.1k"})
+        self.assertEqual(results["results"]["load_tickets.1k"]["ops"], 1000)
+
+        slower = {"results": {name: dict(r, ops_per_sec=r["ops_per_sec"] * 0.8)
+                              for name, r in results["results"].items()}}
+        self.assertEqual([r[0] for r in suite.compare(results, slower, threshold=0.1)],
+                         ["compute_fee.lost", "load_tickets.1k"])
+        self.assertEqual(suite.compare(results, slower, threshold=0.25), [])
+        self.assertEqual(suite.compare(slower, results), [])
+
+    def test_k3_fee_scenarios_leave_instrumentation_and_caches_alone(self):
+        sink = instrumentation.MemorySink()
+        instrumentation.enable(sink)
+        self.addCleanup(instrumentation.reset)
+        self.addCleanup(instrumentation.disable)
+        selected = suite.scenarios(sizes=())
+        for name in ("compute_fee.REGULAR.uninstrumented", "compute_fee.lost"):
+            selected[name]()()
+        self.assertTrue(instrumentation.ENABLED)  # only the instrumented scenario switches it off
+        self.assertIs(fee_engine._priced, suite._priced)
+
+        with mock.patch.object(suite, "FeeCache", wraps=FeeCache) as cache:
+            run = selected["compute_fee.cached"]()
+            run(), run()
+        self.assertEqual(cache.call_count, 2)
@@ -0,0 +1,71 @@
+import unittest
+from datetime import date, timedelta
+
+from src import rollups
+from src.business_calendar import DayIndex, HolidayDataWarning, day_type_for, day_types, ticket_day_type
+from src.cli import completed_record
+from src.fee_engine import Fee, compute_fee, compute_fees
+from src.policy import POLICY
+from src.receipts import render_completed
+from tests.helpers import make_tickets
+
+
+class TestDayIndex(unittest.TestCase):
+    def test_c1_lookups_match_the_calendar(self):
+        index = DayIndex(["2025-12-25", "2026-01-01"])
+        self.assertEqual(index.day_type("2025-12-25T10:00"), "PUBLIC_HOLIDAY")
+        self.assertEqual(index.day_type(date(2025, 11, 1)), "WEEKEND")
+        self.assertEqual(index.day_type("2025-11-03"), "WEEKDAY")
+        with self.assertWarnsRegex(HolidayDataWarning, "2031"):
+            self.assertEqual(index.day_type("2031-01-04"), "WEEKEND")  # outside the indexed years
+
+        days = [date(2024, 12, 20) + timedelta(days=n) for n in range(800)]
+        expected = [2 if d.isoformat() in ("2025-12-25", "2026-01-01") else int(d.weekday() >= 5) for d in days]
+        with self.assertWarns(HolidayDataWarning):
+            self.assertEqual([index.code(d.toordinal()) for d in days], expected)
+        self.assertEqual(index.warned, {2024, 2027, 2031})
+        self.assertEqual(list(index.codes([d.toordinal() for d in days])), expected)  # warned once per year
+
+        self.assertEqual(day_type_for("2025-08-31T09:00"), "PUBLIC_HOLIDAY")  # data/holidays.json
+        self.assertEqual(day_types(["2025-12-25T08:00", "2025-12-26T08:00", "2025-12-25T23:00"]),
+                         ["PUBLIC_HOLIDAY", "WEEKDAY", "PUBLIC_HOLIDAY"])
+
+    def test_c2_day_type_can_be_omitted(self):
+        stay = dict(duration_minutes=300, zone="REGULAR", member_tier="NON-MEMBER", policy=POLICY,
+                    entry_at="2025-12-25T10:00", exit_at="2025-12-25T15:00")
+        self.assertEqual(compute_fee(**stay), compute_fee(**stay, day_type="PUBLIC_HOLIDAY"))
+        self.assertNotEqual(compute_fee(**stay).total, compute_fee(**stay, day_type="WEEKDAY").total)
+
+        tickets = make_tickets()[:200]
+        undated = [{k: v for k, v in t.items() if k != "day_type"} for t in tickets]
+        resolved = [dict(t, day_type=day_type_for(t["entry_time"])) for t in tickets]
+        self.assertEqual(compute_fees(undated, POLICY), compute_fees(resolved, POLICY))
+        bad = [dict(undated[0], entry_time="not a time"), {k: v for k, v in undated[1].items() if k != "entry_time"}]
+        self.assertEqual(compute_fees(bad, POLICY)["total"], [Fee().total] * 2)
+        self.assertEqual(compute_fee(duration_minutes=60, zone="REGULAR", policy=POLICY, entry_at="not a time"), Fee())
+
+        ticket = {"ticket_id": 1, "zone": "VALET", "member_tier": "GOLD", "entry_time": "2025-11-01T10:00"}
+        record = completed_record(ticket, {"exit_time": "2025-11-01T12:00"}, POLICY)
+        self.assertEqual((record["day_type"], record["total"]), ("WEEKEND", 15.0))
+        del record["day_type"]
+        self.assertIn("Day Type           : WEEKEND", render_completed(record))
+
+    def test_c3_missing_holiday_file_still_knows_weekends(self):
+        index = DayIndex.from_file("no/such/holidays.json")
+        with self.assertWarns(HolidayDataWarning):
+            self.assertEqual((index.day_type("2025-12-25"), index.day_type("2025-12-27")), ("WEEKDAY", "WEEKEND"))
+
+    def test_c4_holiday_file_covers_the_next_years(self):
+        self.assertEqual([day_type_for(d) for d in ("2026-02-17", "2026-08-31", "2027-12-25", "2027-12-27")],
+                         ["PUBLIC_HOLIDAY", "PUBLIC_HOLIDAY", "PUBLIC_HOLIDAY", "WEEKDAY"])
+        with self.assertWarnsRegex(HolidayDataWarning, "2028"):
+            DayIndex.from_file().day_type("2028-01-03")
+
+    def test_c5_tickets_without_day_type_or_entry_time_price_at_zero(self):
+        record = {"ticket_id": 1, "zone": "REGULAR", "member_tier": "GOLD", "exit_time": None, "lost_ticket": True,
+                  "validation": None, "duration_minutes": None}
+        for ticket in (record, dict(record, entry_time=None), dict(record, entry_time="not a time")):
+            self.assertIsNone(ticket_day_type(ticket))
+            self.assertIn("TOTAL DUE              : $0.00", render_completed(ticket))
+            [row] = rollups.increments([ticket])
+            self.assertEqual((row["day_type"], row["tickets"], row["revenue"], row["lost_ticket"]), (None, 1, 0, 0))
@@ -0,0 +1,76 @@
+import io
+import json
+from unittest import mock
+
+from src import cli, rollups
+from src.cli import completed_record
+from src.data_manager import load_tickets, save_tickets
+from tests.helpers import DataDirTestCase, jsonl, make_tickets, scalar_fee
+
+
+class TestBatchCLI(DataDirTestCase):
+    def test_l1_price_streams_fees_and_reports_bad_lines_in_place(self):
+        tickets = make_tickets()[:300]
+        lines = jsonl(tickets)
+        lines = io.StringIO(lines.getvalue() + "not json\n" + json.dumps({"ticket_id": 5, "zone": "REGULAR"}) + "\n")
+        out = io.StringIO()
+        self.assertEqual(cli.price(lines, out, batch_size=64), 2)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), len(tickets) + 2)
+        for t, row in zip(tickets, rows):
+            self.assertEqual((row["ticket_id"], row["total"]), (t["ticket_id"], str(scalar_fee(t).total)))
+        self.assertIn("error", rows[-2])
+        self.assertEqual(rows[-1]["ticket_id"], 5)
+
+    def test_l2_close_moves_pending_to_completed(self):
+        exits = [{"ticket_id": 1001, "exit_time": "2025-11-01T15:00"}, {"ticket_id": 1002, "lost_ticket": True},
+                 {"ticket_id": 1002, "lost_ticket": True}, {"ticket_id": 1003}]
+        out = io.StringIO()
+        self.assertEqual(cli.close(jsonl(exits), out), 2)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(rows[0]["duration_minutes"], 90)
+        self.assertEqual(rows[1]["total"], 30.0)
+        self.assertEqual([r.get("error") for r in rows[2:]], ["No pending ticket 1002", "No exit_time"])
+        self.assertEqual([t["ticket_id"] for t in load_tickets("tickets_pending.json")], [1003, 1004])
+        self.assertEqual(load_tickets("tickets_completed.json")[-2:], rows[:2])
+
+        self.assertEqual(cli.main(["close", "--all", "--at", "2025-11-01T23:00"], stdout=io.StringIO()), 0)
+        self.assertEqual(load_tickets("tickets_pending.json"), [])
+
+    def test_l4_close_reports_a_malformed_pending_ticket(self):
+        pending = load_tickets("tickets_pending.json")
+        del pending[0]["zone"]
+        save_tickets("tickets_pending.json", pending)
+        exits = [{"ticket_id": 1001, "exit_time": "2025-11-01T15:00"}, {"ticket_id": 1002, "lost_ticket": True}]
+        out = io.StringIO()
+        self.assertEqual(cli.close(jsonl(exits), out, batch_size=1), 1)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(rows[0], {"ticket_id": 1001, "error": "Missing 'zone'"})
+        self.assertEqual(load_tickets("tickets_completed.json")[-1]["ticket_id"], 1002)
+        self.assertEqual([t["ticket_id"] for t in load_tickets("tickets_pending.json")], [1001, 1003, 1004])
+
+    def test_l5_a_concurrent_close_cannot_complete_a_ticket_twice(self):
+        exits = [{"ticket_id": 1001, "exit_time": "2025-11-01T15:00"}, {"ticket_id": 1002, "lost_ticket": True}]
+
+        def price_while_another_close_runs(ticket, stop, policy):
+            # this close has found 1001 pending; another one closes it before this batch commits
+            if price.call_count == 1:
+                cli.close(jsonl(exits[:1]), io.StringIO())
+            return completed_record(ticket, stop, policy)
+
+        out = io.StringIO()
+        with mock.patch.object(cli, "completed_record", side_effect=price_while_another_close_runs) as price:
+            self.assertEqual(cli.close(jsonl(exits), out), 1)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(rows[0], {"ticket_id": 1001, "error": "No pending ticket 1001"})
+        self.assertEqual(rows[1]["ticket_id"], 1002)
+        self.assertEqual([t["ticket_id"] for t in load_tickets("tickets_completed.json")].count(1001), 1)
+        self.assertEqual(sum(sums["tickets"] for sums in rollups.load_rollups().values()), 2)
+
+    def test_l3_receipts_for_an_id_range(self):
+        out = io.StringIO()
+        self.assertEqual(cli.receipts(out, 9002, 9003), 2)
+        text = out.getvalue()
+        self.assertEqual(text.count("1U PARKING RECEIPT"), 2)
+        self.assertIn("T-9002", text)
+        self.assertNotIn("T-9001", text)
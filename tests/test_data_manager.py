@@ -0,0 +1,310 @@
+import contextlib
+import io
+import json
+import threading
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+from benchmarks import concurrent_writers
+from benchmarks.generate import distributions
+from src import data_manager, simulator
+from src.archive import Archive, json_to_archive
+from src.data_manager import (TicketStore, append_completed, append_ticket, compact, complete_ticket, iter_completed,
+                              iter_tickets, journal_path, load_tickets, locked, partition_completed, partition_days,
+                              partition_for, remove_ticket, save_tickets, update_tickets, write_tickets)
+from src.sqlite_store import SQLiteTicketStore
+from tests.helpers import DataDirTestCase
+
+
+class TestJournal(DataDirTestCase):
+    def test_d1_existing_json_loads_unchanged(self):
+        with open(Path("data") / "tickets_pending.json", encoding="utf-8") as f:
+            self.assertEqual(load_tickets("tickets_pending.json"), json.load(f))
+
+    def test_d2_append_writes_one_line_and_replays(self):
+        snapshot = (self.tmp / "tickets_pending.json").read_bytes()
+        append_ticket("tickets_pending.json", {"ticket_id": 1005, "zone": "OUTDOOR"})
+        self.assertEqual((self.tmp / "tickets_pending.json").read_bytes(), snapshot)
+        self.assertEqual(len(journal_path(self.tmp / "tickets_pending.json").read_text().splitlines()), 1)
+        ids = [t["ticket_id"] for t in load_tickets("tickets_pending.json")]
+        self.assertEqual(ids, [1001, 1002, 1003, 1004, 1005])
+
+    def test_d3_complete_moves_ticket(self):
+        pending = load_tickets("tickets_pending.json")[0]
+        done = dict(pending, exit_time="2025-11-01T15:00", duration_minutes=90, total=4.0)
+        complete_ticket(done)
+        self.assertNotIn(1001, [t["ticket_id"] for t in load_tickets("tickets_pending.json")])
+        self.assertEqual(load_tickets("tickets_completed.json")[-1], done)
+
+    def test_d4_compact_folds_journal_into_snapshot(self):
+        remove_ticket("tickets_pending.json", 1002)
+        append_ticket("tickets_pending.json", {"ticket_id": 1001, "zone": "VALET"})
+        expected = load_tickets("tickets_pending.json")
+        compact("tickets_pending.json")
+        self.assertFalse(journal_path(self.tmp / "tickets_pending.json").exists())
+        with open(self.tmp / "tickets_pending.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), expected)
+        self.assertEqual([t["ticket_id"] for t in expected], [1001, 1003, 1004])
+
+    def test_d5_torn_line_is_ignored(self):
+        journal = journal_path(self.tmp / "tickets_pending.json")
+        journal.write_text('{"op":"del","ticket_id":1001}\n{"op":"put","tick')
+        append_ticket("tickets_pending.json", {"ticket_id": 1006})
+        ids = [t["ticket_id"] for t in load_tickets("tickets_pending.json")]
+        self.assertEqual(ids, [1002, 1003, 1004, 1006])
+
+    def test_d6_auto_compaction_and_save_discards_journal(self):
+        with mock.patch.object(data_manager, "COMPACT_BYTES", 200):
+            for tid in range(2000, 2010):
+                append_ticket("tickets_pending.json", {"ticket_id": tid})
+        self.assertEqual(len(load_tickets("tickets_pending.json")), 14)
+        append_ticket("tickets_pending.json", {"ticket_id": 3000})
+        save_tickets("tickets_pending.json", [])
+        self.assertFalse(journal_path(self.tmp / "tickets_pending.json").exists())
+        self.assertEqual(load_tickets("tickets_pending.json"), [])
+
+
+class TestTicketStore(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.loader = mock.Mock(side_effect=load_tickets)
+        self.store = TicketStore(self.loader)
+
+    def test_s1_lookup_and_indexes(self):
+        self.assertEqual(self.store.get_pending(1003)["zone"], "VALET")
+        self.assertIsNone(self.store.get_pending(9001))
+        self.assertEqual(self.store.get_completed(9007)["member_tier"], "SILVER")
+        self.assertEqual([t["ticket_id"] for t in self.store.by_zone("VALET", "tickets_completed.json")], [9003, 9006])
+        self.assertEqual(len(self.store.by_entry_date("2025-11-01")), 7)
+        self.assertEqual(self.store.by_entry_date("2025-11-02"), [])
+
+    def test_s2_files_read_once_until_they_change(self):
+        for _ in range(5):
+            self.store.pending()
+            self.store.get_pending(1001)
+        self.assertEqual(self.loader.call_count, 1)
+        append_ticket("tickets_pending.json", {"ticket_id": 1009, "zone": "STAFF", "entry_time": "2025-11-02T08:00"})
+        self.assertEqual(self.store.get_pending(1009)["zone"], "STAFF")
+        self.assertEqual(self.loader.call_count, 2)
+        compact("tickets_pending.json")
+        self.assertEqual(len(self.store.pending()), 5)
+        self.assertEqual(self.loader.call_count, 3)
+
+
+    def test_s3_removal_through_the_store_needs_no_reload(self):
+        self.assertEqual(len(self.store.by_zone("REGULAR")), 1)
+        self.store.remove_tickets("tickets_pending.json", [1001, 4242])
+        self.assertIsNone(self.store.get_pending(1001))
+        self.assertEqual(self.store.by_zone("REGULAR"), [])
+        self.assertEqual(self.store.pending(), load_tickets("tickets_pending.json"))
+        self.assertEqual(self.loader.call_count, 1)
+        # a change by another writer since the last read is picked up, not masked
+        append_ticket("tickets_pending.json", {"ticket_id": 1009, "zone": "STAFF"})
+        self.store.remove_tickets("tickets_pending.json", [1002])
+        self.assertEqual(self.store.get_pending(1009)["zone"], "STAFF")
+        self.assertIsNone(self.store.get_pending(1002))
+        self.assertEqual(self.loader.call_count, 2)
+
+
+class TestStreaming(DataDirTestCase):
+    def test_r1_stream_matches_load_with_journal(self):
+        remove_ticket("tickets_completed.json", 9002)
+        append_ticket("tickets_completed.json", {"ticket_id": 9001, "zone": "OUTDOOR"})
+        append_ticket("tickets_completed.json", {"ticket_id": 9100, "zone": "STAFF"})
+        with mock.patch.object(data_manager, "STREAM_CHUNK", 7):
+            self.assertEqual(list(iter_tickets("tickets_completed.json")), load_tickets("tickets_completed.json"))
+        self.assertEqual(list(iter_tickets("missing.json")), [])
+
+        # deleted and put again: moves to the end in both
+        remove_ticket("tickets_completed.json", 9003)
+        append_ticket("tickets_completed.json", {"ticket_id": 9003, "zone": "VALET"})
+        tickets = load_tickets("tickets_completed.json")
+        self.assertEqual(tickets[-1], {"ticket_id": 9003, "zone": "VALET"})
+        self.assertEqual(list(iter_tickets("tickets_completed.json")), tickets)
+
+    def test_r2_writer_matches_save_format(self):
+        tickets = load_tickets("tickets_completed.json")
+        save_tickets("a.json", tickets)
+        write_tickets("b.json", iter(tickets))
+        self.assertEqual((self.tmp / "a.json").read_text(), (self.tmp / "b.json").read_text())
+        save_tickets("a.json", [])
+        write_tickets("b.json", [])
+        self.assertEqual((self.tmp / "a.json").read_text(), (self.tmp / "b.json").read_text())
+
+    def test_r3_peak_memory_stays_flat(self):
+        def generate(n):
+            for i in range(n):
+                yield {"ticket_id": i, "zone": "REGULAR", "member_tier": "MEMBER",
+                       "entry_time": "2025-11-01T10:00", "exit_time": "2025-11-01T12:00",
+                       "lost_ticket": False, "validation": None, "total": 4.0}
+
+        write_tickets("big.json", generate(20_000))
+        tracemalloc.start()
+        count = sum(1 for _ in iter_tickets("big.json"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(count, 20_000)
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+
+class TestPartitions(DataDirTestCase):
+    def test_p1_split_by_entry_date(self):
+        tickets = load_tickets("tickets_completed.json")
+        self.assertEqual(partition_completed(), len(tickets))
+        days = sorted({t["entry_time"][:10] for t in tickets})
+        self.assertEqual(partition_days(), days)
+        for day in days:
+            self.assertEqual(load_tickets(f"completed/{day}.json"),
+                             [t for t in tickets if t["entry_time"].startswith(day)])
+        self.assertEqual(partition_completed(), len(tickets))  # idempotent
+        self.assertEqual(sorted(t["ticket_id"] for t in iter_completed()), [t["ticket_id"] for t in tickets])
+
+    def test_p2_range_query_opens_only_overlapping_days(self):
+        partition_completed()
+        day = partition_days()[0]
+        expected = [t for t in load_tickets("tickets_completed.json") if t["entry_time"].startswith(day)]
+        with mock.patch.object(data_manager, "iter_tickets", wraps=iter_tickets) as opened:
+            self.assertEqual(list(iter_completed(day, f"{day}T23:59")), expected)
+        self.assertEqual(opened.call_args_list, [mock.call(f"completed/{day}.json")])
+        self.assertEqual(partition_days("1999-01-01", "2000-01-01"), [])
+
+    def test_p3_completion_goes_to_its_day_and_unpartitioned_fallback(self):
+        ticket = {"ticket_id": 9100, "zone": "REGULAR", "entry_time": "2030-01-02T09:00"}
+        with_range = list(iter_completed("2025-01-01", "2031-01-01"))
+        self.assertEqual(list(iter_completed()), load_tickets("tickets_completed.json"))
+        append_completed(ticket)
+        self.assertEqual(partition_for(ticket), "completed/2030-01-02.json")
+        self.assertEqual(list(iter_completed("2030-01-02", "2030-01-03")), [ticket])
+        self.assertEqual(partition_days(), ["2030-01-02"])
+        self.assertEqual(len(with_range), len(load_tickets("tickets_completed.json")))
+
+    def test_p4_reads_after_partitioning_see_new_completions(self):
+        store = TicketStore()
+        self.assertEqual(store.get_completed(9007)["member_tier"], "SILVER")
+        partition_completed()
+        pending = load_tickets("tickets_pending.json")[0]
+        done = dict(pending, exit_time="2025-11-01T15:00", duration_minutes=90, total=4.0)
+        complete_ticket(done)
+        self.assertEqual(load_tickets(partition_for(done))[-1], done)
+        self.assertIn(done, list(iter_completed()))
+        self.assertEqual(store.get_completed(done["ticket_id"]), done)
+        self.assertEqual(store.get_completed(9007)["member_tier"], "SILVER")
+        self.assertIn(done, store.by_entry_date(done["entry_time"][:10]))
+        self.assertEqual(len(store.completed()), len(list(iter_completed())))
+
+    def test_p5_completed_readers_follow_the_partitions(self):
+        partition_completed()
+        (self.tmp / "tickets_completed.json").unlink()
+        done = {"ticket_id": 9100, "zone": "VALET", "member_tier": "GOLD", "entry_time": "2025-11-02T09:00",
+                "exit_time": "2025-11-02T10:00", "day_type": "WEEKEND", "lost_ticket": False, "validation": None,
+                "duration_minutes": 60, "total": 5.0}
+        complete_ticket(done)
+        completed = list(iter_completed())
+        self.assertEqual(len(completed), 8)
+
+        self.assertEqual(json_to_archive(self.tmp / "completed.arc"), 8)
+        with Archive(self.tmp / "completed.arc") as archive:
+            self.assertEqual(list(archive)[-1], done)
+        with SQLiteTicketStore(self.tmp / "tickets.db") as db:
+            db.migrate_from_json()
+            self.assertEqual(db.completed(), completed)
+        self.assertEqual(sum(distributions()["zone"].values()), 4 + 8)
+        (self.tmp / "variants.json").write_text("{}")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            simulator.main(["--variants", str(self.tmp / "variants.json"), "--workers", "1"])
+        self.assertIn("from 8 tickets", out.getvalue())
+
+        # datetime bounds compare like the ISO strings they stand for
+        self.assertEqual(list(iter_completed(datetime(2025, 11, 2, 9, 0), datetime(2025, 11, 2, 9, 1))), [done])
+        self.assertEqual(list(iter_completed(date(2025, 11, 2))), [done])
+        self.assertEqual(list(iter_completed(datetime(2025, 11, 2, 9, 0, 30))), [])
+
+
+class TestConcurrentWriters(DataDirTestCase):
+    def test_c1_update_is_atomic_and_locked(self):
+        update_tickets("tickets_pending.json", lambda tickets: tickets.append({"ticket_id": 1010}))
+        self.assertEqual(load_tickets("tickets_pending.json")[-1], {"ticket_id": 1010})
+        self.assertEqual(sorted(p.name for p in self.tmp.glob("*.tmp")), [])
+
+    def test_c3_reader_racing_a_compaction_loses_nothing(self):
+        append_ticket("tickets_pending.json", {"ticket_id": 5555})
+        expected = [t["ticket_id"] for t in load_tickets("tickets_pending.json")]
+        opened = []
+
+        def racing_open(file, mode="r", *args, **kwargs):
+            # compact between the reader's two reads (snapshot and journal, in either order)
+            if mode == "r" and Path(file).name.startswith("tickets_pending."):
+                opened.append(file)
+                if len(opened) == 2:
+                    compact("tickets_pending.json")
+            return open(file, mode, *args, **kwargs)
+
+        for reader in (load_tickets, lambda name: list(iter_tickets(name))):
+            append_ticket("tickets_pending.json", {"ticket_id": 5555})
+            opened.clear()
+            with mock.patch.object(data_manager, "open", racing_open, create=True):
+                self.assertEqual([t["ticket_id"] for t in reader("tickets_pending.json")], expected)
+            self.assertGreater(len(opened), 2)
+            self.assertFalse(journal_path(self.tmp / "tickets_pending.json").exists())
+
+    def test_c4_crash_while_replacing_never_replays_the_journal(self):
+        path = self.tmp / "tickets_pending.json"
+        append_ticket("tickets_pending.json", {"ticket_id": 5555})
+        kept = [t for t in load_tickets("tickets_pending.json") if t["ticket_id"] != 5555]
+        real_replace = data_manager.os.replace
+
+        def crash_after_commit(src, dst):
+            if Path(src) == data_manager.staged_path(path):
+                raise OSError("crash")
+            return real_replace(src, dst)
+
+        with mock.patch.object(data_manager.os, "replace", crash_after_commit):
+            with self.assertRaises(OSError):
+                save_tickets("tickets_pending.json", kept)
+        # journal gone, new snapshot still staged: readers see the saved set, not 5555 again
+        self.assertFalse(journal_path(path).exists())
+        self.assertEqual(load_tickets("tickets_pending.json"), kept)
+        self.assertEqual(list(iter_tickets("tickets_pending.json")), kept)
+        remove_ticket("tickets_pending.json", 1001)
+        self.assertFalse(data_manager.staged_path(path).exists())
+        self.assertEqual(load_tickets("tickets_pending.json"), kept[1:])
+
+        # a crash before the journal is deleted leaves the old state, staged file ignored
+        data_manager.staged_path(path).write_text("[]")
+        self.assertEqual(load_tickets("tickets_pending.json"), kept[1:])
+        append_ticket("tickets_pending.json", {"ticket_id": 6666})
+        self.assertFalse(data_manager.staged_path(path).exists())
+        self.assertEqual(load_tickets("tickets_pending.json")[-1], {"ticket_id": 6666})
+
+    def test_c5_locked_is_reentrant_and_keeps_other_threads_out(self):
+        events = []
+
+        def hold():
+            with locked("tickets_pending.json"):
+                tickets = load_tickets("tickets_pending.json")
+                save_tickets("tickets_pending.json", tickets[1:])
+                append_ticket("tickets_pending.json", {"ticket_id": 7777})
+                other.start()
+                other.join(0.2)
+                events.append("released")
+
+        def wait_for_lock():
+            append_ticket("tickets_pending.json", {"ticket_id": 8888})
+            events.append("other wrote")
+
+        other = threading.Thread(target=wait_for_lock)
+        holder = threading.Thread(target=hold)
+        holder.start()
+        holder.join(10)
+        other.join(10)
+        self.assertFalse(holder.is_alive() or other.is_alive(), "deadlocked")
+        self.assertEqual(events, ["released", "other wrote"])
+        self.assertEqual([t["ticket_id"] for t in load_tickets("tickets_pending.json")][-3:], [1004, 7777, 8888])
+
+    def test_c2_no_lost_updates_across_processes(self):
+        for mode in ("locked", "journal"):
+            result = concurrent_writers.run(mode, writers=4, updates=10)
+            self.assertEqual(result["lost"], 0, result)
@@ -0,0 +1,56 @@
+import copy
+import dataclasses
+import unittest
+from decimal import Decimal
+
+from src.fee_engine import FeeCache, compute_fee
+from src.policy import POLICY
+from tests.helpers import history
+
+
+def fee_args(t, policy=POLICY):
+    return dict(duration_minutes=t.get("duration_minutes") or 0, zone=t["zone"], day_type=t.get("day_type"),
+                member_tier=t["member_tier"], validation=t.get("validation"), lost_ticket=t["lost_ticket"],
+                entry_at=t.get("entry_time"), exit_at=t.get("exit_time"), policy=policy)
+
+
+class TestFeeCache(unittest.TestCase):
+    def test_f1_same_fees_as_the_engine(self):
+        cache = FeeCache()
+        tickets = history()
+        for t in tickets + tickets:
+            args = fee_args(t)
+            for minutes in (args["duration_minutes"], 7, 61, 119, 1441):
+                args["duration_minutes"] = minutes
+                self.assertEqual(cache.compute_fee(**args), compute_fee(**args), t)
+        stats = cache.stats()
+        self.assertGreater(stats["hits"], stats["misses"])
+        self.assertEqual(stats["size"], stats["misses"])
+
+    def test_f2_lru_eviction_and_stats(self):
+        cache = FeeCache(maxsize=2)
+        base = dict(zone="REGULAR", day_type="WEEKDAY", member_tier="NON-MEMBER", policy=POLICY)
+        for minutes in (60, 120, 60, 180, 120, 130):
+            cache.compute_fee(duration_minutes=minutes, **base)
+        # 60, 120 miss; 60 hits; 180 evicts 120; 120 misses and evicts 60; 130 hits (2 billed hours)
+        self.assertEqual({k: cache.stats()[k] for k in ("hits", "misses", "evictions", "size")},
+                         {"hits": 2, "misses": 4, "evictions": 2, "size": 2})
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_f3_policy_change_invalidates(self):
+        policy = copy.deepcopy(POLICY)
+        cache = FeeCache()
+        args = dict(duration_minutes=300, zone="REGULAR", day_type="WEEKDAY", member_tier="NON-MEMBER")
+        self.assertEqual(cache.compute_fee(policy=policy, **args).total, Decimal("16.00"))
+        policy["zones"]["REGULAR"]["weekday"]["per_hour"] = Decimal("5.00")
+        self.assertEqual(cache.compute_fee(policy=policy, **args).total, Decimal("19.00"))
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_f4_cached_fees_cannot_be_mutated(self):
+        cache = FeeCache()
+        args = dict(duration_minutes=300, zone="REGULAR", day_type="WEEKDAY", member_tier="NON-MEMBER", policy=POLICY)
+        fee = cache.compute_fee(**args)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            fee.total = Decimal("0")
+        self.assertIs(cache.compute_fee(**args), fee)
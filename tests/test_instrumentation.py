@@ -0,0 +1,74 @@
+import json
+
+from src import instrumentation
+from src.data_manager import load_tickets, save_tickets
+from src.fee_engine import compute_fee, compute_fees
+from src.policy import POLICY
+from tests.helpers import DataDirTestCase
+
+
+def fee(**kwargs):
+    args = dict(duration_minutes=120, zone="REGULAR", day_type="WEEKDAY", member_tier="NON-MEMBER",
+                validation=None, lost_ticket=False, policy=POLICY)
+    args.update(kwargs)
+    return compute_fee(**args)
+
+
+def counters(snap):
+    return {(c["name"], tuple(c["labels"].values())): c["value"] for c in snap["counters"]}
+
+
+class TestInstrumentation(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sink = instrumentation.MemorySink()
+        instrumentation.reset()
+        instrumentation.enable(self.sink)
+        self.addCleanup(instrumentation.reset)
+        self.addCleanup(instrumentation.disable)
+
+    def test_i1_branch_counters(self):
+        fee(lost_ticket=True)
+        fee(duration_minutes=10)
+        fee(duration_minutes=600)                       # REGULAR weekday capped at $20
+        fee(duration_minutes=100, member_tier="GOLD")   # covered by free hours
+        fee(duration_minutes=200, validation={"store": "Woolworths", "kind": "HOURS", "spend": 35})
+        fee(duration_minutes=420, entry_at="2025-11-01T22:00", exit_at="2025-11-02T05:00")  # capped too
+        compute_fees([{"zone": "VALET", "day_type": "WEEKDAY", "member_tier": "GOLD", "duration_minutes": 90}], POLICY)
+
+        got = counters(instrumentation.flush())
+        self.assertEqual({k[1][0]: v for k, v in got.items() if k[0] == "fee_branch_total"},
+                         {"lost_ticket": 1, "grace": 1, "capped": 2, "free": 1, "charged": 2,
+                          "validation": 1, "overnight": 1})
+        hists = {h["labels"]["zone"]: h for h in self.sink.snapshots[0]["histograms"]}
+        self.assertEqual((hists["REGULAR"]["count"], hists["VALET"]["count"]), (6, 1))
+        self.assertEqual(hists["REGULAR"]["buckets"][-1], ["+Inf", 6])
+
+    def test_i2_storage_and_disabled(self):
+        tickets = load_tickets("tickets_completed.json")
+        save_tickets("copy.json", tickets)
+        got = counters(instrumentation.snapshot())
+        self.assertEqual(got[("storage_tickets_total", ("load_tickets",))], 7)
+        self.assertEqual(got[("storage_tickets_total", ("save_tickets",))], 7)
+
+        instrumentation.reset()
+        instrumentation.disable()
+        fee()
+        load_tickets("copy.json")
+        self.assertEqual(instrumentation.snapshot(), {"counters": [], "histograms": []})
+
+    def test_i3_json_and_prometheus_sinks(self):
+        fee()
+        fee(zone="VALET")
+        json_path, prom_path = self.tmp / "metrics.json", self.tmp / "metrics.prom"
+        instrumentation.enable(instrumentation.JSONSink(json_path))
+        snap = instrumentation.flush()
+        self.assertEqual(json.loads(json_path.read_text()), snap)
+
+        instrumentation.enable(instrumentation.PrometheusSink(prom_path))
+        instrumentation.flush()
+        text = prom_path.read_text()
+        self.assertIn("# TYPE parking_fee_branch_total counter\n", text)
+        self.assertIn('parking_fee_branch_total{branch="charged"} 2\n', text)
+        self.assertIn('parking_fee_seconds_bucket{zone="VALET",le="+Inf"} 1\n', text)
+        self.assertIn('parking_fee_seconds_count{zone="REGULAR"} 1\n', text)
@@ -2,6 +2,7 @@ import unittest
 from unittest import mock
 from decimal import Decimal
 from src import ui
+from src.data_manager import TicketStore
 
 
 class FakeFee:
@@ -12,6 +13,11 @@ class FakeFee:
         self.member_free_minutes = member_free_minutes
 
 
+def pending_store(*tickets):
+    """A TicketStore over the given pending tickets, to stand in for ui.ticket_store."""
+    return TicketStore(lambda filename: list(tickets))
+
+
 class TestMockedUI(unittest.TestCase):
     @mock.patch("src.ui.compute_fee")
     @mock.patch("builtins.input")
@@ -29,21 +35,25 @@ class TestMockedUI(unittest.TestCase):
         self.assertEqual(kwargs["validation"]["store"], "Woolworths")
         self.assertEqual(kwargs["validation"]["spend"], 35.0)
 
-    @mock.patch("src.ui.load_tickets")
+    @mock.patch("src.ui.iter_completed")
     @mock.patch("src.ui.compute_fee")
     @mock.patch("builtins.input")
-    def test_mo2_print_receipt_recomputes(self, inp, mock_fee, mock_load):
-        mock_load.return_value = [{
+    def test_mo2_print_receipt_recomputes(self, inp, mock_fee, mock_iter):
+        ticket = {
             "ticket_id": 101, "zone": "REGULAR", "member_tier": "SILVER",
             "entry_time": "2025-10-18T10:00", "exit_time": "2025-10-18T15:00",
             "duration_minutes": 300, "day_type": "WEEKDAY",
             "validation": None, "lost_ticket": False, "total": 999  # ignored
-        }]
+        }
+        mock_iter.side_effect = lambda start, end: iter([ticket])
+        store = TicketStore(lambda filename: [ticket] if filename == "tickets_completed.json" else [])
         inp.side_effect = ["101"]
         mock_fee.return_value = FakeFee(total="20.00", time_charge="20.00")
 
-        ui.print_receipt()
+        with mock.patch.object(ui, "ticket_store", store):
+            ui.print_receipt()
 
+        mock_iter.assert_called_once()  # listed by streaming, looked up through the store
         mock_fee.assert_called_once()
         _, kwargs = mock_fee.call_args
         self.assertEqual(kwargs["duration_minutes"], 300)
@@ -51,35 +61,35 @@ class TestMockedUI(unittest.TestCase):
         self.assertEqual(kwargs["member_tier"], "SILVER")
         self.assertFalse(kwargs["lost_ticket"])
 
-    @mock.patch("src.ui.load_tickets")
     @mock.patch("src.ui.compute_fee")
     @mock.patch("builtins.input")
-    def test_mo3_pending_auto_duration(self, inp, mock_fee, mock_load):
-        mock_load.return_value = [{
+    def test_mo3_pending_auto_duration(self, inp, mock_fee):
+        store = pending_store({
             "ticket_id": 200, "zone": "REGULAR", "member_tier": "MEMBER",
             "entry_time": "2025-10-18T10:00", "day_type": "WEEKDAY",
             "validation": None, "lost_ticket": False
-        }]
+        })
         inp.side_effect = ["200", "2", "2025-10-18T13:00"]  # option 2 -> exit 3h later
         mock_fee.return_value = FakeFee(total="12.00", time_charge="12.00")
 
-        ui.compute_from_pending()
+        with mock.patch.object(ui, "ticket_store", store):
+            ui.compute_from_pending()
         _, kwargs = mock_fee.call_args
         self.assertEqual(kwargs["duration_minutes"], 180)
 
-    @mock.patch("src.ui.load_tickets")
     @mock.patch("src.ui.compute_fee")
     @mock.patch("builtins.input")
-    def test_mo4_pending_lost_ticket_sets_flag(self, inp, mock_fee, mock_load):
-        mock_load.return_value = [{
+    def test_mo4_pending_lost_ticket_sets_flag(self, inp, mock_fee):
+        store = pending_store({
             "ticket_id": 300, "zone": "REGULAR", "member_tier": "MEMBER",
             "entry_time": "2025-10-18T10:00", "day_type": "WEEKDAY",
             "validation": None, "lost_ticket": False
-        }]
+        })
         inp.side_effect = ["300", "1"]  # choose "Report Lost Ticket"
         mock_fee.return_value = FakeFee(total="30.00", time_charge="0.00")
 
-        ui.compute_from_pending()
+        with mock.patch.object(ui, "ticket_store", store):
+            ui.compute_from_pending()
         _, kwargs = mock_fee.call_args
         self.assertTrue(kwargs["lost_ticket"])
         self.assertEqual(kwargs["duration_minutes"], 0)
@@ -98,22 +108,22 @@ class TestMockedUI(unittest.TestCase):
         ui.compute_fee_manual()
         mock_fee.assert_called_once()
 
-    @mock.patch("src.ui.load_tickets", return_value=[])
-    def test_mo6_no_pending_tickets(self, _load):
+    @mock.patch("src.ui.ticket_store", pending_store())
+    def test_mo6_no_pending_tickets(self):
         ui.compute_from_pending()  # should not crash
 
-    @mock.patch("src.ui.load_tickets")
     @mock.patch("src.ui.compute_fee")
     @mock.patch("builtins.input")
-    def test_mo7_exit_before_entry_then_ok(self, inp, mock_fee, mock_load):
-        mock_load.return_value = [{
+    def test_mo7_exit_before_entry_then_ok(self, inp, mock_fee):
+        store = pending_store({
             "ticket_id": 777, "zone": "REGULAR", "member_tier": "MEMBER",
             "entry_time": "2025-10-18T10:00", "day_type": "WEEKDAY",
             "validation": None, "lost_ticket": False
-        }]
+        })
         inp.side_effect = ["777", "2", "2025-10-18T09:00", "2025-10-18T12:00"]  # invalid then valid
         mock_fee.return_value = FakeFee(total="8.00", time_charge="8.00")
 
-        ui.compute_from_pending()
+        with mock.patch.object(ui, "ticket_store", store):
+            ui.compute_from_pending()
         _, kwargs = mock_fee.call_args
         self.assertEqual(kwargs["duration_minutes"], 120)
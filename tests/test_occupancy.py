@@ -0,0 +1,44 @@
+import unittest
+
+from src.occupancy import Occupancy
+from tests.helpers import DataDirTestCase
+
+
+class TestOccupancy(DataDirTestCase):
+    def test_o1_rebuild_from_pending(self):
+        snap = Occupancy.from_pending().snapshot()
+        self.assertEqual(snap.total, 4)
+        self.assertEqual({z: o.occupied for z, o in snap.zones.items()},
+                         {"REGULAR": 1, "PREFERRED": 1, "OUTDOOR": 0, "VALET": 1, "STAFF": 1})
+        self.assertEqual(snap.zones["VALET"].capacity, 80)
+        self.assertEqual(snap.zones["VALET"].free, 79)
+        self.assertEqual(dict(snap.tiers), {"NON-MEMBER": 1, "GOLD": 1, "MEMBER": 1, "STAFF": 1})
+
+
+class TestOccupancyUpdates(unittest.TestCase):
+    def test_o2_entry_exit_and_cached_snapshot(self):
+        board = Occupancy({"zones": {"VALET": {"capacity": 2}, "REGULAR": {}}})
+        first = board.snapshot()
+        self.assertIs(board.snapshot(), first)
+        self.assertTrue(board.enter({"ticket_id": 1, "zone": "VALET", "member_tier": "GOLD"}))
+        self.assertFalse(board.enter({"ticket_id": 1, "zone": "VALET", "member_tier": "GOLD"}))
+        board.enter({"ticket_id": 2, "zone": "VALET", "member_tier": "MEMBER"})
+        board.enter({"ticket_id": 3, "zone": "REGULAR", "member_tier": "GOLD"})
+        snap = board.snapshot()
+        self.assertGreater(snap.version, first.version)
+        self.assertTrue(snap.zones["VALET"].full)
+        self.assertEqual(snap.zones["VALET"].free, 0)
+        self.assertIsNone(snap.zones["REGULAR"].free)
+        self.assertEqual(dict(snap.tiers), {"GOLD": 2, "MEMBER": 1})
+
+        self.assertTrue(board.exit(1))
+        self.assertFalse(board.exit({"ticket_id": 1}))
+        self.assertEqual(board.snapshot().as_dict()["zones"]["VALET"],
+                         {"occupied": 1, "capacity": 2, "free": 1, "full": False})
+        self.assertEqual(board.snapshot().as_dict()["tiers"], {"GOLD": 1, "MEMBER": 1})
+
+    def test_o3_rebuild_skips_malformed_tickets(self):
+        board = Occupancy({"zones": {"VALET": {"capacity": 2}}})
+        board.rebuild([{"ticket_id": 1, "zone": "VALET", "member_tier": "GOLD"},
+                       {"ticket_id": 2, "zone": "VALET"}])
+        self.assertEqual((board.snapshot().total, board.skipped), (1, 1))
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from src.fee_engine import compute_fee, compute_fees
+from src.policy import POLICY
+from src.policy_store import PolicyStore, dump_policy, load_policy
+
+TOML = """
+version = "toml-1"
+cutoff_time = "04:00"
+
+[zones.REGULAR]
+grace_minutes = 15
+daily_cap = 20.00
+overnight_penalty = 80
+weekday = { first2h_flat = 4.00, per_hour = "4.00" }
+
+[memberships.GOLD]
+free_hours = 4
+daily_cap = 15.00
+
+[penalties.lost_ticket]
+non_member = 50.00
+member = 30.00
+valet = 80.00
+
+[validations.partners.woolworths]
+min_spend = 30
+free_hours = 2
+"""
+
+STAY = dict(duration_minutes=900, zone="REGULAR", day_type="WEEKDAY", member_tier="GOLD")
+from tests.helpers import make_tickets
+
+
+class TestPolicyStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def write(self, name, policy, version=None):
+        path = self.tmp / name
+        dump_policy(dict(policy, version=version) if version else policy, path)
+        return path
+
+    def test_p1_exported_policy_prices_like_the_builtin(self):
+        policy = load_policy(self.write("policy.json", POLICY))
+        self.assertEqual(policy["zones"]["VALET"]["weekday"]["per_hour"], Decimal("15.00"))
+        self.assertEqual(len(policy["version"]), 12)
+        tickets = make_tickets()[:300]
+        self.assertEqual(compute_fees(tickets, policy)["total"], compute_fees(tickets, POLICY)["total"])
+        self.assertEqual(compute_fee(**STAY, policy=policy).policy_version, policy["version"])
+
+        path = self.tmp / "policy.toml"
+        path.write_text(TOML, encoding="utf-8")
+        policy = load_policy(path)
+        self.assertEqual(policy["zones"]["REGULAR"]["overnight_penalty"], Decimal("80"))
+        self.assertEqual(compute_fee(**STAY, policy=policy).total, Decimal("15.00"))
+        self.assertEqual(compute_fee(**STAY, policy=policy).policy_version, "toml-1")
+
+    def test_p2_reload_swaps_in_a_new_version(self):
+        path = self.write("policy.json", POLICY, version="v1")
+        store = PolicyStore(path)
+        before = store.current()
+        self.assertFalse(store.check())
+
+        changed = json.loads(path.read_text(encoding="utf-8"))
+        changed.update(version="v2")
+        changed["memberships"]["GOLD"]["daily_cap"] = "12.00"
+        path.write_text(json.dumps(changed), encoding="utf-8")
+        os.utime(path, ns=(0, 1))
+        self.assertTrue(store.check())
+        self.assertEqual(store.version, "v2")
+        # a request holding the old policy keeps pricing under it
+        self.assertEqual((compute_fee(**STAY, policy=before).total, compute_fee(**STAY, policy=before).policy_version),
+                         (Decimal("15.00"), "v1"))
+        self.assertEqual(compute_fee(**STAY, policy=store.current()).total, Decimal("12.00"))
+
+        path.write_text("{not json", encoding="utf-8")
+        self.assertFalse(store.check())
+        self.assertIsNotNone(store.error)
+        self.assertEqual(store.version, "v2")
+
+    def test_p3_bad_amount_is_reported_and_a_fixed_file_still_loads(self):
+        path = self.write("policy.json", POLICY, version="v1")
+        store = PolicyStore(path).start(interval=0.01)
+        self.addCleanup(store.stop)
+
+        bad = json.loads(path.read_text(encoding="utf-8"))
+        bad.update(version="bad")
+        bad["zones"]["REGULAR"]["weekday"]["per_hour"] = "abc"
+        with self.assertLogs("src.policy_store", "WARNING"):
+            path.write_text(json.dumps(bad), encoding="utf-8")
+            self.assertTrue(wait_for(lambda: store.error is not None))
+        self.assertIsInstance(store.error, ValueError)
+        self.assertEqual(store.version, "v1")
+
+        bad["zones"]["REGULAR"]["weekday"]["per_hour"] = "4.00"
+        bad.update(version="v2")
+        path.write_text(json.dumps(bad), encoding="utf-8")
+        self.assertTrue(wait_for(lambda: store.version == "v2"))
+        self.assertIsNone(store.error)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
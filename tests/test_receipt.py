@@ -1,10 +1,13 @@
+import io
 import unittest
 from decimal import Decimal
+from pathlib import Path
 from approvaltests import verify, Options
 from approvaltests.scrubbers import create_regex_scrubber
 
 from src.fee_engine import compute_fee
 from src.policy import POLICY
+from src.receipts import write_receipts
 from src.ui import print_receipt_output
 
 
@@ -128,3 +131,31 @@ class TestReceiptApproval(unittest.TestCase):
             return_str=True,
         )
         approve_receipt(text)
+
+
+class TestBulkReceipts(unittest.TestCase):
+    # the approval cases above, as completed-ticket records
+    TICKETS = {
+        "test_a1_receipt_non_member_weekday": dict(
+            ticket_id=1234, zone="REGULAR", member_tier="NON-MEMBER", day_type="WEEKDAY", lost_ticket=False,
+            entry_time="2025-10-18T10:15", exit_time="2025-10-18T12:45", duration_minutes=150, validation=None),
+        "test_a2_receipt_member_with_validation": dict(
+            ticket_id=2234, zone="REGULAR", member_tier="MEMBER", day_type="WEEKDAY", lost_ticket=False,
+            entry_time="2025-10-18T11:00", exit_time="2025-10-18T14:00", duration_minutes=180,
+            validation={"store": "Woolworths", "kind": "HOURS", "spend": 35}),
+        "test_a3_receipt_lost_ticket": dict(
+            ticket_id=3333, zone="REGULAR", member_tier="NON-MEMBER", day_type="WEEKDAY", lost_ticket=True,
+            entry_time="2025-10-18T15:10", exit_time=None, duration_minutes=None, validation=None),
+        "test_a4_receipt_gold_member_capped": dict(
+            ticket_id=4444, zone="REGULAR", member_tier="GOLD", day_type="WEEKDAY", lost_ticket=False,
+            entry_time="2025-10-18T08:00", exit_time="2025-10-18T18:00", duration_minutes=600, validation=None),
+    }
+
+    def test_b1_bulk_output_matches_approved_snapshots(self):
+        expected = []
+        for name, ticket in list(self.TICKETS.items()) * 3:
+            approved = (Path(__file__).parent / f"TestReceiptApproval.{name}.approved.txt").read_text()
+            expected.append(approved.replace("RCP-XXXXX", f"RCP-{ticket['ticket_id']}") + "\n")
+        out = io.StringIO()
+        self.assertEqual(write_receipts(out, list(self.TICKETS.values()) * 3, batch_size=5), 12)
+        self.assertEqual(out.getvalue(), "".join(expected))
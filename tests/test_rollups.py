@@ -0,0 +1,136 @@
+import copy
+import io
+import json
+import threading
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from src import cli, data_manager, rollups
+from src.policy import POLICY
+from tests.helpers import DataDirTestCase, jsonl, make_tickets
+
+
+class TestRollups(DataDirTestCase):
+    def test_r1_incremental_updates_match_a_rebuild(self):
+        self.assertEqual(rollups.rebuild(), 7)
+        [total] = rollups.report(by=())
+        self.assertEqual((total["tickets"], total["revenue"], total["lost_tickets"]), (7, Decimal("298.00"), 3))
+
+        exits = [{"ticket_id": 1001, "exit_time": "2025-11-01T15:00"}, {"ticket_id": 1002, "lost_ticket": True}]
+        cli.close(jsonl(exits), io.StringIO())
+        incremental = rollups.load_rollups()
+        self.assertTrue(data_manager.journal_path(self.tmp / rollups.ROLLUP_FILE).exists())
+        rollups.rebuild()
+        self.assertEqual(rollups.load_rollups(), incremental)
+        [total] = rollups.report(by=())
+        self.assertEqual((total["tickets"], total["lost_tickets"]), (9, 4))
+
+    def test_r2_journal_folds_into_the_snapshot(self):
+        tickets = [dict(t, total=1.25) for t in make_tickets()[:200]]
+        with mock.patch.object(data_manager, "COMPACT_BYTES", 2048):
+            for i in range(0, len(tickets), 20):
+                rollups.record_completed(tickets[i:i + 20])
+        by_zone = rollups.report(by=("zone",))
+        self.assertEqual(sum(r["tickets"] for r in by_zone), 200)
+        self.assertEqual(sum(r["revenue"] for r in by_zone), Decimal("250.00"))
+        self.assertEqual([r["zone"] for r in by_zone], sorted(r["zone"] for r in by_zone))
+        with open(self.tmp / rollups.ROLLUP_FILE, encoding="utf-8") as f:
+            self.assertTrue(json.load(f))
+
+    def test_r3_report_command(self):
+        out = io.StringIO()
+        self.assertEqual(rollups.main(["rebuild"], stdout=out), 0)
+        out = io.StringIO()
+        rollups.main(["report", "--start", "2025-11-01", "--end", "2025-11-02", "--by", "zone", "--json"], stdout=out)
+        rows = {r["zone"]: r for r in map(json.loads, out.getvalue().splitlines())}
+        self.assertEqual(rows["VALET"]["lost_ticket"], "80.00")
+        out = io.StringIO()
+        rollups.main(["report", "--end", "2025-11-01"], stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+    def test_r4_rollups_keep_the_billed_breakdown(self):
+        data_manager.save_tickets(data_manager.COMPLETED_FILE, [])
+        data_manager.save_tickets(data_manager.PENDING_FILE, [
+            {"ticket_id": 1, "zone": "REGULAR", "member_tier": "NON-MEMBER", "entry_time": "2025-11-03T10:00"}])
+        cli.close(jsonl([{"ticket_id": 1, "exit_time": "2025-11-03T15:00"}]), io.StringIO())
+        billed = rollups.load_rollups()
+        [sums] = billed.values()
+        self.assertEqual((sums["time_charge"], sums["overnight"], sums["revenue"]), (1600, 0, 1600))
+
+        dearer = copy.deepcopy(POLICY)
+        dearer["zones"]["REGULAR"]["weekday"]["per_hour"] = Decimal("9.00")
+        rollups.rebuild(dearer)
+        self.assertEqual(rollups.load_rollups(), billed)
+        [record] = data_manager.load_tickets(data_manager.COMPLETED_FILE)
+        del record["day_type"]
+        self.assertEqual(rollups.increments([record], dearer), [dict(zip(rollups.KEY, key), **sums)
+                                                                  for key, sums in billed.items()])
+
+    def test_r5_a_crash_mid_close_never_double_counts(self):
+        rollups.rebuild()
+        exits = [{"ticket_id": 1001, "exit_time": "2025-11-01T15:00"}]
+        with mock.patch.object(rollups, "record_completed", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                cli.close(jsonl(exits), io.StringIO())
+        self.assertEqual(cli.close(jsonl(exits), io.StringIO()), 1)  # no longer pending
+        [total] = rollups.report(by=())
+        self.assertEqual(total["tickets"], 7)  # short until rebuilt
+        rollups.rebuild()
+        [total] = rollups.report(by=())
+        self.assertEqual(total["tickets"], 8)
+
+    def test_r6_a_crash_mid_compaction_never_double_counts(self):
+        path = self.tmp / rollups.ROLLUP_FILE
+        tickets = make_tickets()
+        rollups.record_completed([dict(tickets[0], total=4.0)])
+        real_replace = data_manager.os.replace
+
+        def crash_after_commit(src, dst):
+            if Path(src) == data_manager.staged_path(path):
+                raise OSError("crash")
+            return real_replace(src, dst)
+
+        with mock.patch.object(data_manager, "COMPACT_BYTES", 1), \
+                mock.patch.object(data_manager.os, "replace", crash_after_commit):
+            with self.assertRaises(OSError):
+                rollups.record_completed([dict(tickets[1], total=1.0)])
+        [total] = rollups.report(by=())
+        self.assertEqual((total["tickets"], total["revenue"]), (2, Decimal("5.00")))
+        rollups.record_completed([dict(tickets[2], total=2.0)])
+        self.assertFalse(data_manager.staged_path(path).exists())
+        [total] = rollups.report(by=())
+        self.assertEqual((total["tickets"], total["revenue"]), (3, Decimal("7.00")))
+
+    def test_r7_overnight_time_charge_is_what_the_penalty_leaves(self):
+        data_manager.save_tickets(data_manager.COMPLETED_FILE, [])
+        data_manager.save_tickets(data_manager.PENDING_FILE, [
+            {"ticket_id": 1, "zone": "REGULAR", "member_tier": "NON-MEMBER", "entry_time": "2025-11-03T10:00"}])
+        cli.close(jsonl([{"ticket_id": 1, "exit_time": "2025-11-04T05:00"}]), io.StringIO())
+        [record] = data_manager.load_tickets(data_manager.COMPLETED_FILE)
+        self.assertEqual((record["total"], record["time_charge"], record["overnight_penalty"]), (100.0, 20.0, 80.0))
+        [sums] = rollups.load_rollups().values()
+        self.assertEqual((sums["revenue"], sums["time_charge"], sums["overnight"]), (10000, 2000, 8000))
+        # records written with the engine's zero time charge still roll up the derived one
+        self.assertEqual(rollups.increments([dict(record, time_charge=0.0)]), rollups.increments([record]))
+
+    def test_r8_a_close_during_rebuild_waits_and_is_counted(self):
+        exits = [{"ticket_id": 1001, "exit_time": "2025-11-01T15:00"}]
+        closer = threading.Thread(target=cli.close, args=(jsonl(exits), io.StringIO()))
+        real_increments = rollups.increments
+        waited = []
+
+        def scanning(batch, policy=POLICY):
+            if not closer.is_alive() and not waited:
+                closer.start()
+                closer.join(0.2)
+                waited.append(closer.is_alive())
+            return real_increments(batch, policy)
+
+        with mock.patch.object(rollups, "increments", side_effect=scanning):
+            self.assertEqual(rollups.rebuild(), 7)
+        closer.join()
+        self.assertEqual(waited, [True])
+        [total] = rollups.report(by=())
+        self.assertEqual(total["tickets"], 8)
+        self.assertEqual(rollups.rebuild(), 8)
@@ -0,0 +1,77 @@
+import io
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from src import cli
+from src.fee_engine import _time_charge, lookup_time_charge
+from src.policy import POLICY
+from src.segments import compute_stay_fee, crossed_cutoffs, split_stay
+from src.tariff import Membership, compile_policy
+from tests.helpers import history, scalar_fee
+
+
+def naive_stay_fee(entry_at, exit_at, zone, member_tier, policy=POLICY):
+    """Reference: price every segment from split_stay one by one."""
+    policy = compile_policy(policy)
+    membership = policy.membership(member_tier)
+    later = Membership(member_tier, 0, membership.daily_cap)
+    total = Decimal("0.00")
+    for n, (start, end, day_type) in enumerate(split_stay(entry_at, exit_at, policy)):
+        hours = max(int((end - start).total_seconds() // 3600), 1)
+        tariff = policy.tariff(zone, day_type)
+        if n == 0:
+            total += lookup_time_charge(policy, tariff, membership, hours, 0)
+        else:
+            total += _time_charge(policy, tariff, later, hours, 0) + tariff.overnight_penalty
+    return total
+
+
+class TestSegments(unittest.TestCase):
+    def test_s1_stays_within_one_business_day_match_compute_fee(self):
+        checked = 0
+        for t in history()[:-3]:
+            entry, exit_ = datetime.fromisoformat(t["entry_time"]), datetime.fromisoformat(t["exit_time"])
+            if t["lost_ticket"] or crossed_cutoffs(entry, exit_, compile_policy(POLICY).cutoff):
+                continue
+            fee = compute_stay_fee(t["entry_time"], t["exit_time"], t["zone"], t["member_tier"],
+                                   validation=t["validation"], day_type=t["day_type"])
+            self.assertEqual(fee.total, scalar_fee(t).total, t)
+            checked += 1
+        self.assertGreater(checked, 1000)
+
+    def test_s2_multi_day_stays_pay_per_day(self):
+        # Mon 10:00 -> Thu 12:00: four capped weekday segments and three cut-offs
+        fee = compute_stay_fee("2025-11-03T10:00", "2025-11-06T12:00", "REGULAR", "NON-MEMBER")
+        self.assertEqual((fee.time_charge, fee.penalties.overnight, fee.total),
+                         (Decimal("80.00"), Decimal("240.00"), Decimal("320.00")))
+        # Fri 10:00 -> Sun 05:00: weekday, then Saturday and one hour of Sunday at weekend rates
+        self.assertEqual([d for _, _, d in split_stay("2025-11-07T10:00", "2025-11-09T05:00")],
+                         ["WEEKDAY", "WEEKEND", "WEEKEND"])
+        self.assertEqual(compute_stay_fee("2025-11-07T10:00", "2025-11-09T05:00", "REGULAR", "NON-MEMBER").total,
+                         Decimal("202.00"))
+        # leaving exactly at the cut-off does not start another day
+        self.assertEqual(compute_stay_fee("2025-11-03T10:00", "2025-11-05T04:00", "REGULAR", "NON-MEMBER").total,
+                         Decimal("20.00") * 2 + Decimal("80.00"))
+        cents = compile_policy(POLICY, cents=True)
+        self.assertEqual(compute_stay_fee("2025-11-03T10:00", "2025-11-06T12:00", "VALET", "GOLD", policy=cents),
+                         compute_stay_fee("2025-11-03T10:00", "2025-11-06T12:00", "VALET", "GOLD"))
+
+    def test_s3_long_stays_match_segment_by_segment_pricing(self):
+        for zone in ("REGULAR", "OUTDOOR", "VALET", "STAFF"):
+            for tier in ("NON-MEMBER", "GOLD"):
+                fee = compute_stay_fee("2025-01-01T10:00", "2026-01-03T12:30", zone, tier)
+                self.assertEqual(fee.total, naive_stay_fee("2025-01-01T10:00", "2026-01-03T12:30", zone, tier))
+                self.assertEqual(fee.penalties.overnight, 367 * compile_policy(POLICY).tariff(zone, "WEEKDAY").overnight_penalty)
+
+    def test_s4_cli_segmented_price(self):
+        stays = [{"ticket_id": 1, "zone": "REGULAR", "member_tier": "NON-MEMBER",
+                  "entry_time": "2025-11-03T10:00", "exit_time": "2025-11-06T12:00"},
+                 {"ticket_id": 2, "zone": "REGULAR", "member_tier": "NON-MEMBER", "entry_time": "2025-11-03T10:00"}]
+        out = io.StringIO()
+        lines = io.StringIO("".join(json.dumps(s) + "\n" for s in stays))
+        self.assertEqual(cli.price(lines, out, segmented=True), 1)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual((rows[0]["total"], rows[0]["overnight"]), ("320.00", "240.00"))
+        self.assertIn("error", rows[1])
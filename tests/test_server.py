@@ -0,0 +1,145 @@
+import asyncio
+import copy
+import json
+import os
+from http import HTTPStatus
+from unittest import mock
+
+from benchmarks import load_gen
+from src import business_calendar, data_manager, rollups, server
+from src.business_calendar import DayIndex
+from src.cli import completed_record, fee_rows
+from src.data_manager import load_tickets, save_tickets
+from src.fee_engine import compute_fees
+from src.policy import POLICY
+from src.policy_store import PolicyStore, dump_policy
+from src.server import HTTPError, PricingServer, serve
+from tests.helpers import DataDirTestCase
+
+
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = b"" if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+    status = int((await reader.readline()).split()[1])
+    response = await reader.read()
+    writer.close()
+    return status, json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+class TestPricingServer(DataDirTestCase):
+    def run_with_server(self, scenario):
+        async def main():
+            bound = asyncio.get_running_loop().create_future()
+            server = asyncio.create_task(serve(port=0, ready=bound.set_result))
+            try:
+                # a server that dies during startup never binds; surface its error instead
+                await asyncio.wait({bound, server}, return_when=asyncio.FIRST_COMPLETED)
+                if not bound.done():
+                    await server
+                return await scenario(bound.result())
+            finally:
+                server.cancel()
+                await asyncio.gather(server, return_exceptions=True)
+        return asyncio.run(main())
+
+    def test_h1_price_and_lookup(self):
+        async def scenario(port):
+            self.assertEqual(await request(port, "POST", "/price", load_gen.STAY),
+                             (200, dict(fee_rows(compute_fees([load_gen.STAY], POLICY))[0], policy_version=None)))
+            status, ticket = await request(port, "GET", "/tickets/1002")
+            self.assertEqual((status, ticket["zone"]), (200, "PREFERRED"))
+            self.assertEqual((await request(port, "GET", "/tickets/42"))[0], 404)
+            self.assertEqual((await request(port, "GET", "/price"))[0], 405)
+            self.assertEqual((await request(port, "POST", "/price", b"{oops"))[0], 400)
+            self.assertEqual((await request(port, "POST", "/price", {"zone": "REGULAR"}))[0], 400)
+        self.run_with_server(scenario)
+
+    def test_h2_exit_completes_ticket_once(self):
+        async def scenario(port):
+            exits = await asyncio.gather(*(request(port, "POST", "/tickets/1001/exit", {"exit_time": "2025-11-01T15:00"})
+                                           for _ in range(3)))
+            self.assertEqual(sorted(status for status, _ in exits), [200, 404, 404])
+            self.assertEqual((await request(port, "GET", "/tickets/1001"))[0], 404)
+            status, board = await request(port, "GET", "/occupancy")
+            self.assertEqual((status, board["total"], board["zones"]["REGULAR"]["occupied"]), (200, 3, 0))
+            status, record = await request(port, "POST", "/tickets/1002/exit", {"lost_ticket": True})
+            self.assertEqual((status, record["total"]), (200, 30.0))
+            return [r for s, r in exits if s == 200][0]
+
+        completed = self.run_with_server(scenario)
+        self.assertEqual(completed["duration_minutes"], 90)
+        self.assertEqual([t["ticket_id"] for t in load_tickets("tickets_pending.json")], [1003, 1004])
+        self.assertEqual(load_tickets("tickets_completed.json")[-2]["ticket_id"], 1001)
+
+    def test_h4_malformed_pending_ticket_is_a_bad_request(self):
+        pending = load_tickets("tickets_pending.json")
+        del pending[0]["member_tier"]
+        save_tickets("tickets_pending.json", pending)
+
+        async def scenario(port):
+            status, body = await request(port, "POST", "/tickets/1001/exit", {"exit_time": "2025-11-01T15:00"})
+            self.assertEqual((status, body["error"]), (400, "Pending ticket 1001 has no 'member_tier'"))
+            self.assertEqual((await request(port, "POST", "/tickets/1002/exit", {"lost_ticket": True}))[0], 200)
+            self.assertEqual((await request(port, "GET", "/tickets/1002"))[0], 404)
+        self.run_with_server(scenario)
+
+    def test_h5_two_gates_cannot_close_one_ticket_twice(self):
+        gate_a, gate_b = PricingServer(), PricingServer()
+        self.addCleanup(gate_a.close)
+        self.addCleanup(gate_b.close)
+        stop = {"exit_time": "2025-11-01T15:00"}
+
+        def price_while_gate_a_exits(ticket, stop, policy):
+            # gate B has found the ticket pending; gate A closes it before B commits
+            if price.call_count == 1:
+                gate_a.exit(ticket["ticket_id"], stop)
+            return completed_record(ticket, stop, policy)
+
+        with mock.patch.object(server, "completed_record", side_effect=price_while_gate_a_exits) as price:
+            with self.assertRaises(HTTPError) as caught:
+                gate_b.exit(1001, stop)
+        self.assertEqual(caught.exception.status, HTTPStatus.NOT_FOUND)
+        self.assertEqual([t["ticket_id"] for t in load_tickets("tickets_completed.json")].count(1001), 1)
+        self.assertEqual(sum(sums["tickets"] for sums in rollups.load_rollups().values()), 1)
+
+    def test_h6_occupancy_follows_other_writers_and_policy_reloads(self):
+        path = self.tmp / "policy.json"
+        dump_policy(POLICY, path)
+        gate = PricingServer(PolicyStore(path))
+        self.addCleanup(gate.close)
+        asyncio.run(gate.warm())
+        self.assertEqual(gate.occupancy.snapshot().total, 4)
+
+        gate.exit(1001, {"exit_time": "2025-11-01T15:00"})
+        self.assertEqual(gate.refresh_occupancy().total, 3)
+        data_manager.remove_ticket(data_manager.PENDING_FILE, 1002)  # another gate's exit
+        data_manager.append_ticket(data_manager.PENDING_FILE, {  # and an entry
+            "ticket_id": 2001, "zone": "VALET", "member_tier": "GOLD", "entry_time": "2025-11-01T16:00"})
+        snap = gate.refresh_occupancy()
+        self.assertEqual((snap.total, snap.zones["PREFERRED"].occupied, snap.zones["VALET"].occupied), (3, 0, 2))
+        self.assertIs(gate.refresh_occupancy(), snap)
+
+        smaller = copy.deepcopy(POLICY)
+        smaller["zones"]["VALET"]["capacity"] = 2
+        dump_policy(smaller, path)
+        os.utime(path, ns=(0, 1))
+        self.assertTrue(gate.policies.check())
+        self.assertTrue(gate.refresh_occupancy().zones["VALET"].full)
+
+    def test_h7_warm_loads_the_holiday_calendar_off_the_event_loop(self):
+        gate = PricingServer()
+        self.addCleanup(gate.close)
+        stay = {k: v for k, v in load_gen.STAY.items() if k != "day_type"}
+        with mock.patch.object(business_calendar, "_index", None):
+            asyncio.run(gate.warm())
+            with mock.patch.object(DayIndex, "from_file", side_effect=AssertionError("read on the event loop")):
+                undated = gate.price(stay)
+        self.assertEqual(undated, gate.price(dict(stay, day_type="WEEKEND")))  # 2025-11-01 is a Saturday
+
+    def test_h3_load_generator_reports_latency(self):
+        async def scenario(port):
+            return await load_gen.run(f"http://127.0.0.1:{port}", connections=4, requests=50, endpoint="ticket")
+        report = self.run_with_server(scenario)
+        self.assertEqual(report["requests"], 50)
+        self.assertLessEqual(report["p50_ms"], report["p99_ms"])
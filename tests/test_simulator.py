@@ -0,0 +1,56 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from src.fee_engine import compute_fees
+from src.policy import POLICY
+from src.simulator import apply_overrides, main, simulate
+from tests.helpers import history
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.tickets = history()
+        self.variants = {
+            "current": POLICY,
+            "regular_5": apply_overrides(POLICY, {"zones.REGULAR.weekday.per_hour": "5.00"}),
+            "gold_cap_12": apply_overrides(POLICY, {"memberships.GOLD.daily_cap": 12}),
+        }
+
+    def test_s1_overrides_copy_policy_and_parse_decimals(self):
+        policy = self.variants["gold_cap_12"]
+        self.assertEqual(policy["memberships"]["GOLD"]["daily_cap"], Decimal("12"))
+        self.assertEqual(POLICY["memberships"]["GOLD"]["daily_cap"], Decimal("15.00"))
+        with self.assertRaises(KeyError):
+            apply_overrides(POLICY, {"zones.REGULAR.weekday.nope": "1.00"})
+
+    def test_s2_revenue_matches_scalar_engine(self):
+        report = simulate(self.tickets, self.variants, workers=1, chunk_size=997)
+        for name, policy in self.variants.items():
+            cols = compute_fees(self.tickets, policy)
+            self.assertEqual(report[name]["revenue"], sum(cols["total"]))
+            self.assertEqual(report[name]["tickets"], len(self.tickets))
+            regular = sum(t for t, tk in zip(cols["total"], self.tickets) if tk["zone"] == "REGULAR")
+            self.assertEqual(report[name]["zones"]["REGULAR"], regular)
+            self.assertEqual(sum(report[name]["tiers"].values()), report[name]["revenue"])
+        self.assertGreater(report["regular_5"]["revenue"], report["current"]["revenue"])
+
+    def test_s3_worker_pool_matches_in_process(self):
+        inline = simulate(self.tickets, self.variants, workers=1, chunk_size=500)
+        pooled = simulate(self.tickets, self.variants, workers=2, chunk_size=500)
+        self.assertEqual(pooled, inline)
+
+    def test_s4_command_line_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "variants.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"regular_5": {"zones.REGULAR.weekday.per_hour": "5.00"}}, f)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                main(["--variants", path, "--workers", "1"])
+        self.assertIn("current: $", out.getvalue())
+        self.assertIn("regular_5: $", out.getvalue())
@@ -0,0 +1,93 @@
+import sqlite3
+import unittest
+from unittest import mock
+
+from src import ui
+from src.data_manager import TicketStore, iter_completed, load_tickets
+from src.sqlite_store import _SCHEMA, SQLiteTicketStore
+from tests.helpers import DataDirTestCase
+
+
+class TestSQLiteStore(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = SQLiteTicketStore(self.tmp / "tickets.db")
+        self.addCleanup(self.store.close)
+        self.store.migrate_from_json()
+
+    def test_q1_migration_round_trips_json(self):
+        for name in ("tickets_pending.json", "tickets_completed.json"):
+            self.assertEqual(self.store.load_tickets(name), load_tickets(name))
+
+    def test_q2_wal_mode_and_indexes(self):
+        mode = self.store.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        plan = self.store.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT data FROM completed WHERE zone = 'VALET'").fetchall()
+        self.assertIn("completed_zone", str(plan))
+
+    def test_q3_get_ticket(self):
+        self.assertEqual(self.store.get_ticket(1003)["zone"], "VALET")
+        self.assertEqual(self.store.get_ticket(9007)["member_tier"], "SILVER")
+        self.assertIsNone(self.store.get_ticket(1003, "tickets_completed.json"))
+        self.assertIsNone(self.store.get_ticket(42))
+
+    def test_q4_range_by_entry_date(self):
+        rows = self.store.tickets_entered_between("2025-11-01T09:00", "2025-11-01T11:00")
+        self.assertEqual([t["ticket_id"] for t in rows], [9002, 9005, 9007, 9001])
+        self.assertEqual(len(self.store.tickets_entered_between("2025-11-01", "2025-11-02")), 7)
+
+    def test_q5_complete_ticket_is_one_transaction(self):
+        done = dict(self.store.get_ticket(1001), exit_time="2025-11-01T15:00", total=4.0)
+        self.store.complete_ticket(done)
+        self.assertIsNone(self.store.get_ticket(1001, "tickets_pending.json"))
+        self.assertEqual(self.store.get_ticket(1001, "tickets_completed.json"), done)
+        with self.assertRaises(KeyError):
+            self.store.complete_ticket(done)
+        self.assertEqual(self.store.get_ticket(1001), done)
+
+    def test_q6_insertion_order_survives_upserts(self):
+        tickets = [{"ticket_id": 30}, {"ticket_id": 10}, {"ticket_id": 20}]
+        self.store.save_tickets("tickets_pending.json", tickets)
+        self.store.put_ticket("tickets_pending.json", {"ticket_id": 10, "zone": "VALET"})
+        self.store.put_ticket("tickets_pending.json", {"ticket_id": 5})
+        pending = self.store.load_tickets("tickets_pending.json")
+        self.assertEqual([t["ticket_id"] for t in pending], [30, 10, 20, 5])
+        self.assertEqual(self.store.get_ticket(10), {"ticket_id": 10, "zone": "VALET"})
+
+    def test_q7_schema_is_created_whole_or_not_at_all(self):
+        path = self.tmp / "new.db"
+        with mock.patch("src.sqlite_store._SCHEMA", _SCHEMA + ("CREATE INDEX broken ON nowhere (x)",)):
+            with self.assertRaises(sqlite3.OperationalError):
+                SQLiteTicketStore(path)
+        conn = sqlite3.connect(path)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT name FROM sqlite_master").fetchall(), [])
+
+    def test_q8_ticket_store_lookups_match_json(self):
+        json_store = TicketStore()
+        self.assertEqual(self.store.get_pending(1003), json_store.get_pending(1003))
+        self.assertEqual(self.store.get_completed(9007), json_store.get_completed(9007))
+        self.assertEqual(self.store.by_zone("VALET", "tickets_completed.json"),
+                         json_store.by_zone("VALET", "tickets_completed.json"))
+        self.assertEqual(self.store.by_entry_date("2025-11-01"), json_store.by_entry_date("2025-11-01"))
+        self.assertEqual(list(self.store.iter_completed("2025-11-01T09:00", "2025-11-01T11:00")),
+                         list(iter_completed("2025-11-01T09:00", "2025-11-01T11:00")))
+        self.store.remove_tickets("tickets_pending.json", [1001, 1002])
+        self.assertEqual([t["ticket_id"] for t in self.store.pending()], [1003, 1004])
+
+    @mock.patch("builtins.input")
+    def test_q9_ui_runs_on_the_database(self, inp):
+        store = ui.open_ticket_store(self.tmp / "tickets.db")
+        self.addCleanup(store.close)
+        self.assertIsInstance(store, SQLiteTicketStore)
+        inp.side_effect = ["9007"]
+        with mock.patch.object(ui, "ticket_store", store), \
+                mock.patch.object(ui, "iter_completed", side_effect=AssertionError("reads JSON")), \
+                mock.patch("builtins.print") as out:
+            ui.print_receipt()
+        self.assertIn("9007", str(out.call_args_list[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
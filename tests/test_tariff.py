@@ -0,0 +1,145 @@
+import copy
+import dataclasses
+import unittest
+from datetime import time
+from decimal import Decimal
+
+from src.fee_engine import TABLE_HOURS, build_tables, charge_table, compute_fee, compute_fees, table_memory
+from src.policy import POLICY
+from src.tariff import CompiledPolicy, compile_policy
+from tests.helpers import make_tickets
+
+
+class TestCompiledPolicy(unittest.TestCase):
+    def test_t1_one_tariff_per_zone_and_day_type(self):
+        compiled = compile_policy(POLICY)
+        self.assertEqual(len(compiled.tariffs), 15)
+        t = compiled.tariff("REGULAR", "WEEKEND")
+        self.assertEqual(t.first2h_flat, Decimal("2.00"))
+        self.assertEqual(t.per_hour, Decimal("4.00"))
+        self.assertEqual(t.daily_cap, Decimal("20.00"))
+        self.assertEqual(t.grace_minutes, 15)
+        self.assertEqual(t.cutoff, time(4, 0))
+
+    def test_t2_unknown_day_type_falls_back_to_weekday(self):
+        compiled = compile_policy(POLICY)
+        self.assertIs(compiled.tariff("VALET", "HOLIDAY"), compiled.tariff("VALET", "WEEKDAY"))
+
+    def test_t3_compiled_objects_are_immutable(self):
+        compiled = compile_policy(POLICY)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            compiled.tariff("REGULAR", "WEEKDAY").per_hour = Decimal("0.00")
+        with self.assertRaises(TypeError):
+            compiled.tariffs[("REGULAR", "WEEKDAY")] = None
+
+    def test_t4_compile_is_cached_per_policy_object(self):
+        self.assertIs(compile_policy(POLICY), compile_policy(POLICY))
+        compiled = compile_policy(POLICY)
+        self.assertIs(compile_policy(compiled), compiled)
+        self.assertIsInstance(compiled, CompiledPolicy)
+
+    def test_t5_compute_fee_accepts_compiled_policy(self):
+        compiled = compile_policy(POLICY)
+        for policy in (POLICY, compiled):
+            fee = compute_fee(
+                duration_minutes=600,
+                zone="REGULAR",
+                day_type="WEEKDAY",
+                member_tier="GOLD",
+                policy=policy,
+                entry_at="2025-10-18T20:00",
+                exit_at="2025-10-19T06:00",
+            )
+            self.assertEqual(fee.penalties.overnight, Decimal("80.00"))
+            self.assertEqual(fee.total, Decimal("95.00"))
+
+    def test_t6_in_place_changes_are_picked_up(self):
+        policy = copy.deepcopy(POLICY)
+        compiled = compile_policy(policy)
+        self.assertIs(compile_policy(policy), compiled)
+        policy["zones"]["STAFF"]["daily_cap"] = Decimal("5.00")
+        fee = compute_fee(duration_minutes=600, zone="STAFF", day_type="WEEKDAY",
+                          member_tier="STAFF", policy=policy)
+        self.assertEqual(fee.total, Decimal("5.00"))
+        self.assertIsNot(compile_policy(policy), compiled)
+        policy["zones"]["REGULAR"]["weekday"]["per_hour"] = Decimal("5.00")
+        fee = compute_fee(duration_minutes=300, zone="REGULAR", day_type="WEEKDAY",
+                          member_tier="NON-MEMBER", policy=policy)
+        self.assertEqual(fee.total, Decimal("19.00"))
+
+
+class TestCentsEngine(unittest.TestCase):
+    def test_c1_cents_policy_holds_int_amounts(self):
+        compiled = compile_policy(POLICY, cents=True)
+        self.assertTrue(compiled.cents)
+        self.assertEqual(compiled.tariff("VALET", "WEEKEND").first2h_flat, 1500)
+        self.assertEqual(compiled.membership("GOLD").daily_cap, 1500)
+        self.assertIsNone(compiled.membership("SILVER").daily_cap)
+        self.assertEqual(compiled.lost_ticket["valet"], 8000)
+
+    def test_c2_matches_decimal_engine_for_every_combination(self):
+        decimal_policy = compile_policy(POLICY)
+        cents_policy = compile_policy(POLICY, cents=True)
+        tickets = make_tickets()
+        for t in tickets:
+            for entry_at, exit_at in ((t["entry_time"], t["exit_time"]),
+                                      ("2025-11-01T20:00", "2025-11-02T04:01")):
+                kwargs = dict(
+                    duration_minutes=int(t["ticket_id"]) % 1500,
+                    zone=t["zone"],
+                    day_type=t["day_type"],
+                    member_tier=t["member_tier"],
+                    validation=t["validation"],
+                    lost_ticket=t["lost_ticket"],
+                    entry_at=entry_at,
+                    exit_at=exit_at,
+                )
+                expected = compute_fee(policy=decimal_policy, **kwargs)
+                fee = compute_fee(policy=cents_policy, **kwargs)
+                self.assertEqual(fee, expected, kwargs)
+                self.assertEqual(str(fee.total), str(expected.total), kwargs)
+        cols = compute_fees(tickets, cents_policy)
+        self.assertEqual(cols["total"], compute_fees(tickets, decimal_policy)["total"])
+
+    def test_c3_sub_cent_amounts_rejected(self):
+        policy = copy.deepcopy(POLICY)
+        policy["zones"]["REGULAR"]["weekday"]["per_hour"] = Decimal("4.005")
+        with self.assertRaises(ValueError):
+            compile_policy(policy, cents=True)
+
+
+class TestChargeTables(unittest.TestCase):
+    def test_l1_table_covers_zero_to_24_hours(self):
+        compiled = compile_policy(copy.deepcopy(POLICY))
+        table = charge_table(compiled, compiled.tariff("REGULAR", "WEEKDAY"),
+                             compiled.membership("NON-MEMBER"), 0)
+        self.assertEqual(len(table.charges), TABLE_HOURS + 1)
+        self.assertEqual(table.charges[3], Decimal("8.00"))
+        self.assertEqual(table.charges[24], Decimal("20.00"))
+        self.assertTrue(table.plateau)
+
+    def test_l2_uncapped_valet_beyond_table(self):
+        fee = compute_fee(duration_minutes=30 * 60, zone="VALET", day_type="WEEKDAY",
+                          member_tier="GOLD", policy=POLICY)
+        self.assertEqual(fee.total, Decimal("10.00") + 28 * Decimal("15.00"))
+
+    def test_l3_capped_plateau_beyond_table(self):
+        fee = compute_fee(duration_minutes=72 * 60, zone="PREFERRED", day_type="WEEKEND",
+                          member_tier="GOLD", policy=POLICY)
+        self.assertEqual(fee.total, Decimal("15.00"))
+
+    def test_l4_new_policy_object_gets_fresh_tables(self):
+        policy = copy.deepcopy(POLICY)
+        build_tables(policy)
+        changed = copy.deepcopy(policy)
+        changed["zones"]["REGULAR"]["daily_cap"] = Decimal("12.00")
+        fee = compute_fee(duration_minutes=600, zone="REGULAR", day_type="WEEKDAY",
+                          member_tier="NON-MEMBER", policy=changed)
+        self.assertEqual(fee.total, Decimal("12.00"))
+        self.assertEqual(table_memory(changed)["tables"], 1)
+
+    def test_l5_memory_report(self):
+        stats = build_tables(copy.deepcopy(POLICY))
+        self.assertEqual(stats["tables"], 5 * 3 * 5 * 2)
+        self.assertEqual(stats["entries"], stats["tables"] * (TABLE_HOURS + 1))
+        self.assertGreater(stats["bytes"], 0)
@@ -0,0 +1,36 @@
+import copy
+import unittest
+from decimal import Decimal
+
+from src.fee_engine import compute_fees
+from src.policy import POLICY
+from src.vector_engine import HAVE_NUMPY, encode_tickets, reprice, to_decimal
+from tests.helpers import history
+
+
+class TestVectorEngine(unittest.TestCase):
+    def setUp(self):
+        self.tickets = history()
+        self.expected = compute_fees(self.tickets, POLICY)["total"]
+
+    def test_v1_python_path_matches_scalar(self):
+        cols = encode_tickets(self.tickets, use_numpy=False)
+        self.assertEqual(to_decimal(reprice(cols, POLICY)), self.expected)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy not installed")
+    def test_v2_numpy_path_matches_scalar(self):
+        cols = encode_tickets(self.tickets)
+        totals = reprice(cols, POLICY)
+        self.assertEqual(str(totals.dtype), "int64")
+        self.assertEqual(to_decimal(totals), self.expected)
+
+    @unittest.skipUnless(HAVE_NUMPY, "NumPy not installed")
+    def test_v3_same_columns_repriced_under_another_policy(self):
+        policy = copy.deepcopy(POLICY)
+        policy["zones"]["REGULAR"]["weekday"]["per_hour"] = Decimal("5.00")
+        policy["memberships"]["GOLD"]["daily_cap"] = Decimal("12.00")
+        cols = encode_tickets(self.tickets)
+        self.assertEqual(to_decimal(reprice(cols, policy)), compute_fees(self.tickets, policy)["total"])
+
+    def test_v4_accepts_raw_ticket_records(self):
+        self.assertEqual(to_decimal(reprice(self.tickets[:50], POLICY)), self.expected[:50])
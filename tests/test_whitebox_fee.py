@@ -147,3 +147,28 @@ class TestWhiteBoxFee(unittest.TestCase):
             policy=POLICY,
         )
         self.assertEqual(fee.total, Decimal("4.00"))  # fallback path
+
+    def test_w14_fee_is_slotted_and_frozen(self):
+        fee = compute_fee(
+            duration_minutes=60,
+            zone="REGULAR",
+            day_type="WEEKDAY",
+            member_tier="NON-MEMBER",
+            lost_ticket=True,
+            policy=POLICY,
+        )
+        self.assertFalse(hasattr(fee, "__dict__"))
+        self.assertFalse(hasattr(fee.penalties, "__dict__"))
+        with self.assertRaises(AttributeError):
+            fee.total = Decimal("0.00")
+        with self.assertRaises(AttributeError):
+            fee.penalties.overnight = Decimal("1.00")
+
+    def test_w15_penalties_are_per_fee(self):
+        lost = compute_fee(duration_minutes=60, zone="VALET", day_type="WEEKDAY",
+                           member_tier="MEMBER", lost_ticket=True, policy=POLICY)
+        plain = compute_fee(duration_minutes=60, zone="VALET", day_type="WEEKDAY",
+                            member_tier="MEMBER", policy=POLICY)
+        self.assertEqual(lost.penalties.lost_ticket, Decimal("80.00"))
+        self.assertEqual(plain.penalties.lost_ticket, Decimal("0.00"))
+        self.assertEqual(plain.penalties.overnight, Decimal("0.00"))